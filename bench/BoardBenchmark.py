@@ -0,0 +1,179 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from src.logic.Board import Board
+from src.logic.PieceFactory import PieceFactory
+from src.logic.TransformPiece import TransformPiece
+
+
+class BoardBenchmark:
+    """times the Board hot paths on reproducible fixtures and compares the results against a saved baseline"""
+    sizes = [8, 16, 64, 256]
+    values = [2, 4, 8, 16, 32]
+
+    def __init__(self, board_type=Board, sizes=None, budget=1.0, min_repeats=1, max_repeats=1000, seed=0):
+        self.board_type = board_type
+        self.sizes = sizes or BoardBenchmark.sizes
+        # seconds spent repeating each benchmark once it has run min_repeats times, building the fixtures included
+        self.budget = budget
+        self.min_repeats = min_repeats
+        # fast operations on big fixtures would otherwise build thousands of them
+        self.max_repeats = max_repeats
+        self.seed = seed
+        self.benchmarks = {
+            "update_grid": (self.falling_board, lambda board: board.update_grid()),
+            "static_drop": (self.falling_board, lambda board: board.static_drop()),
+            "drop_unattached": (self.loose_board, lambda board: board.drop_unattached()),
+            "merge_with_completed_rows": (self.falling_board, lambda board: board.merge_with_completed_rows()),
+            "handle_active_piece_collision": (self.landed_board,
+                                              lambda board: board.handle_active_piece_collision()),
+            "rotate_active_piece": (self.falling_board, lambda board: board.rotate_active_piece()),
+            "TransformPiece.rotate": (self.pieces, lambda pieces: [TransformPiece.rotate(p) for p in pieces]),
+            "TransformPiece.sort_cells": (self.pieces,
+                                          lambda pieces: [TransformPiece.sort_cells(p, "down") for p in pieces]),
+        }
+
+    def visual_grid(self, size):
+        """rows of values: an empty top half over a ragged stack whose bottom two rows are complete"""
+        rng = random.Random(self.seed * 1000003 + size)
+        grid = []
+        for y in range(size):
+            if y < size // 2:
+                row = [0] * size
+            elif y >= size - 2:
+                row = [rng.choice(BoardBenchmark.values) for _ in range(size)]
+            else:
+                row = [rng.choice(BoardBenchmark.values) if rng.random() < 0.75 else 0 for _ in range(size)]
+            grid.append(row)
+        return grid
+
+    def board_from_visual_grid(self, visual_grid):
+        board = self.board_type(len(visual_grid))
+        board.grid = Board.grid_from_visual_grid(visual_grid)
+        return board
+
+    def falling_board(self, size):
+        """the stack with a t piece falling toward it from the top of the board"""
+        board = self.board_from_visual_grid(self.visual_grid(size))
+        piece = TransformPiece.transform(PieceFactory.t, (size // 2 - 1, 1))
+        for cell in piece:
+            board.set_cell_value(cell, 2)
+        board.active_piece = piece
+        return board
+
+    def landed_board(self, size):
+        """the falling board with its piece dropped onto the stack"""
+        board = self.falling_board(size)
+        board.active_piece = board.drop(board.active_piece)
+        return board
+
+    def loose_board(self, size):
+        """the settled stack with single cells placed floating above it"""
+        board = self.board_from_visual_grid(self.visual_grid(size))
+        board.active_piece = TransformPiece.transform(PieceFactory.o, (0, 0))
+        board.drop_unattached()
+        for y in range(1, size // 2 - 1, 3):
+            for x in range(1, size - 1, 3):
+                board.set_cell_value((x, y), 2)
+        return board
+
+    def pieces(self, size):
+        """every piece, spread across the board"""
+        return [TransformPiece.transform(piece, (i * size // 8, size // 2)) for i, piece in enumerate(PieceFactory.pieces)]
+
+    def time_benchmark(self, setup, operation, size):
+        """time the operation on fresh fixtures until the budget is spent, in seconds per call. building the fixtures
+        counts against the budget but not toward the samples"""
+        samples = []
+        started = time.perf_counter()
+        while len(samples) < self.min_repeats or \
+                (len(samples) < self.max_repeats and time.perf_counter() - started < self.budget):
+            fixture = setup(size)
+            start = time.perf_counter()
+            operation(fixture)
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        return {
+            "repeats": len(samples),
+            "min": samples[0],
+            "median": samples[len(samples) // 2],
+            "mean": sum(samples) / len(samples),
+        }
+
+    def run(self, names=None, report=None):
+        results = {}
+        for name, (setup, operation) in self.benchmarks.items():
+            if names and name not in names:
+                continue
+            for size in self.sizes:
+                key = "%s/%d" % (name, size)
+                results[key] = self.time_benchmark(setup, operation, size)
+                if report is not None:
+                    report(key, results[key])
+        return {
+            "meta": {
+                "board": self.board_type.__name__,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "seed": self.seed,
+            },
+            "results": results,
+        }
+
+    @staticmethod
+    def compare(results, baseline, threshold=1.25):
+        """ratio of current to baseline median per benchmark present in both, and the keys slower than threshold"""
+        ratios = {}
+        regressions = []
+        for key, current in results["results"].items():
+            previous = baseline["results"].get(key)
+            if previous is None or previous["median"] <= 0:
+                continue
+            ratios[key] = current["median"] / previous["median"]
+            if ratios[key] > threshold:
+                regressions.append(key)
+        return ratios, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="benchmark the Board hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BoardBenchmark.sizes)
+    parser.add_argument("--only", nargs="+", help="names of the benchmarks to run")
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="seconds to keep repeating each benchmark, fixture setup included")
+    parser.add_argument("--max-repeats", type=int, default=1000, help="most times to run each benchmark")
+    parser.add_argument("--array", action="store_true", help="benchmark the numpy-backed ArrayBoard")
+    parser.add_argument("--output", help="write the results as json to this file")
+    parser.add_argument("--baseline", help="compare against results previously written with --output")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio flagged as a regression")
+    args = parser.parse_args(argv)
+
+    board_type = Board
+    if args.array:
+        from src.logic.ArrayBoard import ArrayBoard
+        board_type = ArrayBoard
+    benchmark = BoardBenchmark(board_type, args.sizes, args.budget, max_repeats=args.max_repeats)
+    results = benchmark.run(args.only, lambda key, result: print(
+        "%-40s %12.6fs median over %d" % (key, result["median"], result["repeats"]), file=sys.stderr))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        ratios, regressions = BoardBenchmark.compare(results, baseline, args.threshold)
+        for key, ratio in ratios.items():
+            print("%-40s %6.2fx%s" % (key, ratio, "  REGRESSION" if key in regressions else ""), file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,45 +1,38 @@
 import pygame
 from pygame.constants import *
+from src.logic.Action import Action
 
 
 class InputProcessor:
+    direction_keys = {K_w: "up", K_a: "left", K_s: "down", K_d: "right"}
+    shift_keys = {K_UP: "up", K_LEFT: "left", K_DOWN: "down", K_RIGHT: "right", K_SPACE: "drop", K_SLASH: "rotate"}
+    debug_keys = {K_j: "print_grid", K_k: "profile"}
+
     @staticmethod
     def get_new_direction(event_list):
-        for event in reversed(event_list):
-            if event.type == pygame.KEYDOWN:
-                if event.key == K_w:
-                    return "up"
-                elif event.key == K_a:
-                    return "left"
-                elif event.key == K_s:
-                    return "down"
-                elif event.key == K_d:
-                    return "right"
-        return None
+        return InputProcessor.get_latest(event_list, InputProcessor.direction_keys)
 
     @staticmethod
     def get_piece_shift(event_list):
-        # may have to edit logic, currently returns the most recent shift input for the active piece
-        for event in reversed(event_list):
-            if event.type == pygame.KEYDOWN:
-                if event.key == K_UP:
-                    return "up"
-                elif event.key == K_LEFT:
-                    return "left"
-                elif event.key == K_DOWN:
-                    return "down"
-                elif event.key == K_RIGHT:
-                    return "right"
-                elif event.key == K_SPACE:
-                    return "drop"
-                elif event.key == K_SLASH:
-                    return "rotate"
-        return None
+        # returns the most recent shift input for the active piece, InputQueue keeps all of them
+        return InputProcessor.get_latest(event_list, InputProcessor.shift_keys)
 
     @staticmethod
     def get_debug(event_list):
+        return InputProcessor.get_latest(event_list, InputProcessor.debug_keys)
+
+    @staticmethod
+    def get_latest(event_list, keys):
         for event in reversed(event_list):
-            if event.type == pygame.KEYDOWN:
-                if event.key == K_j:
-                    return "print_grid"
+            if event.type == pygame.KEYDOWN and event.key in keys:
+                return keys[event.key]
+        return None
+
+    @staticmethod
+    def get_action(key):
+        """the Action for the given key, or None if it is not bound to one"""
+        if key in InputProcessor.direction_keys:
+            return Action.change_direction(InputProcessor.direction_keys[key])
+        if key in InputProcessor.shift_keys:
+            return Action.from_inputs(None, InputProcessor.shift_keys[key])[0]
         return None
@@ -0,0 +1,69 @@
+from collections import deque
+import pygame
+from src.controls.InputProcessor import InputProcessor
+from src.logic.Action import Action
+
+
+class InputQueue:
+    """every key press in the order it came in, with held shift keys repeating: after delay seconds (DAS), then
+    every repeat_interval seconds (ARR)"""
+
+    def __init__(self, delay=0.17, repeat_interval=0.05):
+        self.delay = delay
+        self.repeat_interval = repeat_interval
+        # (time, action) in the order they happened
+        self.actions = deque()
+        self.debug_commands = []
+        # key -> (action, time of its next repeat) for the held keys that repeat
+        self.held = {}
+
+    def push(self, event_list, now):
+        """queue the key events of one frame, all stamped with the given time"""
+        # repeats that came due since the last frame happened before any of these events
+        self.repeat(now)
+        for event in event_list:
+            if event.type == pygame.KEYDOWN:
+                self.press(event.key, now)
+            elif event.type == pygame.KEYUP:
+                self.release(event.key)
+
+    def press(self, key, now):
+        if key in InputProcessor.debug_keys:
+            self.debug_commands.append(InputProcessor.debug_keys[key])
+            return
+        action = InputProcessor.get_action(key)
+        if action is None:
+            return
+        self.actions.append((now, action))
+        if action in Action.shifts:
+            self.held[key] = (action, now + self.delay)
+
+    def release(self, key):
+        self.held.pop(key, None)
+
+    def repeat(self, now):
+        """queue the repeats of the held keys that have come due by the given time"""
+        repeats = []
+        for key, (action, due) in self.held.items():
+            while due <= now:
+                repeats.append((due, action))
+                if self.repeat_interval <= 0:
+                    # no interval: one repeat per frame
+                    due = now + 1e-9
+                    break
+                due += self.repeat_interval
+            self.held[key] = (action, due)
+        # interleave the repeats of several held keys by time
+        self.actions.extend(sorted(repeats, key=lambda repeat: repeat[0]))
+
+    def take(self, now):
+        """every action queued up to the given time, oldest first"""
+        self.repeat(now)
+        actions = [action for _, action in self.actions]
+        self.actions.clear()
+        return actions
+
+    def take_debug(self):
+        commands = self.debug_commands
+        self.debug_commands = []
+        return commands
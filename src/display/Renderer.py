@@ -1,20 +1,49 @@
+import time
 import pygame
-from src.controls.InputProcessor import InputProcessor
+from src.controls.InputQueue import InputQueue
+from src.display.TileCache import TileCache
+from src.logic.Action import Action
+from src.logic.Gravity import Gravity
 
 
 class Renderer:
     background_color = 0x636363
+    colors = {
+        # gray
+        0: 0xcccccc,
+        # red
+        2: 0xff0000,
+        # orange
+        4: 0xff8000,
+        # yellow
+        8: 0xffff00,
+        # light green
+        16: 0x00ff00,
+        # dark green
+        32: 0x009933,
+        # aqua
+        64: 0x00ffff,
+        # blue
+        128: 0x3399ff,
+        # dark blue
+        256: 0x0000ff,
+        # purple
+        512: 0x9933ff,
+        # fuchsia
+        1024: 0xff00ff,
+        # black
+        2048: 0x000000,
+    }
 
-    def __init__(self, board, square_size, padding_size, buffer_size):
+    def __init__(self, board, square_size, padding_size, buffer_size, gravity=None, frame_rate=60, inputs=None,
+                 replay=None):
         self.board = board
         self.square_size = square_size
         self.padding_size = padding_size
         self.buffer_size = buffer_size
-        pygame.init()
-        pygame.font.init()
-
-        #TODO: make font surface, update and blit onto squares surface when drawing
-        font = pygame.font.SysFont('Comic Sans MS', 30)
+        # only the display: the font waits for the first tile, and nothing else in pygame is used
+        pygame.display.init()
+        self.tiles = TileCache(square_size, Renderer.get_color)
 
         surface_length = (square_size + padding_size) * (board.size + buffer_size * 2) + padding_size
         size = (surface_length, surface_length)
@@ -22,86 +51,127 @@ class Renderer:
         self.background = pygame.Rect(0, 0, surface_length, surface_length)
         self.screen = pygame.display.set_mode(size)
         self.clock = pygame.time.Clock()
+        self.gravity = gravity or Gravity()
+        # frames per second for reading input and drawing, gravity keeps its own pace
+        self.frame_rate = frame_rate
+        self.inputs = inputs or InputQueue()
+        # gravity steps so far, the ticks of the game if it is recorded into a Replay
+        self.tick = 0
+        self.replay = replay
+        if replay is not None:
+            replay.record_tick(0, board)
+        # the grid last painted in full, anything since is redrawn cell by cell
+        self.drawn_grid = None
+        board.track_changes()
 
     def render(self):
         running = True
+        # the first step places the first piece
+        self.step()
+        last_time = time.perf_counter()
         while running:
             event_list = pygame.event.get()
-            self.update_board(event_list)
+            now = time.perf_counter()
+            self.handle_input(event_list, now)
+            self.update_board(self.gravity.advance(now - last_time))
+            last_time = now
             self.draw_board()
-            self.clock.tick(3)
+            self.clock.tick(self.frame_rate)
             for event in event_list:
                 if event.type == pygame.QUIT:
                     running = False
             if self.board.game_over:
                 running = False
 
-    def update_board(self, event_list):
-        new_dir = InputProcessor.get_new_direction(event_list)
-        piece_shift = InputProcessor.get_piece_shift(event_list)
-        debug = InputProcessor.get_debug(event_list)
-        if debug is not None:
-            self.board.debug(debug)
-        if new_dir is not None:
-            self.board.change_direction(new_dir)
-        if piece_shift is not None:
-            if piece_shift == "drop":
-                self.board.drop_active_piece()
-            elif piece_shift == "rotate":
-                self.board.rotate_active_piece()
-            else:
-                self.board.shift_active_piece(piece_shift)
+    def handle_input(self, event_list, now):
+        """apply every key press of the frame, and the repeats of held keys, in order"""
+        self.inputs.push(event_list, now)
+        for command in self.inputs.take_debug():
+            self.board.debug(command)
+        for action in self.inputs.take(now):
+            if Action.apply(self.board, action) and self.replay is not None:
+                self.replay.record(self.tick, action)
+
+    def update_board(self, steps):
+        """run the given number of gravity steps"""
+        for _ in range(steps):
+            if self.board.game_over:
+                return
+            self.step()
+            self.gravity.update_level(self.board)
+
+    def step(self):
+        """one gravity step. input applied until the next one belongs to the tick after it"""
         self.board.update_grid()
+        self.tick += 1
+        if self.replay is not None:
+            self.replay.ticks = self.tick
+            self.replay.record_tick(self.tick, self.board)
 
     def draw_board(self):
-        self.get_board_image(self.board, self.square_size, self.padding_size, self.buffer_size, self.surface, self.background)
-        self.screen.blit(self.surface, (0, 0))
-        pygame.display.flip()
+        if self.board.grid is not self.drawn_grid:
+            # first frame, or the grid was swapped out: paint everything
+            self.board.take_changed_cells()
+            self.get_board_image(self.board, self.square_size, self.padding_size, self.buffer_size, self.surface,
+                                 self.background, self.tiles)
+            self.drawn_grid = self.board.grid
+            self.screen.blit(self.surface, (0, 0))
+            pygame.display.flip()
+            return
+        rects = []
+        for cell in self.board.take_changed_cells():
+            square = self.draw_cell(self.board, cell, self.square_size, self.padding_size, self.buffer_size,
+                                    self.surface, self.tiles)
+            if square is not None:
+                self.screen.blit(self.surface, square, square)
+                rects.append(square)
+        if rects:
+            pygame.display.update(rects)
 
     @staticmethod
-    def get_board_image(board, square_size, padding_size, buffer_size, surface, background):
+    def get_board_image(board, square_size, padding_size, buffer_size, surface, background, tiles=None):
+        tiles = tiles or TileCache(square_size, Renderer.get_color)
         pygame.draw.rect(surface, pygame.Color(Renderer.background_color), background)
-        for cell in board.grid.keys():
-            if board.get_cell_value(cell) < 0:
-                continue
-            x = cell[0]
-            y = cell[1]
-            # x coordinate
-            left = (square_size + padding_size) * x + padding_size + (buffer_size * square_size)
-            # y coordinate
-            top = (square_size + padding_size) * y + padding_size + (buffer_size * square_size)
-            square = pygame.Rect(left, top, square_size, square_size)
-            color = Renderer.get_color(board.get_cell_value(cell))
-            pygame.draw.rect(surface, color, square)
-            # todo: print value over square
+        # every board cell starts out as an empty tile: one row of them is painted, then copied down the board
+        row = Renderer.get_square((0, 0), square_size, padding_size, buffer_size)
+        row.width = (square_size + padding_size) * (board.size - 1) + square_size
+        empty = tiles.get(0)
+        for x in range(board.size):
+            surface.blit(empty, Renderer.get_square((x, 0), square_size, padding_size, buffer_size))
+        for y in range(1, board.size):
+            surface.blit(surface, Renderer.get_square((0, y), square_size, padding_size, buffer_size), row)
+        # then only the cells holding something, so a sparse grid is not walked cell by cell
+        for cell, value in board.grid.items():
+            if value > 0:
+                Renderer.draw_cell(board, cell, square_size, padding_size, buffer_size, surface, tiles)
         return surface
 
+    @staticmethod
+    def draw_cell(board, cell, square_size, padding_size, buffer_size, surface, tiles):
+        """paint the tile of a single cell, or the background where it has no value. returns the painted
+        rectangle, or None if the cell is off the surface"""
+        square = Renderer.get_square(cell, square_size, padding_size, buffer_size)
+        visible = square.clip(surface.get_rect())
+        if visible.width == 0:
+            return None
+        value = board.get_cell_value(cell)
+        if value >= 0:
+            surface.blit(tiles.get(value), square)
+        else:
+            # fill moves a rect hanging off the top or left onto the surface instead of clipping it
+            surface.fill(pygame.Color(Renderer.background_color), visible)
+        return visible
+
+    @staticmethod
+    def get_square(cell, square_size, padding_size, buffer_size):
+        x = cell[0]
+        y = cell[1]
+        # x coordinate
+        left = (square_size + padding_size) * x + padding_size + (buffer_size * square_size)
+        # y coordinate
+        top = (square_size + padding_size) * y + padding_size + (buffer_size * square_size)
+        return pygame.Rect(left, top, square_size, square_size)
+
     @staticmethod
     def get_color(value):
-        colors = {
-            # gray
-            0: 0xcccccc,
-            # red
-            2: 0xff0000,
-            # orange
-            4: 0xff8000,
-            # yellow
-            8: 0xffff00,
-            # light green
-            16: 0x00ff00,
-            # dark green
-            32: 0x009933,
-            # aqua
-            64: 0x00ffff,
-            # blue
-            128: 0x3399ff,
-            # dark blue
-            256: 0x0000ff,
-            # purple
-            512: 0x9933ff,
-            # fuchsia
-            1024: 0xff00ff,
-            # black
-            2048: 0x000000,
-        }
-        return colors.get(value, Renderer.background_color)
+        return Renderer.colors.get(value, Renderer.background_color)
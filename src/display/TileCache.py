@@ -0,0 +1,46 @@
+import pygame
+
+
+class TileCache:
+    """pre-rendered tile surfaces with their value printed on them, one per value for a single square size.
+    each tile is drawn the first time its value shows up, and the font is only loaded for the first label"""
+    font_name = 'Comic Sans MS'
+
+    def __init__(self, square_size, get_color):
+        self.square_size = square_size
+        self.get_color = get_color
+        self.font = None
+        self.tiles = {}
+
+    def get(self, value):
+        tile = self.tiles.get(value)
+        if tile is None:
+            tile = self.render_tile(value)
+            self.tiles[value] = tile
+        return tile
+
+    def render_tile(self, value):
+        tile = pygame.Surface((self.square_size, self.square_size))
+        tile.fill(self.get_color(value))
+        if value > 0:
+            label = self.get_font().render(str(value), True, TileCache.get_label_color(tile.get_at((0, 0))))
+            # long numbers are shrunk to fit inside the tile
+            width = self.square_size - 2
+            if label.get_width() > width:
+                height = max(label.get_height() * width // label.get_width(), 1)
+                label = pygame.transform.smoothscale(label, (width, height))
+            tile.blit(label, label.get_rect(center=tile.get_rect().center))
+        return tile
+
+    def get_font(self):
+        if self.font is None:
+            # looking the font up scans the system fonts, which is slow enough to put off until a label is drawn
+            pygame.font.init()
+            self.font = pygame.font.SysFont(TileCache.font_name, max(self.square_size // 2, 8))
+        return self.font
+
+    @staticmethod
+    def get_label_color(color):
+        """black on light tiles, white on dark ones"""
+        brightness = color.r * 299 + color.g * 587 + color.b * 114
+        return (0, 0, 0) if brightness > 128000 else (255, 255, 255)
@@ -0,0 +1,49 @@
+class Action:
+    """names of the inputs a player can give, and how each of them is applied to a Board"""
+    directions = ["up", "down", "left", "right"]
+
+    ROTATE = "rotate"
+    DROP = "drop"
+    shifts = ["shift_" + direction for direction in directions]
+    direction_changes = ["direction_" + direction for direction in directions]
+    all = shifts + [ROTATE, DROP] + direction_changes
+
+    @staticmethod
+    def shift(direction):
+        """the action shifting the active piece in the given direction"""
+        return "shift_" + direction
+
+    @staticmethod
+    def change_direction(direction):
+        """the action changing the board direction to the given direction"""
+        return "direction_" + direction
+
+    @staticmethod
+    def from_inputs(new_dir, piece_shift):
+        """the actions for one frame of InputProcessor output, in the order the renderer applies them"""
+        actions = []
+        if new_dir is not None:
+            actions.append(Action.change_direction(new_dir))
+        if piece_shift == "drop" or piece_shift == "rotate":
+            actions.append(piece_shift)
+        elif piece_shift is not None:
+            actions.append(Action.shift(piece_shift))
+        return actions
+
+    @staticmethod
+    def apply(board, action):
+        """apply the given action to the board, returns whether it could be applied"""
+        # a merging shift leaves the board without an active piece until the next update
+        if board.game_over or board.active_piece is None:
+            return False
+        if action == Action.DROP:
+            board.drop_active_piece()
+        elif action == Action.ROTATE:
+            board.rotate_active_piece()
+        elif action.startswith("shift_"):
+            board.shift_active_piece(action[len("shift_"):])
+        elif action.startswith("direction_"):
+            board.change_direction(action[len("direction_"):])
+        else:
+            return False
+        return True
@@ -0,0 +1,99 @@
+import random
+from src.logic.Action import Action
+
+
+class BoardView:
+    """read-only view of a Board, as handed to agents"""
+    __slots__ = ("_board",)
+
+    def __init__(self, board):
+        self._board = board
+
+    @property
+    def size(self):
+        return self._board.size
+
+    @property
+    def current_direction(self):
+        return self._board.current_direction
+
+    @property
+    def active_piece(self):
+        piece = self._board.active_piece
+        return tuple(piece) if piece is not None else None
+
+    @property
+    def piece_count(self):
+        """number of pieces handed out so far, changes whenever a new piece is placed"""
+        return self._board.piece_generator.count
+
+    @property
+    def game_over(self):
+        return self._board.game_over
+
+    def get_cell_value(self, coords):
+        return self._board.get_cell_value(coords)
+
+    def state_hash(self):
+        return self._board.state_hash()
+
+    def get_max_cell_value(self):
+        return self._board.get_max_cell_value()
+
+    def is_out_of_bounds(self, coords):
+        return self._board.is_out_of_bounds(coords)
+
+    def is_in_buffer(self, coords):
+        return self._board.is_in_buffer(coords)
+
+
+class Agent:
+    """a game-playing agent: given a read-only view of the board, returns one action from Action.all or None"""
+    name = "agent"
+
+    def act(self, view):
+        raise NotImplementedError
+
+    def start_game(self, seed):
+        """called before each game of a Tournament with the seed of that game"""
+        pass
+
+    def __call__(self, board, tick):
+        """lets an agent be used as a Simulator policy"""
+        action = self.act(BoardView(board))
+        return [] if action is None else [action]
+
+
+class IdleAgent(Agent):
+    """never gives any input"""
+    name = "idle"
+
+    def act(self, view):
+        return None
+
+
+class RandomAgent(Agent):
+    """gives a random input, or nothing with the given probability"""
+    name = "random"
+
+    def __init__(self, seed=None, idle_chance=0.5):
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.idle_chance = idle_chance
+
+    def start_game(self, seed):
+        # every game gets inputs of its own, still the same ones each time the game is played
+        self.random = random.Random("%s:%d" % (self.seed, seed))
+
+    def act(self, view):
+        if self.random.random() < self.idle_chance:
+            return None
+        return self.random.choice(Action.all)
+
+
+class DropAgent(Agent):
+    """hard drops every piece where it spawns"""
+    name = "drop"
+
+    def act(self, view):
+        return Action.DROP
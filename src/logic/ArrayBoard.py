@@ -0,0 +1,108 @@
+import numpy
+from src.logic.ArrayGrid import ArrayGrid
+from src.logic.Board import Board
+from src.logic.TransformPiece import TransformPiece
+
+
+class ArrayBoard(Board):
+    """Board running on an ArrayGrid, with the whole-board scans done as array operations"""
+
+    @Board.grid.setter
+    def grid(self, grid):
+        if not isinstance(grid, ArrayGrid):
+            grid = ArrayGrid.from_dict(self.size, grid)
+        Board.grid.fset(self, grid)
+
+    @property
+    def array_grid(self):
+        """the ArrayGrid behind grid, for reading its arrays whole. writes still go through set_cell_value"""
+        return self._grid
+
+    def index_grid(self):
+        # line and landing queries are answered straight from the array, so there is nothing to keep
+        pass
+
+    def init_grid(self, size):
+        # an array grid starts out with every board cell empty
+        pass
+
+    def get_cell_value(self, coords):
+        return self._grid.get(coords, -1)
+
+    def set_cell_value(self, coords, value):
+        self._grid[coords] = value
+
+    def track_changes(self):
+        # the array operations bypass set_cell_value, so changes are found by comparing against the last frame
+        self.shown = self._grid.array.copy()
+
+    def take_changed_cells(self):
+        array = self._grid.array
+        xs, ys = numpy.nonzero(array != self.shown)
+        numpy.copyto(self.shown, array)
+        margin = self._grid.margin
+        changed = {(x - margin, y - margin) for x, y in zip(xs.tolist(), ys.tolist())}
+        changed.update(self._grid.overflow)
+        return changed
+
+    def get_cells_hash(self):
+        # the array operations bypass set_cell_value too, so the grid keeps the hash itself
+        return self._grid.cells_hash()
+
+    def get_max_cell_value(self):
+        return self._grid.max_value()
+
+    def static_drop(self):
+        """Drop all cells on the board as individuals, including the active piece"""
+        if self.any_in_buffer(self.active_piece):
+            return
+        self._grid.compact(self.current_direction)
+        # cells outside the board can only fall in from the buffer, after everything on the board has landed
+        for cell in TransformPiece.sort_cells(self._grid.filled_outside(), self.current_direction):
+            self.drop([cell])
+
+    def get_landing_distance(self, coords):
+        """how many cells the given cell can fall before the next one is filled, or a wall"""
+        direction = self.current_direction
+        ahead = self._grid.lane_ahead(coords, direction)
+        axis = ArrayGrid.gravity_axis(direction)
+        forward = ArrayGrid.is_toward_end(direction)
+        distances = numpy.arange(1, ahead.shape[0] + 1)
+        positions = coords[axis] + distances if forward else coords[axis] - distances
+        outside_buffer = positions >= 0 if forward else positions < self.size
+        blocked = numpy.flatnonzero((ahead > 0) | ((ahead == -1) & outside_buffer))
+        if blocked.shape[0] > 0:
+            return int(blocked[0])
+        # nothing in the way up to the end of the margin, carry on one cell at a time
+        distance = ahead.shape[0]
+        step = TransformPiece.get_direction_vector(direction)
+        cell = (coords[0] + step[0] * distance, coords[1] + step[1] * distance)
+        while not self.cell_collision_exists(cell, ()):
+            cell = (cell[0] + step[0], cell[1] + step[1])
+            distance += 1
+        return distance
+
+    def shift_column(self, coords, direction):
+        """shifts the given column/row by one to fill the given empty cell"""
+        self._grid.shift_segment(coords, direction)
+
+    def is_line_complete(self, index, direction):
+        """is the row (for up/down) or column (for left/right) at the given index full"""
+        return self._grid.is_line_complete(index, direction)
+
+    def completed_lines(self, direction=None):
+        """indices of the full rows (for up/down) or columns (for left/right), defaults to the current direction"""
+        return self._grid.complete_lines(direction or self.current_direction).nonzero()[0].tolist()
+
+    def merge_with_completed_rows(self):
+        """check for completed rows and merge matching cells down into them"""
+        # most ticks have no complete line at all, which one array reduction settles
+        if self._grid.complete_lines(self.current_direction).any():
+            Board.merge_with_completed_rows(self)
+
+    def drop_unattached(self):
+        """find all pieces not attached to any others and drop them"""
+        # dropping a loose cell never loosens another one, so only the cells loose up front need a look
+        for coords in self._grid.unattached_cells():
+            if self.is_cell_unattached(coords):
+                self.drop([coords])
@@ -0,0 +1,253 @@
+from collections.abc import MutableMapping
+
+import numpy
+from src.logic.Zobrist import Zobrist
+
+
+class ArrayGrid(MutableMapping):
+    """grid backend storing cell values in a contiguous numpy array with a fixed buffer margin around the board.
+
+    behaves like the tuple-keyed dict used by Board: in-board cells always exist, cells in the margin only exist
+    once they hold something other than -1, and coordinates beyond the margin fall back to a plain dict
+    """
+    # the margin must hold a freshly spawned piece (start point is 4 outside the board, pieces reach 2 further)
+    default_margin = 8
+
+    def __init__(self, size, margin=default_margin):
+        self.size = size
+        self.margin = margin
+        length = size + margin * 2
+        self.array = numpy.full((length, length), -1, dtype=numpy.int64)
+        self.inner = self.array[margin:margin + size, margin:margin + size]
+        self.inner.fill(0)
+        self.overflow = {}
+        # Zobrist hash of the cells, kept as they are set and shifted, None after a change that needs a full rehash
+        self.key = 0
+
+    @staticmethod
+    def from_dict(size, grid, margin=default_margin):
+        array_grid = ArrayGrid(size, margin)
+        for coords, value in grid.items():
+            array_grid[coords] = value
+        return array_grid
+
+    def index(self, coords):
+        """array index of the given coordinates, or None if they fall outside the margin"""
+        i = coords[0] + self.margin
+        j = coords[1] + self.margin
+        length = self.array.shape[0]
+        if 0 <= i < length and 0 <= j < length:
+            return i, j
+        return None
+
+    def get(self, coords, default=None):
+        index = self.index(coords)
+        if index is None:
+            return self.overflow.get(coords, default)
+        value = self.array.item(index)
+        if value == -1 and not self.is_in_board(coords):
+            return default
+        return value
+
+    def __getitem__(self, coords):
+        value = self.get(coords)
+        if value is None:
+            raise KeyError(coords)
+        return value
+
+    def __setitem__(self, coords, value):
+        index = self.index(coords)
+        if index is None:
+            previous = self.overflow.get(coords, -1)
+            self.overflow[coords] = value
+        else:
+            previous = self.array.item(index)
+            self.array[index] = value
+        if self.key is not None and previous != value:
+            self.key ^= Zobrist.cell_key(coords, previous) ^ Zobrist.cell_key(coords, value)
+
+    def __delitem__(self, coords):
+        if coords not in self:
+            raise KeyError(coords)
+        index = self.index(coords)
+        if index is None:
+            previous = self.overflow.pop(coords)
+        else:
+            previous = self.array.item(index)
+            self.array[index] = 0 if self.is_in_board(coords) else -1
+        if self.key is not None:
+            self.key ^= Zobrist.cell_key(coords, previous)
+
+    def __contains__(self, coords):
+        return self.get(coords) is not None
+
+    def __iter__(self):
+        xs, ys = numpy.nonzero(self.array != -1)
+        for i, j in zip(xs.tolist(), ys.tolist()):
+            yield i - self.margin, j - self.margin
+        yield from self.overflow
+
+    def __len__(self):
+        return int(numpy.count_nonzero(self.array != -1)) + len(self.overflow)
+
+    def copy(self):
+        return dict(self.items())
+
+    def is_in_board(self, coords):
+        return 0 <= coords[0] < self.size and 0 <= coords[1] < self.size
+
+    def max_value(self):
+        max_value = int(self.array.max())
+        if self.overflow:
+            max_value = max(max_value, max(self.overflow.values()))
+        return max_value
+
+    @staticmethod
+    def mix(codes):
+        """Zobrist.mix over an array of uint64 codes"""
+        u = numpy.uint64
+        codes = codes + u(0x9E3779B97F4A7C15)
+        codes = (codes ^ (codes >> u(30))) * u(0xBF58476D1CE4E5B9)
+        codes = (codes ^ (codes >> u(27))) * u(0x94D049BB133111EB)
+        return codes ^ (codes >> u(31))
+
+    @staticmethod
+    def keys_hash(xs, ys, values):
+        """the Zobrist keys of the filled cells at the given arrays of x, y and value XORed together"""
+        if not xs.shape[0]:
+            return 0
+        u = numpy.uint64
+        powers = numpy.log2(values).astype(u)
+        x = (xs & 0xFFFFFF).astype(u)
+        y = (ys & 0xFFFFFF).astype(u)
+        codes = (((u(Zobrist.cell_kind) << u(6) | powers) << u(24) | x) << u(24)) | y
+        return int(numpy.bitwise_xor.reduce(ArrayGrid.mix(codes)))
+
+    def cells_hash(self):
+        """the Zobrist keys of every filled cell XORed together, the same as Zobrist.grid_hash of the same cells.
+        kept up to date as cells change, so only worked out from the whole array after compact"""
+        if self.key is None:
+            xs, ys = numpy.nonzero(self.array > 0)
+            key = ArrayGrid.keys_hash(xs - self.margin, ys - self.margin, self.array[xs, ys])
+            for coords, value in self.overflow.items():
+                key ^= Zobrist.cell_key(coords, value)
+            self.key = key
+        return self.key
+
+    def lane_hash(self, index, direction):
+        """the Zobrist keys of the filled cells of the lane at the given index XORed together"""
+        lane = self.lane(index, direction)
+        positions = numpy.flatnonzero(lane > 0)
+        others = numpy.full_like(positions, index)
+        if ArrayGrid.gravity_axis(direction) == 1:
+            return ArrayGrid.keys_hash(others, positions, lane[positions])
+        return ArrayGrid.keys_hash(positions, others, lane[positions])
+
+    @staticmethod
+    def gravity_axis(direction):
+        """array axis the given direction moves along"""
+        return 1 if direction == "down" or direction == "up" else 0
+
+    @staticmethod
+    def is_toward_end(direction):
+        """does the given direction point toward increasing coordinates"""
+        return direction == "down" or direction == "right"
+
+    def line(self, index, direction):
+        """in-board view of the row/column at the given index, perpendicular to the given direction"""
+        if ArrayGrid.gravity_axis(direction) == 1:
+            return self.inner[:, index]
+        return self.inner[index, :]
+
+    def lane(self, index, direction):
+        """in-board view of the column/row at the given index, parallel to the given direction"""
+        if ArrayGrid.gravity_axis(direction) == 1:
+            return self.inner[index, :]
+        return self.inner[:, index]
+
+    def lane_ahead(self, coords, direction):
+        """values of the cells past the given one in the given direction, nearest first, up to the end of the margin"""
+        index = self.index(coords)
+        if index is None:
+            return self.array[0, :0]
+        i, j = index
+        if direction == "down":
+            return self.array[i, j + 1:]
+        elif direction == "up":
+            return self.array[i, :j][::-1]
+        elif direction == "right":
+            return self.array[i + 1:, j]
+        return self.array[:i, j][::-1]
+
+    def is_line_complete(self, index, direction):
+        """is the row/column at the given index, perpendicular to the given direction, free of empty cells"""
+        return bool(self.line(index, direction).all())
+
+    def complete_lines(self, direction):
+        """boolean mask of complete rows/columns perpendicular to the given direction, indexed like the board"""
+        return (self.inner != 0).all(axis=1 - ArrayGrid.gravity_axis(direction))
+
+    def shift_segment(self, coords, direction):
+        """shift the part of the lane behind the given in-board cell one step in the given direction, into that cell.
+        the cell at the back of the lane is emptied"""
+        axis = ArrayGrid.gravity_axis(direction)
+        lane = self.lane(coords[1 - axis], direction)
+        position = coords[axis]
+        before = self.lane_hash(coords[1 - axis], direction) if self.key is not None else 0
+        if ArrayGrid.is_toward_end(direction):
+            lane[1:position + 1] = lane[:position].copy()
+            lane[0] = 0
+        else:
+            lane[position:-1] = lane[position + 1:].copy()
+            lane[-1] = 0
+        if self.key is not None:
+            self.key ^= before ^ self.lane_hash(coords[1 - axis], direction)
+
+    def compact_lane(self, index, direction):
+        """slide every filled cell of the lane at the given index as far as it goes in the given direction,
+        keeping their order"""
+        lane = self.lane(index, direction)
+        if self.key is not None:
+            self.key ^= self.lane_hash(index, direction)
+        filled = lane[lane != 0]
+        lane.fill(0)
+        if ArrayGrid.is_toward_end(direction):
+            lane[lane.shape[0] - filled.shape[0]:] = filled
+        else:
+            lane[:filled.shape[0]] = filled
+        if self.key is not None:
+            self.key ^= self.lane_hash(index, direction)
+
+    def compact(self, direction):
+        """slide every filled in-board cell as far as it goes in the given direction, keeping their order per lane"""
+        axis = ArrayGrid.gravity_axis(direction)
+        empty = self.inner == 0
+        # stable sort on emptiness moves filled cells to one end without reordering them
+        key = ~empty if ArrayGrid.is_toward_end(direction) else empty
+        order = numpy.argsort(key, axis=axis, kind="stable")
+        self.inner[...] = numpy.take_along_axis(self.inner, order, axis=axis)
+        # every lane may have moved, cheaper to rehash once when next asked
+        self.key = None
+
+    def filled_outside(self):
+        """coordinates of the filled cells outside of the board"""
+        filled = self.array > 0
+        m = self.margin
+        filled[m:m + self.size, m:m + self.size] = False
+        xs, ys = numpy.nonzero(filled)
+        cells = [(i - m, j - m) for i, j in zip(xs.tolist(), ys.tolist())]
+        cells.extend(coords for coords, value in self.overflow.items() if value > 0)
+        return cells
+
+    def unattached_cells(self):
+        """in-board coordinates of filled cells with no filled neighbor, in x-major order"""
+        filled = self.array > 0
+        neighbors = numpy.zeros_like(filled)
+        neighbors[1:, :] |= filled[:-1, :]
+        neighbors[:-1, :] |= filled[1:, :]
+        neighbors[:, 1:] |= filled[:, :-1]
+        neighbors[:, :-1] |= filled[:, 1:]
+        m = self.margin
+        loose = (self.inner != 0) & ~neighbors[m:m + self.size, m:m + self.size]
+        xs, ys = numpy.nonzero(loose)
+        return list(zip(xs.tolist(), ys.tolist()))
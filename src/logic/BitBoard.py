@@ -0,0 +1,360 @@
+class BitBoard:
+    """compact copy of the cells on a board as python int bitmasks: one occupancy mask plus one mask per
+    power-of-two value (plane n holds the cells of value 2 ** n).
+
+    cell (x, y) is bit y * stride + x. every row carries one spare always-empty bit past its last cell, so
+    shifting a mask sideways can never carry a cell over into the next row.
+
+    only the cells on the board are kept: outside it, the buffer of the current direction is empty and
+    everything else is wall, the same walls Board collides with"""
+    steps = {"down": (0, 1), "up": (0, -1), "right": (1, 0), "left": (-1, 0)}
+    opposites = {"down": "up", "up": "down", "right": "left", "left": "right"}
+
+    def __init__(self, size, direction="down"):
+        self.size = size
+        self.stride = size + 1
+        self.current_direction = direction
+        self.occupancy = 0
+        self.planes = [0]
+        row = (1 << size) - 1
+        self.row_mask = row
+        self.board_mask = sum(row << (y * self.stride) for y in range(size))
+        self.column_mask = sum(1 << (y * self.stride) for y in range(size))
+        # cells a step in each direction would take off the board
+        self.edges = {
+            "down": row << ((size - 1) * self.stride),
+            "up": row,
+            "right": self.column_mask << (size - 1),
+            "left": self.column_mask,
+        }
+
+    @staticmethod
+    def from_board(board):
+        bit_board = BitBoard(board.size, board.current_direction)
+        for x in range(board.size):
+            for y in range(board.size):
+                value = board.get_cell_value((x, y))
+                if value > 0:
+                    bit_board.set_cell_value((x, y), value)
+        return bit_board
+
+    def copy(self):
+        bit_board = BitBoard.__new__(BitBoard)
+        bit_board.__dict__.update(self.__dict__)
+        bit_board.planes = list(self.planes)
+        return bit_board
+
+    def bit(self, coords):
+        return 1 << (coords[1] * self.stride + coords[0])
+
+    def mask(self, cells):
+        """bitmask of the given cells that are on the board"""
+        mask = 0
+        size = self.size
+        stride = self.stride
+        for x, y in cells:
+            if 0 <= x < size and 0 <= y < size:
+                mask |= 1 << (y * stride + x)
+        return mask
+
+    def cells(self, mask):
+        """coordinates of the cells in the given mask, in bit order"""
+        cells = []
+        while mask:
+            low = mask & -mask
+            index = low.bit_length() - 1
+            cells.append((index % self.stride, index // self.stride))
+            mask ^= low
+        return cells
+
+    def shift(self, mask, direction):
+        """the given cells moved one step in the given direction, dropping any that leave the board"""
+        if direction == "down":
+            return (mask << self.stride) & self.board_mask
+        elif direction == "up":
+            return mask >> self.stride
+        elif direction == "right":
+            return (mask << 1) & self.board_mask
+        elif direction == "left":
+            return (mask >> 1) & self.board_mask
+        return mask
+
+    def shift_by(self, mask, direction, steps):
+        """the given cells moved the given number of steps in the given direction, dropping any that leave the
+        board"""
+        if steps >= self.size:
+            return 0
+        if direction == "down":
+            return (mask << (self.stride * steps)) & self.board_mask
+        elif direction == "up":
+            return mask >> (self.stride * steps)
+        # keep only the columns that stay on the board, so no cell carries over into the next row
+        kept = ((1 << (self.size - steps)) - 1) * self.column_mask
+        if direction == "right":
+            return (mask & kept) << steps
+        elif direction == "left":
+            return (mask >> steps) & kept
+        return mask
+
+    def behind(self, mask, direction):
+        """the given cells and every cell past them in the given direction"""
+        span = 1
+        while span < self.size:
+            mask |= self.shift_by(mask, direction, span)
+            span *= 2
+        return mask
+
+    @staticmethod
+    def count(mask):
+        return bin(mask).count("1")
+
+    def is_out_of_bounds(self, coords):
+        x = coords[0]
+        y = coords[1]
+        return x < 0 or y < 0 or x >= self.size or y >= self.size
+
+    def is_in_buffer(self, coords):
+        direction = self.current_direction
+        if direction == "down":
+            return coords[1] < 0
+        elif direction == "up":
+            return coords[1] >= self.size
+        elif direction == "right":
+            return coords[0] < 0
+        elif direction == "left":
+            return coords[0] >= self.size
+
+    def is_wall_edge(self, direction):
+        """does a step off the board in the given direction hit a wall, rather than go back into the buffer"""
+        return BitBoard.opposites[self.current_direction] != direction
+
+    def get_cell_value(self, coords):
+        if self.is_out_of_bounds(coords):
+            return -1
+        bit = self.bit(coords)
+        if not self.occupancy & bit:
+            return 0
+        for n in range(1, len(self.planes)):
+            if self.planes[n] & bit:
+                return 1 << n
+        return 0
+
+    def set_cell_value(self, coords, value):
+        """set a cell on the board to 0 or a power of two"""
+        if self.is_out_of_bounds(coords):
+            raise ValueError("cell %s is not on the board" % (coords,))
+        bit = self.bit(coords)
+        if self.occupancy & bit:
+            self.occupancy &= ~bit
+            for n in range(1, len(self.planes)):
+                self.planes[n] &= ~bit
+            while len(self.planes) > 1 and not self.planes[-1]:
+                self.planes.pop()
+        if value > 0:
+            n = value.bit_length() - 1
+            if value != 1 << n or n == 0:
+                raise ValueError("%s is not a tile value" % value)
+            while len(self.planes) <= n:
+                self.planes.append(0)
+            self.planes[n] |= bit
+            self.occupancy |= bit
+
+    def get_max_cell_value(self):
+        for n in range(len(self.planes) - 1, 0, -1):
+            if self.planes[n]:
+                return 1 << n
+        return 0
+
+    def filled_count(self):
+        return BitBoard.count(self.occupancy)
+
+    def cell_collision_exists(self, coords, exempt_cells):
+        """does the cell in the current direction from the given one block it"""
+        step = BitBoard.steps[self.current_direction]
+        adjacent = (coords[0] + step[0], coords[1] + step[1])
+        if adjacent in exempt_cells:
+            return False
+        if self.is_out_of_bounds(adjacent):
+            return not self.is_in_buffer(adjacent)
+        return self.occupancy & self.bit(adjacent) != 0
+
+    def piece_collision_exists(self, cells):
+        direction = self.current_direction
+        inside = self.mask(cells)
+        # cells on the board: one shift against everything but the piece itself, and the far edge is a wall
+        if inside & self.edges[direction] or self.shift(inside, direction) & self.occupancy & ~inside:
+            return True
+        return any(self.cell_collision_exists(cell, cells) for cell in cells if self.is_out_of_bounds(cell))
+
+    def get_drop_distance(self, cells):
+        """how many cells the given cells can fall together before one of them collides"""
+        direction = self.current_direction
+        inside = self.mask(cells)
+        if len(cells) != bin(inside).count("1"):
+            # part of it is still outside the board, step it in cell by cell
+            step = BitBoard.steps[direction]
+            distance = 0
+            while any(self.is_out_of_bounds(cell) for cell in cells):
+                if self.piece_collision_exists(cells):
+                    return distance
+                cells = [(cell[0] + step[0], cell[1] + step[1]) for cell in cells]
+                distance += 1
+            return distance + self.get_drop_distance(cells)
+        others = self.occupancy & ~inside
+        edge = self.edges[direction]
+        distance = 0
+        while not inside & edge:
+            inside = self.shift(inside, direction)
+            if inside & others:
+                break
+            distance += 1
+        return distance
+
+    def is_shift_blocked(self, cells, direction):
+        """would shift_cells refuse to move the given cells a step in the given direction"""
+        if self.mask(cells) & self.edges[direction] and self.is_wall_edge(direction):
+            return True
+        step = BitBoard.steps[direction]
+        for cell in cells:
+            if self.is_out_of_bounds(cell):
+                adjacent = (cell[0] + step[0], cell[1] + step[1])
+                if self.is_out_of_bounds(adjacent) and not self.is_in_buffer(adjacent):
+                    return True
+        return False
+
+    def shift_merges(self, cells, direction):
+        """would shift_cells merge one of the given cells when moving them a step in the given direction. the
+        values of cells outside the board are unknown here, so only merges between board cells are found"""
+        if self.is_shift_blocked(cells, direction):
+            return False
+        inside = self.mask(cells) & self.occupancy
+        others = self.occupancy & ~inside
+        back = BitBoard.opposites[direction]
+        blocked = 0
+        for plane in self.planes[1:]:
+            moving = inside & plane
+            if self.shift(moving, direction) & plane & others:
+                return True
+            blocked |= moving & self.shift(others & ~plane, back)
+        # a cell stuck behind a different value stays put, so the cell behind it runs into it
+        while blocked:
+            behind = self.shift(blocked, back) & inside
+            for plane in self.planes[1:]:
+                if behind & plane & self.shift(blocked & plane, back):
+                    return True
+            blocked = behind
+        return False
+
+    def line_mask(self, index, direction):
+        """bitmask of the row (for up/down) or column (for left/right) at the given index"""
+        if direction == "down" or direction == "up":
+            return self.row_mask << (index * self.stride)
+        return self.column_mask << index
+
+    def is_row_complete(self, row):
+        """is the given row/column of cells complete"""
+        mask = self.mask(row)
+        return self.occupancy & mask == mask
+
+    def is_line_complete(self, index, direction):
+        """is the row (for up/down) or column (for left/right) at the given index full"""
+        mask = self.line_mask(index, direction)
+        return self.occupancy & mask == mask
+
+    def line_starts(self, direction=None):
+        """bitmask of the first cell of every full row (for up/down) or column (for left/right)"""
+        direction = direction or self.current_direction
+        step = 1 if direction == "down" or direction == "up" else self.stride
+        # fold the board onto itself until each bit says whether the whole line from there on is filled
+        full = self.occupancy
+        span = 1
+        while span * 2 <= self.size:
+            full &= full >> (step * span)
+            span *= 2
+        if span < self.size:
+            full &= full >> (step * (self.size - span))
+        if step == 1:
+            return full & self.column_mask
+        return full & self.row_mask
+
+    def completed_lines(self, direction=None):
+        """indices of the full rows (for up/down) or columns (for left/right), defaults to the current direction"""
+        starts = self.line_starts(direction)
+        if not starts:
+            return []
+        direction = direction or self.current_direction
+        axis = 1 if direction == "down" or direction == "up" else 0
+        return [cell[axis] for cell in self.cells(starts)]
+
+    def line_merges(self, direction=None):
+        """bitmask of the cells in complete lines with a matching cell right above them, ready to merge"""
+        direction = direction or self.current_direction
+        lines = 0
+        for i in self.completed_lines(direction):
+            lines |= self.line_mask(i, direction)
+        if not lines:
+            return 0
+        merges = 0
+        for plane in self.planes[1:]:
+            merges |= plane & lines & self.shift(plane, direction)
+        return merges
+
+    def compact(self, direction=None):
+        """slide every cell as far as it goes in the given direction, keeping their order per lane, as
+        Board.static_drop does"""
+        direction = direction or self.current_direction
+        vertical = direction == "down" or direction == "up"
+        toward_end = direction == "down" or direction == "right"
+        for lane in range(self.size):
+            lane_mask = self.line_mask(lane, "left" if vertical else "down")
+            if not self.occupancy & lane_mask:
+                continue
+            cells = self.cells(self.occupancy & lane_mask)
+            values = [self.get_cell_value(cell) for cell in cells]
+            self.occupancy &= ~lane_mask
+            for n in range(1, len(self.planes)):
+                self.planes[n] &= ~lane_mask
+            start = self.size - len(cells) if toward_end else 0
+            for i, value in enumerate(values):
+                self.set_cell_value((lane, start + i) if vertical else (start + i, lane), value)
+
+    def drop_piece(self, cells, value):
+        """a copy with the given cells dropped as far as they go and set to the given value, then merged into what
+        they landed on as Board.handle_active_piece_collision does. None if the cells are not all on empty board
+        cells to begin with"""
+        inside = self.mask(cells)
+        if inside & self.occupancy or len(cells) != BitBoard.count(inside):
+            return None
+        direction = self.current_direction
+        landed = self.shift_by(inside, direction, self.get_drop_distance(cells))
+        n = value.bit_length() - 1
+        board = self.copy()
+        while len(board.planes) <= n + 1:
+            board.planes.append(0)
+        plane = board.planes[n]
+        # the piece cells with nothing of the piece ahead of them, and what they landed on
+        leading = landed & ~self.shift(landed, BitBoard.opposites[direction])
+        below = self.shift(leading, direction)
+        if leading & self.edges[direction] or below & self.occupancy & ~plane or not below & plane:
+            # a wall or a different value in the way keeps the piece whole where it landed
+            board.planes[n] = plane | landed
+            board.occupancy |= landed
+        else:
+            # every cell moves one more step, the ones running into their value merge with it
+            moved = self.shift(landed, direction)
+            merges = below & plane
+            board.planes[n] = (plane | moved) & ~merges
+            board.planes[n + 1] |= merges
+            board.occupancy |= moved
+        while len(board.planes) > 1 and not board.planes[-1]:
+            board.planes.pop()
+        return board
+
+    def __eq__(self, other):
+        return isinstance(other, BitBoard) and self.size == other.size and \
+               self.current_direction == other.current_direction and self.occupancy == other.occupancy and \
+               self.planes == other.planes
+
+    def __hash__(self):
+        return hash((self.size, self.current_direction, self.occupancy, tuple(self.planes)))
+
@@ -1,17 +1,84 @@
+import random
+from heapq import heapify, heappop, heappush
+from types import MappingProxyType
+from src.logic.CellTables import CellTables
+from src.logic.LandingIndex import LandingIndex
+from src.logic.MoveGenerator import MoveGenerator
+from src.logic.Piece import Piece
 from src.logic.PieceFactory import PieceFactory
+from src.logic.PieceGenerator import PieceGenerator
+from src.logic.Profiler import Profiler
 from src.logic.TransformPiece import TransformPiece
+from src.logic.Zobrist import Zobrist
 
 
 class Board:
-    def __init__(self, size):
+    # where the profile debug command writes its results
+    profile_path = "profile.json"
+
+    def __init__(self, size, piece_generator=None):
         """Represents the grid, its cell values, and active piece"""
         self.size = size
+        # neighbor, column and line order lookups shared by every board of this size
+        self.tables = CellTables.get(size)
+        # where new pieces come from, the global random module unless a seeded generator is given
+        self.piece_generator = piece_generator or PieceGenerator(rng=random)
+        # number of filled cells in each row (indexed by y) and column (indexed by x) of the board
+        self.row_counts = [0] * size
+        self.column_counts = [0] * size
+        # positions of the filled cells along each column and row, to find where dropped cells land
+        self.landing_index = LandingIndex()
+        # cells filled or emptied since the last drop_unattached: only they and their neighbors can have come loose
+        self.unsettled_cells = set()
+        # cell -> value before its first change since the last take_changed_cells, recorded once track_changes is
+        # called
+        self.changed_cells = None
+        # Zobrist keys of every filled cell XORed together, for state_hash
+        self.cells_hash = 0
+        # value -> number of cells holding it, so the max tile takes no scan of the grid
+        self.value_counts = {}
         self.grid = {}
         self.init_grid(size)
         self.current_direction = "down"
         # if not empty, should be 4 tuples representing the coordinates of the moving piece
         self.active_piece = None
         self.game_over = False
+        # total value of the tiles made by merges so far, the score 2048 keeps
+        self.merged_value = 0
+        # timing the phases of update_grid while set, see Profiler
+        self.profiler = None
+
+    @property
+    def grid(self):
+        """read-only view of the cell values. writes go through set_cell_value, which keeps the counts, the landing
+        index, the unsettled cells, the hash and the value counts in step with them"""
+        return self._grid_view
+
+    @grid.setter
+    def grid(self, grid):
+        """replace the cell values, rebuilding everything derived from them"""
+        self._grid = grid
+        # one view per grid, so it can still be told apart from the next one by identity
+        self._grid_view = MappingProxyType(grid)
+        self.index_grid()
+
+    def index_grid(self):
+        """rebuild everything derived from the cell values from scratch: the row and column counts, the landing
+        index, the unsettled cells, the cells hash and the value counts"""
+        self.row_counts = [0] * self.size
+        self.column_counts = [0] * self.size
+        self.landing_index = LandingIndex()
+        self.unsettled_cells = set()
+        self.cells_hash = Zobrist.grid_hash(self._grid)
+        self.value_counts = {}
+        for coords, value in self._grid.items():
+            if value > 0:
+                self.count_value(value, 1)
+                self.landing_index.add(coords)
+                self.unsettled_cells.add(coords)
+                if not self.is_out_of_bounds(coords):
+                    self.row_counts[coords[1]] += 1
+                    self.column_counts[coords[0]] += 1
 
     def init_grid(self, size):
         for x in range(size):
@@ -34,21 +101,70 @@ class Board:
             self.game_over = True
 
     def get_max_cell_value(self):
-        return max(list(self.grid.values()))
+        return max(self.value_counts) if self.value_counts else 0
+
+    def count_value(self, value, change):
+        count = self.value_counts.get(value, 0) + change
+        if count:
+            self.value_counts[value] = count
+        else:
+            del self.value_counts[value]
 
     def get_cell_value(self, coords):
-        value = self.grid.get(coords)
+        value = self._grid.get(coords)
         return value if value is not None else -1
 
     def set_cell_value(self, coords, value):
-        self.grid[coords] = value
+        previous = self._grid.get(coords, -1)
+        if previous != value:
+            if self.changed_cells is not None:
+                self.changed_cells.setdefault(coords, previous)
+            if previous > 0:
+                self.cells_hash ^= Zobrist.cell_key(coords, previous)
+                self.count_value(previous, -1)
+            if value > 0:
+                self.cells_hash ^= Zobrist.cell_key(coords, value)
+                self.count_value(value, 1)
+        was_filled = previous > 0
+        if was_filled != (value > 0):
+            if was_filled:
+                self.landing_index.remove(coords)
+            else:
+                self.landing_index.add(coords)
+            self.unsettled_cells.add(coords)
+            x = coords[0]
+            y = coords[1]
+            if 0 <= x < self.size and 0 <= y < self.size:
+                change = -1 if was_filled else 1
+                self.row_counts[y] += change
+                self.column_counts[x] += change
+        self._grid[coords] = value
+
+    def state_hash(self):
+        """64-bit hash of the cell values, the active piece and the direction. the cells are hashed as they are set,
+        so this costs the same on any board size"""
+        return self.get_cells_hash() ^ Zobrist.piece_key(self.active_piece) ^ \
+            Zobrist.direction_keys[self.current_direction]
+
+    def get_cells_hash(self):
+        return self.cells_hash
+
+    def track_changes(self):
+        """start recording which cells change, for take_changed_cells"""
+        self.changed_cells = {}
+
+    def take_changed_cells(self):
+        """the cells whose value changed since the last call. a cell changed and changed back in between is left out"""
+        changed = {coords for coords, value in self.changed_cells.items() if self.get_cell_value(coords) != value}
+        self.changed_cells = {}
+        return changed
 
     def place_new_piece(self):
         """Place a new random piece at the start point and make that the active piece"""
-        new_piece = PieceFactory.get_piece()
-        new_piece = TransformPiece.transform(new_piece, PieceFactory.get_start_point(self.size, self.current_direction))
+        new_piece, value = self.piece_generator.next_piece()
+        new_piece = TransformPiece.transform(Piece.from_cells(new_piece),
+                                             PieceFactory.get_start_point(self.size, self.current_direction))
         self.active_piece = new_piece
-        value = PieceFactory.get_value()
         for cell in self.active_piece:
             self.set_cell_value(cell, value)
         if self.piece_collision_exists(self.active_piece):
@@ -60,8 +176,7 @@ class Board:
 
     def get_adjacent_value(self, coords, direction):
         """get the value of the adjacent cell. empty cell has a value of zero. nonexistent cell has a value of -1"""
-        adjacent = TransformPiece.get_adjacent_coordinates(coords, direction)
-        return self.get_cell_value(adjacent)
+        return self.get_cell_value(self.tables.neighbor(coords, direction))
 
     def is_out_of_bounds(self, coords):
         x = coords[0]
@@ -69,7 +184,7 @@ class Board:
         return x < 0 or y < 0 or x >= self.size or y >= self.size
 
     def cell_collision_exists(self, coords, exempt_cells):
-        adjacent_coords = TransformPiece.get_adjacent_coordinates(coords, self.current_direction)
+        adjacent_coords = self.tables.neighbor(coords, self.current_direction)
         adjacent_value = self.get_cell_value(adjacent_coords)
         return adjacent_coords not in exempt_cells and \
                (adjacent_value > 0 or
@@ -129,6 +244,7 @@ class Board:
             space_val = self.get_cell_value(new_cell)
             if space_val == val:
                 self.set_cell_value(new_cell, val * 2)
+                self.merged_value += val * 2
                 collision = True
             else:
                 self.set_cell_value(new_cell, val)
@@ -137,13 +253,44 @@ class Board:
             self.game_over = True
 
 
+    def get_placements(self, max_ticks=None):
+        """every spot the active piece can come to rest through shifts, rotations and drops, each with the shortest
+        inputs getting it there, see MoveGenerator"""
+        return MoveGenerator.get_placements(self, max_ticks)
+
     def static_drop(self):
         """Drop all cells on the board as individuals, including the active piece"""
         if self.any_in_buffer(self.active_piece):
             return
-        for cell in TransformPiece.sort_cells(self.grid.keys(), self.current_direction):
+        # a dropped cell stops next to the first filled cell it meets without merging, so each column/row just
+        # packs its cells against the wall in their current order
+        vertical = self.current_direction == "down" or self.current_direction == "up"
+        lanes = self.landing_index.columns if vertical else self.landing_index.rows
+        # lanes with nothing in them have nothing to move
+        for lane in sorted(lane for lane in lanes if 0 <= lane < self.size):
+            self.compact_lane(lane, self.current_direction)
+        # cells outside the board can only fall in from the buffer, after everything on the board has landed
+        outside = [cell for cell in self.landing_index.cells() if self.is_out_of_bounds(cell)]
+        for cell in TransformPiece.sort_cells(outside, self.current_direction):
             self.drop([cell])
 
+    def compact_lane(self, lane, direction):
+        """slide the filled board cells of the column (for up/down) or row (for left/right) at the given index as far
+        as they go in the given direction, keeping their order"""
+        vertical = direction == "down" or direction == "up"
+        positions = [p for p in self.landing_index.lane(lane, vertical) if 0 <= p < self.size]
+        if direction == "down" or direction == "right":
+            # bottom cells first, so no cell lands on one that has yet to move
+            moves = zip(reversed(positions), range(self.size - 1, -1, -1))
+        else:
+            moves = zip(positions, range(self.size))
+        for position, target in moves:
+            if position == target:
+                continue
+            cell = (lane, position) if vertical else (position, lane)
+            self.set_cell_value((lane, target) if vertical else (target, lane), self.get_cell_value(cell))
+            self.clear_cell(cell)
+
     def shift_active_piece(self, direction):
         if self.current_direction == direction:
             return
@@ -161,10 +308,47 @@ class Board:
 
     def drop(self, cells):
         """drop the given cell(s) until at least one reaches a collision"""
-        while not self.piece_collision_exists(cells):
-            self.shift_cells(cells, self.current_direction)
-            cells = TransformPiece.shift_coordinates(cells, self.current_direction)
-        return cells
+        distance = self.get_drop_distance(cells)
+        if distance == 0:
+            return cells
+        direction = self.current_direction
+        step = TransformPiece.get_direction_vector(direction)
+        offset = (step[0] * distance, step[1] * distance)
+        # bottom cells first, so no cell lands on one that has yet to move
+        for cell in TransformPiece.sort_cells(cells, direction):
+            value = self.get_cell_value(cell)
+            if value < 1:
+                continue
+            self.set_cell_value((cell[0] + offset[0], cell[1] + offset[1]), value)
+            self.clear_cell(cell)
+        return TransformPiece.transform(cells, offset)
+
+    def get_drop_distance(self, cells):
+        """how many cells the given cells can fall together before one of them collides"""
+        direction = self.current_direction
+        # a cell with another of the given cells right below it can never be the one that collides
+        return min(self.get_landing_distance(cell) for cell in cells
+                   if self.tables.neighbor(cell, direction) not in cells)
+
+    def get_landing_distance(self, coords):
+        """how many cells the given cell can fall before the next one is filled, or a wall"""
+        direction = self.current_direction
+        forward = direction == "down" or direction == "right"
+        axis = 1 if direction == "down" or direction == "up" else 0
+        start = coords[axis]
+        lane = coords[1 - axis]
+        # the wall is the first cell past the start that is neither on the board nor in the buffer
+        if 0 <= lane < self.size:
+            wall = max(self.size, start + 1) if forward else min(-1, start - 1)
+        else:
+            wall = max(0, start + 1) if forward else min(self.size - 1, start - 1)
+        step = 1 if forward else -1
+        while self.get_cell_value((lane, wall) if axis == 1 else (wall, lane)) == 0:
+            wall += step
+        filled = self.landing_index.next_filled(coords, direction)
+        if filled is not None and (filled < wall if forward else filled > wall):
+            wall = filled
+        return abs(wall - start) - 1
 
     def is_row_complete(self, row):
         """is the given row/column of cells complete"""
@@ -172,94 +356,104 @@ class Board:
 
     def shift_column(self, coords, direction):
         """shifts the given column/row by one to fill the given empty cell"""
-        self.shift_cells(self.get_column(coords, direction), direction)
+        self.shift_cells(self.get_filled_column(coords, direction), direction)
 
     def get_column(self, coords, direction):
         """gets the remainder of the column/row above the given empty cell"""
-        column = []
-        x = coords[0]
-        y = coords[1]
-        if direction == "down":
-            # x, 0-y
-            for i in range(y):
-                column.append((x, i))
-        elif direction == "right":
-            # 0-x, y
-            for i in range(x):
-                column.append((i, y))
-        elif direction == "up":
-            # x, y-last
-            for i in range(y + 1, self.size):
-                column.append((x, i))
-        elif direction == "left":
-            # x-last, y
-            for i in range(x + 1, self.size):
-                column.append((i, y))
-
-        return column
+        vertical = direction == "down" or direction == "up"
+        lane = self.tables.lane(coords[0] if vertical else coords[1], vertical)
+        position = coords[1] if vertical else coords[0]
+        if direction == "down" or direction == "right":
+            return list(lane[:position])
+        return list(lane[position + 1:])
+
+    def get_filled_column(self, coords, direction):
+        """the filled cells of get_column, the only ones shifting the column moves"""
+        vertical = direction == "down" or direction == "up"
+        lane = coords[0] if vertical else coords[1]
+        start = coords[1] if vertical else coords[0]
+        if direction == "down" or direction == "right":
+            positions = [p for p in self.landing_index.lane(lane, vertical) if 0 <= p < start]
+        else:
+            positions = [p for p in self.landing_index.lane(lane, vertical) if start < p < self.size]
+        return [(lane, p) if vertical else (p, lane) for p in positions]
 
     def get_column_inclusive(self, coords, direction):
         """returns the column up to and including the given cell"""
-        column = self.get_column(coords, direction)
-        column.append(coords)
-        # sort so the given cell isn't just tacked on the end
-        if direction == "up" or direction == "down":
-            # sort by y
-            column.sort(key=lambda c: c[1])
-        elif direction == "left" or direction == "right":
-            # sort by x
-            column.sort(key=lambda c: c[0])
-
-        return column
+        vertical = direction == "down" or direction == "up"
+        lane = self.tables.lane(coords[0] if vertical else coords[1], vertical)
+        position = coords[1] if vertical else coords[0]
+        if direction == "down" or direction == "right":
+            return list(lane[:position + 1])
+        return list(lane[position:])
 
     def do_static_merge(self, top_cell, bottom_cell):
         """if their values match, merge the given cells and shift others accordingly"""
         if self.get_cell_value(top_cell) != self.get_cell_value(bottom_cell):
             return
         self.set_cell_value(top_cell, self.get_cell_value(top_cell) * 2)
+        self.merged_value += self.get_cell_value(top_cell)
         self.clear_cell(bottom_cell)
         self.shift_column(bottom_cell, self.current_direction)
         self.drop_unattached()
 
+    def is_line_complete(self, index, direction):
+        """is the row (for up/down) or column (for left/right) at the given index full"""
+        if direction == "down" or direction == "up":
+            return self.row_counts[index] == self.size
+        return self.column_counts[index] == self.size
+
+    def completed_lines(self, direction=None):
+        """indices of the full rows (for up/down) or columns (for left/right), defaults to the current direction"""
+        direction = direction or self.current_direction
+        return [i for i in range(self.size) if self.is_line_complete(i, direction)]
+
+    def get_line(self, index, direction):
+        """the cells of the row (for up/down) or column (for left/right) at the given index"""
+        return list(self.tables.line(index, direction))
+
     def merge_with_completed_rows(self):
         """check for completed rows and merge matching cells down into them"""
-        if self.current_direction == "down":
-            # each row starting at the bottom
-            for i in reversed(range(self.size)):
-                row = self.get_column_inclusive((0, i), "left")
-                if self.is_row_complete(row):
-                    for cell in row:
-                        cell_above = TransformPiece.get_adjacent_coordinates(cell, "up")
-                        self.do_static_merge(cell_above, cell)
-        elif self.current_direction == "right":
-            for i in reversed(range(self.size)):
-                row = self.get_column_inclusive((0, i), "down")
-                if self.is_row_complete(row):
-                    for cell in row:
-                        cell_above = TransformPiece.get_adjacent_coordinates(cell, "left")
-                        self.do_static_merge(cell_above, cell)
-        elif self.current_direction == "up":
-            for i in range(self.size):
-                row = self.get_column_inclusive((0, i), "left")
-                if self.is_row_complete(row):
-                    for cell in row:
-                        cell_above = TransformPiece.get_adjacent_coordinates(cell, "down")
-                        self.do_static_merge(cell_above, cell)
-        elif self.current_direction == "left":
-            for i in range(self.size):
-                row = self.get_column_inclusive((0, i), "down")
-                if self.is_row_complete(row):
-                    for cell in row:
-                        cell_above = TransformPiece.get_adjacent_coordinates(cell, "right")
-                        self.do_static_merge(cell_above, cell)
+        direction = self.current_direction
+        above = TransformPiece.get_opposite_direction(direction)
+        # each row starting at the bottom
+        for i in self.tables.line_orders[direction]:
+            if self.is_line_complete(i, direction):
+                for cell in self.tables.line(i, direction):
+                    self.do_static_merge(self.tables.neighbor(cell, above), cell)
 
     def drop_unattached(self):
         """find all pieces not attached to any others and drop them"""
-        for x in range(self.size):
-            for y in range(self.size):
-                coords = (x, y)
-                if self.is_cell_unattached(coords):
-                    self.drop([coords])
+        # visits the same cells in the same (x, y) order as a scan of the whole board would, minus the ones that
+        # cannot have come loose. cells unsettled by a drop are picked up if the scan has yet to pass them
+        pending = self.take_unsettled_neighborhood()
+        heapify(pending)
+        deferred = set()
+        previous = None
+        while pending:
+            coords = heappop(pending)
+            if coords == previous:
+                continue
+            previous = coords
+            if not self.is_cell_unattached(coords):
+                continue
+            self.drop([coords])
+            for cell in self.take_unsettled_neighborhood():
+                if cell > coords:
+                    heappush(pending, cell)
+                else:
+                    deferred.add(cell)
+        self.unsettled_cells |= deferred
+
+    def take_unsettled_neighborhood(self):
+        """the board cells that are unsettled or next to an unsettled cell, marking them all as settled"""
+        neighborhood = set()
+        for x, y in self.unsettled_cells:
+            for cell in ((x, y), (x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if 0 <= cell[0] < self.size and 0 <= cell[1] < self.size:
+                    neighborhood.add(cell)
+        self.unsettled_cells = set()
+        return list(neighborhood)
 
     def is_cell_unattached(self, coords):
         return self.get_cell_value(coords) != 0 \
@@ -274,8 +468,7 @@ class Board:
             if self.get_cell_value(cell) <= 0:
                 # ignore empty cells
                 continue
-            surrounding_cells = list(map(lambda direction: TransformPiece.get_adjacent_coordinates(cell, direction),
-                                         ["up", "down", "left", "right"]))
+            surrounding_cells = [self.tables.neighbor(cell, direction) for direction in ["up", "down", "left", "right"]]
             no_outside_adjacents = all(self.get_cell_value(xy) <= 0 or xy in piece for xy in surrounding_cells)
             is_unattached = is_unattached and no_outside_adjacents
         return is_unattached
@@ -283,7 +476,7 @@ class Board:
     def handle_active_piece_collision(self):
         cells_to_merge = []
         for cell in self.active_piece:
-            adjacent_cell = TransformPiece.get_adjacent_coordinates(cell, self.current_direction)
+            adjacent_cell = self.tables.neighbor(cell, self.current_direction)
             if adjacent_cell in self.active_piece:
                 continue
             adjacent_value = self.get_adjacent_value(cell, self.current_direction)
@@ -296,10 +489,11 @@ class Board:
         for cell in new_piece:
             if cell in cells_to_merge:
                 # do merge
-                self.set_cell_value(TransformPiece.get_adjacent_coordinates(cell, self.current_direction), self.get_cell_value(cell) * 2)
+                self.set_cell_value(self.tables.neighbor(cell, self.current_direction), self.get_cell_value(cell) * 2)
+                self.merged_value += self.get_cell_value(cell) * 2
             else:
                 # shift down
-                self.set_cell_value(TransformPiece.get_adjacent_coordinates(cell, self.current_direction), self.get_cell_value(cell))
+                self.set_cell_value(self.tables.neighbor(cell, self.current_direction), self.get_cell_value(cell))
             self.clear_cell(cell)
         if self.any_in_buffer(new_piece):
             self.game_over = True
@@ -318,7 +512,7 @@ class Board:
             value = self.get_cell_value(cell)
             if value < 1:
                 continue
-            adjacent_coords = TransformPiece.get_adjacent_coordinates(cell, direction)
+            adjacent_coords = self.tables.neighbor(cell, direction)
             adjacent_value = self.get_cell_value(adjacent_coords)
             if adjacent_value == -1 and not self.is_in_buffer(adjacent_coords):
                 return
@@ -327,7 +521,7 @@ class Board:
             value = self.get_cell_value(cell)
             if value < 1:
                 continue
-            adjacent_coords = TransformPiece.get_adjacent_coordinates(cell, direction)
+            adjacent_coords = self.tables.neighbor(cell, direction)
             adjacent_value = self.get_cell_value(adjacent_coords)
             if adjacent_value < 1:
                 # shift cell into empty space
@@ -336,6 +530,7 @@ class Board:
             elif adjacent_value == value:
                 # do merge
                 self.set_cell_value(adjacent_coords, value * 2)
+                self.merged_value += value * 2
                 self.clear_cell(cell)
                 merge = True
         return merge
@@ -352,7 +547,17 @@ class Board:
     def debug(self, command):
         if command == "print_grid":
             # print the current grid as a visualized array
-            Board.visualize(self.grid, self.size)
+            Board.visualize(self._grid, self.size)
+        elif command == "profile":
+            # the first press starts timing the phases of update_grid, the next one reports and stops
+            if self.profiler is None:
+                Profiler().attach(self)
+                print("profiling update_grid")
+            else:
+                print(self.profiler.format())
+                self.profiler.dump(Board.profile_path)
+                print("profile saved to %s" % Board.profile_path)
+                self.profiler.detach()
 
     @staticmethod
     def visualize(grid, board_size=16):
@@ -364,3 +569,13 @@ class Board:
                 row.append(grid[(j, i)])
             visual_grid.append(row)
         print(visual_grid)
+
+    @staticmethod
+    def grid_from_visual_grid(visual_grid):
+        """the grid of a visual 2D array of values, rows top to bottom, the reverse of visualize"""
+        grid = {}
+        for y in range(len(visual_grid)):
+            row = visual_grid[y]
+            for x in range(len(row)):
+                grid[(x, y)] = row[x]
+        return grid
@@ -0,0 +1,55 @@
+from src.logic.TransformPiece import TransformPiece
+
+
+class CellTables:
+    """lookups for one board size, built once and shared by every board of that size: the neighbor of each cell in
+    each direction, the cells of each column and row, and the order lines are visited in bottom first"""
+    # boards bigger than this work neighbors out instead of keeping a table of them, which would take too much memory
+    max_neighbor_size = 64
+    # how far past the board edges the neighbor tables reach, enough for the buffer
+    margin = 8
+    # size -> CellTables
+    cache = {}
+
+    def __init__(self, size):
+        self.size = size
+        # direction -> {cell: the cell next to it in that direction}
+        self.neighbors = {direction: {} for direction in TransformPiece.vectors}
+        if size <= CellTables.max_neighbor_size:
+            span = range(-CellTables.margin, size + CellTables.margin)
+            for direction, (dx, dy) in TransformPiece.vectors.items():
+                self.neighbors[direction] = {(x, y): (x + dx, y + dy) for x in span for y in span}
+        # (index, vertical) -> cells of the column (vertical) or row at that index, filled in as they are asked for
+        self.lanes = {}
+        # direction -> indices of the rows (for up/down) or columns (for left/right), bottom first
+        self.line_orders = {direction: tuple(range(size - 1, -1, -1)) if direction in ("down", "right")
+                            else tuple(range(size)) for direction in TransformPiece.vectors}
+
+    @staticmethod
+    def get(size):
+        tables = CellTables.cache.get(size)
+        if tables is None:
+            tables = CellTables.cache[size] = CellTables(size)
+        return tables
+
+    def neighbor(self, coords, direction):
+        """the cell next to the given one in the given direction"""
+        adjacent = self.neighbors[direction].get(coords)
+        if adjacent is None:
+            return TransformPiece.get_adjacent_coordinates(coords, direction)
+        return adjacent
+
+    def lane(self, index, vertical):
+        """the board cells of the column (vertical) or row at the given index, by increasing position"""
+        cells = self.lanes.get((index, vertical))
+        if cells is None:
+            if vertical:
+                cells = tuple((index, position) for position in range(self.size))
+            else:
+                cells = tuple((position, index) for position in range(self.size))
+            self.lanes[(index, vertical)] = cells
+        return cells
+
+    def line(self, index, direction):
+        """the cells of the row (for up/down) or column (for left/right) at the given index"""
+        return self.lane(index, direction == "left" or direction == "right")
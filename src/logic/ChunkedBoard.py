@@ -0,0 +1,31 @@
+from src.logic.Board import Board
+from src.logic.ChunkedGrid import ChunkedGrid
+
+
+class ChunkedBoard(Board):
+    """Board on a ChunkedGrid, for boards far too big to keep every cell of: memory and the cost of a tick grow with
+    the filled area instead of the board area"""
+
+    @Board.grid.setter
+    def grid(self, grid):
+        if not isinstance(grid, ChunkedGrid):
+            grid = ChunkedGrid.from_dict(self.size, grid)
+        Board.grid.fset(self, grid)
+
+    @property
+    def chunked_grid(self):
+        """the ChunkedGrid behind grid, for looking at its chunks. writes still go through set_cell_value"""
+        return self._grid
+
+    def init_grid(self, size):
+        # a chunked grid starts out with every board cell empty
+        pass
+
+    def get_cell_value(self, coords):
+        return self._grid.get(coords, -1)
+
+    def merge_with_completed_rows(self):
+        """check for completed rows and merge matching cells down into them"""
+        # a complete line takes size filled cells, which a big board rarely has in total
+        if self._grid.filled >= self.size:
+            Board.merge_with_completed_rows(self)
@@ -0,0 +1,115 @@
+from collections.abc import MutableMapping
+
+
+class ChunkedGrid(MutableMapping):
+    """grid backend for very large boards: the board is cut into chunk_size x chunk_size chunks, and a chunk only
+    takes memory while one of its cells is filled. cells outside the board live in a plain dict.
+
+    looks up like the tuple-keyed dict used by Board, every board cell existing and holding 0 when empty, but only
+    iterates the filled board cells and the cells outside the board, so walking it costs the filled area
+    """
+    default_chunk_size = 16
+
+    def __init__(self, size, chunk_size=default_chunk_size):
+        self.size = size
+        self.chunk_size = chunk_size
+        # (chunk x, chunk y) -> the values of the chunk's cells, row by row
+        self.chunks = {}
+        # (chunk x, chunk y) -> number of filled cells in that chunk
+        self.chunk_counts = {}
+        # value -> number of board cells holding it
+        self.value_counts = {}
+        self.filled = 0
+        # cells outside the board holding anything but -1
+        self.outside = {}
+
+    @staticmethod
+    def from_dict(size, grid, chunk_size=default_chunk_size):
+        chunked_grid = ChunkedGrid(size, chunk_size)
+        for coords, value in grid.items():
+            chunked_grid[coords] = value
+        return chunked_grid
+
+    def is_in_board(self, coords):
+        return 0 <= coords[0] < self.size and 0 <= coords[1] < self.size
+
+    def get(self, coords, default=None):
+        x = coords[0]
+        y = coords[1]
+        if 0 <= x < self.size and 0 <= y < self.size:
+            c = self.chunk_size
+            chunk = self.chunks.get((x // c, y // c))
+            return chunk[(y % c) * c + x % c] if chunk is not None else 0
+        return self.outside.get(coords, default)
+
+    def __getitem__(self, coords):
+        value = self.get(coords)
+        if value is None:
+            raise KeyError(coords)
+        return value
+
+    def __setitem__(self, coords, value):
+        if not self.is_in_board(coords):
+            if value == -1:
+                self.outside.pop(coords, None)
+            else:
+                self.outside[coords] = value
+            return
+        c = self.chunk_size
+        key = (coords[0] // c, coords[1] // c)
+        index = (coords[1] % c) * c + coords[0] % c
+        chunk = self.chunks.get(key)
+        previous = chunk[index] if chunk is not None else 0
+        if previous > 0:
+            self.count_value(previous, -1)
+            self.chunk_counts[key] -= 1
+        if value > 0:
+            if chunk is None:
+                chunk = self.chunks[key] = [0] * (c * c)
+                self.chunk_counts[key] = 0
+            chunk[index] = value
+            self.chunk_counts[key] += 1
+            self.count_value(value, 1)
+        elif chunk is not None:
+            chunk[index] = 0
+            if not self.chunk_counts[key]:
+                # the last filled cell of the chunk is gone, so is the chunk
+                del self.chunks[key]
+                del self.chunk_counts[key]
+
+    def count_value(self, value, change):
+        count = self.value_counts.get(value, 0) + change
+        if count:
+            self.value_counts[value] = count
+        else:
+            del self.value_counts[value]
+        self.filled += change
+
+    def __delitem__(self, coords):
+        if self.is_in_board(coords):
+            self[coords] = 0
+        else:
+            del self.outside[coords]
+
+    def __contains__(self, coords):
+        return self.is_in_board(coords) or coords in self.outside
+
+    def __iter__(self):
+        c = self.chunk_size
+        for (chunk_x, chunk_y), chunk in list(self.chunks.items()):
+            for index, value in enumerate(chunk):
+                if value > 0:
+                    yield chunk_x * c + index % c, chunk_y * c + index // c
+        yield from list(self.outside)
+
+    def __len__(self):
+        return self.filled + len(self.outside)
+
+    def copy(self):
+        return dict(self.items())
+
+    def max_value(self):
+        max_value = max(self.value_counts) if self.value_counts else 0
+        if self.outside:
+            max_value = max(max_value, max(self.outside.values()))
+        return max_value
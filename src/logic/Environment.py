@@ -0,0 +1,137 @@
+import numpy
+from src.logic.Action import Action
+from src.logic.ArrayBoard import ArrayBoard
+from src.logic.PieceGenerator import PieceGenerator
+
+
+class Environment:
+    """reinforcement learning style wrapper around one board: reset(seed) starts a game, step(action) gives one
+    action, runs one tick and returns (observation, reward, done, info), as Simulator.play does per tick.
+
+    actions are indices into Environment.actions, 0 doing nothing. an observation is a uint8 array of
+    Environment.channels planes the size of the board: log2 of the cell values (0 for empty), the active piece
+    cells, then one plane per direction in Action.directions that is all ones for the current direction. planes are
+    indexed [x, y], like ArrayGrid.
+
+    the reward is the value of the tiles merged during the tick plus, whenever the max tile grows, the new max tile,
+    each scaled by its weight"""
+    actions = [None] + Action.all
+    channels = 2 + len(Action.directions)
+
+    def __init__(self, size=16, max_ticks=10000, board_type=ArrayBoard, merge_weight=1.0, max_tile_weight=1.0):
+        self.size = size
+        self.max_ticks = max_ticks
+        self.board_type = board_type
+        self.merge_weight = merge_weight
+        self.max_tile_weight = max_tile_weight
+        self.board = None
+        self.tick = 0
+        self.max_tile = 0
+
+    def observation_shape(self):
+        return Environment.channels, self.size, self.size
+
+    def start(self, seed=None):
+        """start a new game without building an observation"""
+        self.board = self.board_type(self.size, PieceGenerator(seed))
+        # the first tick only places a piece, as in Simulator.play
+        self.board.update_grid()
+        self.tick = 1
+        self.max_tile = self.board.get_max_cell_value()
+
+    def reset(self, seed=None):
+        self.start(seed)
+        return Environment.observe([self.board])[0]
+
+    def advance(self, action):
+        """apply the action with the given index and run one tick, returns (reward, done, info)"""
+        board = self.board
+        merged = board.merged_value
+        name = Environment.actions[action]
+        if name is not None:
+            Action.apply(board, name)
+        board.update_grid()
+        self.tick += 1
+        reward = self.merge_weight * (board.merged_value - merged)
+        max_tile = board.get_max_cell_value()
+        if max_tile > self.max_tile:
+            reward += self.max_tile_weight * max_tile
+            self.max_tile = max_tile
+        done = board.game_over or self.tick >= self.max_ticks
+        info = {
+            "tick": self.tick,
+            "max_tile": max_tile,
+            "merged_value": board.merged_value,
+            "game_over": board.game_over,
+            "timed_out": not board.game_over and self.tick >= self.max_ticks,
+        }
+        return reward, done, info
+
+    def step(self, action):
+        reward, done, info = self.advance(action)
+        return Environment.observe([self.board])[0], reward, done, info
+
+    @staticmethod
+    def observe(boards, out=None):
+        """observations of the given boards, which must all be the same size, stacked into one array. the cell
+        values of every board go through one log2 together"""
+        size = boards[0].size
+        if out is None:
+            out = numpy.empty((len(boards), Environment.channels, size, size), dtype=numpy.uint8)
+        values = numpy.empty((len(boards), size, size), dtype=numpy.int64)
+        for i, board in enumerate(boards):
+            if isinstance(board, ArrayBoard):
+                values[i] = board.array_grid.inner
+            else:
+                grid = board.grid
+                values[i] = [[grid[(x, y)] for y in range(size)] for x in range(size)]
+        out[:, 0] = numpy.log2(numpy.maximum(values, 1))
+        out[:, 1:] = 0
+        for i, board in enumerate(boards):
+            if board.active_piece is not None:
+                for x, y in board.active_piece:
+                    if 0 <= x < size and 0 <= y < size:
+                        out[i, 1, x, y] = 1
+            out[i, 2 + Action.directions.index(board.current_direction)] = 1
+        return out
+
+
+class VectorEnvironment:
+    """count Environments stepped together: step takes one action per board and returns the stacked observations,
+    rewards, done flags and infos. a finished game is reset straight away, its last info marked "final" and the
+    observation returned for it being the first of the next game.
+
+    seeds are handed out consecutively from first_seed, one per game, or left random when it is None"""
+
+    def __init__(self, count, size=16, max_ticks=10000, board_type=ArrayBoard, first_seed=None, **reward_weights):
+        self.environments = [Environment(size, max_ticks, board_type, **reward_weights) for _ in range(count)]
+        self.next_seed = first_seed
+        self.observations = numpy.zeros((count,) + self.environments[0].observation_shape(), dtype=numpy.uint8)
+        self.rewards = numpy.zeros(count, dtype=numpy.float32)
+        self.dones = numpy.zeros(count, dtype=bool)
+
+    def take_seed(self):
+        seed = self.next_seed
+        if seed is not None:
+            self.next_seed += 1
+        return seed
+
+    def reset(self):
+        for environment in self.environments:
+            environment.start(self.take_seed())
+        return Environment.observe([environment.board for environment in self.environments], self.observations)
+
+    def step(self, actions):
+        """one action index per board. the returned arrays are reused by the next call"""
+        infos = []
+        for i, environment in enumerate(self.environments):
+            reward, done, info = environment.advance(int(actions[i]))
+            if done:
+                info["final"] = True
+                environment.start(self.take_seed())
+            self.rewards[i] = reward
+            self.dones[i] = done
+            infos.append(info)
+        observations = Environment.observe([environment.board for environment in self.environments],
+                                           self.observations)
+        return observations, self.rewards, self.dones, infos
@@ -0,0 +1,279 @@
+import time
+from src.logic.Action import Action
+from src.logic.Agent import Agent
+from src.logic.BitBoard import BitBoard
+from src.logic.Piece import Piece
+from src.logic.PieceFactory import PieceFactory
+from src.logic.TranspositionTable import TranspositionTable
+
+
+class SearchTimeout(Exception):
+    """the time budget of a search ran out"""
+
+
+class ExpectimaxAgent(Agent):
+    """picks where each new piece goes, or which way to turn the board, by searching the pieces that can come
+    next: the best of the player's options, averaged over every shape and value PieceFactory can hand out.
+
+    positions are BitBoards, so a node costs a handful of int operations instead of a copy of Board.grid, and
+    their values are kept in a transposition table from one move to the next. the search deepens one piece at a
+    time and plays the deepest result it finished. each call to act searches for at most time_budget, and a search
+    that runs out picks up on the next tick where it left off, the finished nodes being in the table, while the
+    piece is steered toward the best plan so far. the piece is only dropped once the search is done.
+
+    a placement is modeled as the piece entering at the far edge of the board in its final rotation and lateral
+    position and dropping from there. the agent steers the live piece there with rotations and shifts, then drops"""
+    name = "expectimax"
+    lost = -1e9
+    # (value, chance) of each value a new piece can have
+    value_chances = [(value, PieceFactory.values.count(value) / len(PieceFactory.values))
+                     for value in sorted(set(PieceFactory.values))]
+    weights = {"empty": 1.0, "pairs": 2.0, "line_merges": 4.0, "holes": -1.5, "danger": -20.0, "max_tile": 1.0}
+    # lines at the entry edge counted as the danger zone, new pieces need room there to come in
+    danger_lines = 4
+    # shape -> the distinct rotations of the shape as normalized cells
+    orientations = []
+    # (size, direction, shape) -> (cells as a frozenset, lateral position, cells, mask) of every placement
+    placement_tables = {}
+    # (size, direction) -> mask of the danger zone
+    danger_masks = {}
+
+    def __init__(self, time_budget=0.008, max_depth=2, beam=4, table_size=65536):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        # root options searched past the first piece, best first
+        self.beam = beam
+        self.table = TranspositionTable(table_size)
+        self.deadline = 0
+        self.depth_reached = 0
+        self.planned_piece = None
+        # (plan, position after it) of every option for the planned piece, best first, and the direction they
+        # were searched for
+        self.options = []
+        self.order = []
+        self.planned_direction = None
+        # ("place", cells as a frozenset, lateral position), ("direction", direction, None) or None to drop
+        self.plan = None
+        self.moves = 0
+
+    @staticmethod
+    def build_orientations():
+        ExpectimaxAgent.orientations = []
+        for rotations in Piece.offsets:
+            distinct = []
+            for offsets in rotations:
+                if all(frozenset(offsets) != frozenset(other) for other in distinct):
+                    distinct.append(offsets)
+            ExpectimaxAgent.orientations.append(distinct)
+
+    @staticmethod
+    def is_vertical(direction):
+        return direction == "down" or direction == "up"
+
+    @staticmethod
+    def entry_cells(size, direction, offsets, lateral):
+        """the given normalized cells against the edge of the board new pieces come in from, at the given position
+        along it"""
+        width = max(offset[0] for offset in offsets) + 1
+        height = max(offset[1] for offset in offsets) + 1
+        if direction == "down":
+            origin = (lateral, 0)
+        elif direction == "up":
+            origin = (lateral, size - height)
+        elif direction == "right":
+            origin = (0, lateral)
+        else:
+            origin = (size - width, lateral)
+        return tuple([(origin[0] + offset[0], origin[1] + offset[1]) for offset in offsets])
+
+    @staticmethod
+    def placements(board, shape):
+        key = (board.size, board.current_direction, shape)
+        table = ExpectimaxAgent.placement_tables.get(key)
+        if table is None:
+            table = []
+            vertical = ExpectimaxAgent.is_vertical(board.current_direction)
+            for offsets in ExpectimaxAgent.orientations[shape]:
+                span = max(offset[0 if vertical else 1] for offset in offsets) + 1
+                for lateral in range(board.size - span + 1):
+                    cells = ExpectimaxAgent.entry_cells(board.size, board.current_direction, offsets, lateral)
+                    table.append((frozenset(offsets), lateral, cells, board.mask(cells)))
+            ExpectimaxAgent.placement_tables[key] = table
+        return table
+
+    @staticmethod
+    def danger_mask(board):
+        key = (board.size, board.current_direction)
+        mask = ExpectimaxAgent.danger_masks.get(key)
+        if mask is None:
+            direction = board.current_direction
+            lines = range(min(ExpectimaxAgent.danger_lines, board.size))
+            if direction == "up" or direction == "left":
+                lines = [board.size - 1 - line for line in lines]
+            mask = 0
+            for line in lines:
+                mask |= board.line_mask(line, direction)
+            ExpectimaxAgent.danger_masks[key] = mask
+        return mask
+
+    @staticmethod
+    def evaluate(board):
+        """static value of a position: room to play, tiles ready to merge, and no holes or tiles near the entry"""
+        count = BitBoard.count
+        occupancy = board.occupancy
+        weights = ExpectimaxAgent.weights
+        pairs = 0
+        for plane in board.planes[1:]:
+            pairs += count(plane & board.shift(plane, "right")) + count(plane & board.shift(plane, "down"))
+        holes = count(board.behind(occupancy, board.current_direction) & ~occupancy)
+        return weights["empty"] * (board.size * board.size - count(occupancy)) + \
+            weights["pairs"] * pairs + \
+            weights["line_merges"] * count(board.line_merges()) + \
+            weights["holes"] * holes + \
+            weights["danger"] * count(occupancy & ExpectimaxAgent.danger_mask(board)) + \
+            weights["max_tile"] * (board.get_max_cell_value().bit_length() - 1)
+
+    def best_placement(self, board, shape, value, depth):
+        """the best value over every placement of the given piece, searched depth pieces further"""
+        key = (board.current_direction, board.occupancy, tuple(board.planes), depth, shape, value)
+        best = self.table.get(key)
+        if best is not None:
+            return best
+        best = ExpectimaxAgent.lost
+        occupancy = board.occupancy
+        for _, _, cells, mask in ExpectimaxAgent.placements(board, shape):
+            if mask & occupancy:
+                continue
+            if time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+            score = self.search_value(board.drop_piece(cells, value), depth)
+            if score > best:
+                best = score
+        # kept on its own so a search cut short keeps every piece it finished
+        self.table.put(key, best)
+        return best
+
+    def search_value(self, board, depth):
+        """expected value of the given position with depth more pieces to come"""
+        if depth == 0:
+            return ExpectimaxAgent.evaluate(board)
+        key = (board.current_direction, board.occupancy, tuple(board.planes), depth)
+        value = self.table.get(key)
+        if value is not None:
+            return value
+        if time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        total = 0.0
+        for shape in range(len(PieceFactory.pieces)):
+            for piece_value, chance in ExpectimaxAgent.value_chances:
+                total += chance * self.best_placement(board, shape, piece_value, depth - 1)
+        value = total / len(PieceFactory.pieces)
+        self.table.put(key, value)
+        return value
+
+    def options_for(self, view):
+        """(plan, position after it) for every placement of the active piece and every direction change"""
+        piece = view.active_piece
+        found = Piece.find(piece)
+        if found is None:
+            return []
+        board = BitBoard.from_board(view)
+        value = max(view.get_cell_value(cell) for cell in piece)
+        for cell in piece:
+            if not board.is_out_of_bounds(cell):
+                board.set_cell_value(cell, 0)
+        options = []
+        for offsets, lateral, cells, mask in ExpectimaxAgent.placements(board, found.shape):
+            if not mask & board.occupancy:
+                options.append((("place", offsets, lateral), board.drop_piece(cells, value)))
+        # turning the board compacts the piece into it wherever it came in
+        offsets, origin = Piece.normalize(piece)
+        vertical = ExpectimaxAgent.is_vertical(view.current_direction)
+        span = max(offset[0 if vertical else 1] for offset in offsets) + 1
+        lateral = max(0, min(view.size - span, origin[0] if vertical else origin[1]))
+        cells = ExpectimaxAgent.entry_cells(view.size, view.current_direction, offsets, lateral)
+        if not board.mask(cells) & board.occupancy:
+            for direction in Action.directions:
+                if direction == view.current_direction:
+                    continue
+                turned = board.copy()
+                for cell in cells:
+                    turned.set_cell_value(cell, value)
+                turned.compact(direction)
+                turned.current_direction = direction
+                options.append((("direction", direction, None), turned))
+        return options
+
+    def choose(self, view):
+        """rank the options for the active piece one piece deep, then search deeper until the time budget runs
+        out"""
+        self.options = self.options_for(view)
+        self.planned_direction = view.current_direction
+        if not self.options:
+            self.order = []
+            return None
+        # one piece deep always finishes, it is only a static evaluation per option
+        scores = [ExpectimaxAgent.evaluate(child) for _, child in self.options]
+        self.order = sorted(range(len(self.options)), key=lambda i: -scores[i])
+        self.depth_reached = 1
+        return self.deepen()
+
+    def deepen(self):
+        """search the best options one piece deeper at a time until max_depth or the deadline, returns the plan of
+        the best option of the deepest search finished"""
+        for depth in range(self.depth_reached, self.max_depth):
+            candidates = self.order[:self.beam]
+            try:
+                deeper = [self.search_value(self.options[i][1], depth) for i in candidates]
+            except SearchTimeout:
+                # an unfinished iteration is not ranked, the next call goes on with it
+                break
+            ranked = sorted(range(len(candidates)), key=lambda j: -deeper[j])
+            self.order = [candidates[j] for j in ranked] + self.order[len(candidates):]
+            self.depth_reached = depth + 1
+        return self.options[self.order[0]][0]
+
+    def searching(self):
+        return bool(self.options) and self.depth_reached < self.max_depth
+
+    def steer(self, view):
+        """the next input moving the active piece toward the plan"""
+        if self.plan is None:
+            return Action.DROP
+        kind, target, lateral_target = self.plan
+        piece = view.active_piece
+        in_board = not any(view.is_out_of_bounds(cell) for cell in piece)
+        if kind == "direction":
+            # the board can only turn once the piece is out of the buffer
+            return Action.change_direction(target) if in_board else None
+        offsets, origin = Piece.normalize(piece)
+        rotated = frozenset(offsets) == target
+        if not rotated and in_board:
+            return Action.ROTATE
+        vertical = ExpectimaxAgent.is_vertical(view.current_direction)
+        lateral = origin[0] if vertical else origin[1]
+        if lateral < lateral_target:
+            return Action.shift("right" if vertical else "down")
+        elif lateral > lateral_target:
+            return Action.shift("left" if vertical else "up")
+        # until the search is done the piece falls on its own, the plan may still change
+        return Action.DROP if rotated and not self.searching() else None
+
+    def act(self, view):
+        if view.game_over or view.active_piece is None:
+            return None
+        self.deadline = time.perf_counter() + self.time_budget
+        if view.piece_count != self.planned_piece:
+            self.planned_piece = view.piece_count
+            self.plan = self.choose(view)
+            self.moves = 0
+        elif self.searching() and view.current_direction == self.planned_direction:
+            self.plan = self.deepen()
+        self.moves += 1
+        if self.moves > view.size * 2:
+            # blocked from getting where it planned to, take what it has
+            return Action.DROP
+        return self.steer(view)
+
+
+ExpectimaxAgent.build_orientations()
@@ -0,0 +1,41 @@
+import math
+
+
+class Gravity:
+    """fixed timestep of the gravity steps (Board.update_grid), kept apart from how often input is read and the
+    board is drawn. the interval shrinks by speed_up with every level, down to min_interval"""
+    # tile that has to be reached for level 1, every doubling after it is another level
+    first_level_tile = 16
+
+    def __init__(self, interval=1 / 3, speed_up=0.85, min_interval=0.05, max_steps=5):
+        # seconds between gravity steps at level 0
+        self.interval = interval
+        self.speed_up = speed_up
+        self.min_interval = min_interval
+        # most steps to catch up on at once, any more time owed than that is dropped
+        self.max_steps = max_steps
+        self.level = 0
+        self.accumulated = 0.0
+
+    def get_interval(self):
+        return max(self.min_interval, self.interval * self.speed_up ** self.level)
+
+    def advance(self, elapsed):
+        """add the elapsed seconds, returns the number of gravity steps now due"""
+        self.accumulated += elapsed
+        interval = self.get_interval()
+        steps = int(self.accumulated // interval)
+        if steps > self.max_steps:
+            # too far behind (the window was dragged, the machine stalled): skip ahead rather than fast-forward
+            self.accumulated = 0.0
+            return self.max_steps
+        self.accumulated -= steps * interval
+        return steps
+
+    def update_level(self, board):
+        """level up from the biggest tile on the board"""
+        max_value = board.get_max_cell_value()
+        if max_value < Gravity.first_level_tile:
+            self.level = 0
+        else:
+            self.level = int(math.log2(max_value // Gravity.first_level_tile)) + 1
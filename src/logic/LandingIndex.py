@@ -0,0 +1,53 @@
+from bisect import bisect_left, bisect_right, insort
+
+
+class LandingIndex:
+    """sorted positions of the filled cells along every column and row, so a falling cell finds what it lands on
+    without stepping through the empty cells in between. columns serve up/down gravity, rows serve left/right"""
+
+    def __init__(self):
+        # x -> sorted y of the filled cells in that column
+        self.columns = {}
+        # y -> sorted x of the filled cells in that row
+        self.rows = {}
+
+    def add(self, coords):
+        insort(self.columns.setdefault(coords[0], []), coords[1])
+        insort(self.rows.setdefault(coords[1], []), coords[0])
+
+    def remove(self, coords):
+        LandingIndex.discard(self.columns, coords[0], coords[1])
+        LandingIndex.discard(self.rows, coords[1], coords[0])
+
+    @staticmethod
+    def discard(lanes, lane, position):
+        positions = lanes[lane]
+        del positions[bisect_left(positions, position)]
+        if not positions:
+            del lanes[lane]
+
+    def lane(self, index, vertical):
+        """sorted positions of the filled cells in the column (if vertical) or row at the given index"""
+        lanes = self.columns if vertical else self.rows
+        return list(lanes.get(index, ()))
+
+    def cells(self):
+        """coordinates of every filled cell"""
+        return [(x, y) for x, ys in self.columns.items() for y in ys]
+
+    def next_filled(self, coords, direction):
+        """position along the travel axis of the first filled cell past the given one in the given direction,
+        or None if there is nothing in the way"""
+        if direction == "down" or direction == "up":
+            positions = self.columns.get(coords[0])
+            start = coords[1]
+        else:
+            positions = self.rows.get(coords[1])
+            start = coords[0]
+        if not positions:
+            return None
+        if direction == "down" or direction == "right":
+            i = bisect_right(positions, start)
+            return positions[i] if i < len(positions) else None
+        i = bisect_left(positions, start)
+        return positions[i - 1] if i > 0 else None
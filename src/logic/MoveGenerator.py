@@ -0,0 +1,148 @@
+from src.logic.Action import Action
+from src.logic.TransformPiece import TransformPiece
+from src.logic.TranspositionTable import TranspositionTable
+
+
+class Placement:
+    """a spot the active piece can come to rest, and the shortest inputs getting it there: one entry per tick,
+    None for a tick without input"""
+    __slots__ = ("cells", "actions")
+
+    def __init__(self, cells, actions):
+        self.cells = cells
+        self.actions = actions
+
+    def __repr__(self):
+        return "Placement(%s, %s)" % (list(self.cells), self.actions)
+
+
+class MoveGenerator:
+    """finds every spot the active piece of a board can come to rest, searching tick by tick the way Simulator plays:
+    an input or none, then gravity moving the piece one step, or landing it where something is in the way. a drop
+    lands it straight away.
+
+    it follows the board's collision rules reading the board as it is, with the active piece lifted off, and never
+    changes or copies the grid. inputs running the piece into another tile are left out: shifts merging with or
+    splitting on a tile, and rotations into a filled cell, which Board allows when the values match. so are spots
+    with a cell off the board, since landing there ends the game"""
+    # (board size, board hash, piece, direction, max ticks) -> placements
+    cache = TranspositionTable(4096)
+
+    def __init__(self, board):
+        self.board = board
+        self.direction = board.current_direction
+        self.piece_cells = set(board.active_piece)
+        opposite = TransformPiece.get_opposite_direction(self.direction)
+        self.inputs = [None] + [Action.shift(direction) for direction in Action.directions
+                                if direction != self.direction and direction != opposite] + [Action.ROTATE]
+        # piece cells -> cells it lands on when dropped from there
+        self.landings = {}
+
+    @staticmethod
+    def get_placements(board, max_ticks=None):
+        """the placements of the board's active piece reachable within max_ticks ticks, or any number of them.
+        each call gets placements of its own, so the cached ones stay as they were found"""
+        if board.active_piece is None or board.game_over:
+            return []
+        key = (board.size, board.state_hash(), tuple(board.active_piece), board.current_direction, max_ticks)
+        placements = MoveGenerator.cache.get(key)
+        if placements is None:
+            placements = MoveGenerator(board).search(max_ticks)
+            MoveGenerator.cache.put(key, placements)
+        return [Placement(placement.cells, list(placement.actions)) for placement in placements]
+
+    def value_under(self, coords):
+        """the value of the given cell with the active piece lifted off the board"""
+        if coords in self.piece_cells:
+            return -1 if self.board.is_out_of_bounds(coords) else 0
+        return self.board.get_cell_value(coords)
+
+    def collides(self, piece):
+        """is anything but the piece itself right ahead of one of its cells, as Board.piece_collision_exists"""
+        step = TransformPiece.get_direction_vector(self.direction)
+        for x, y in piece:
+            ahead = (x + step[0], y + step[1])
+            if ahead in piece:
+                continue
+            value = self.value_under(ahead)
+            if value > 0 or (value == -1 and not self.board.is_in_buffer(ahead)):
+                return True
+        return False
+
+    def apply(self, piece, action):
+        """the piece after the given input, or None if it cannot be given or leaves the piece where it is"""
+        if action == Action.ROTATE:
+            if TransformPiece.is_square(piece):
+                return None
+            moved = TransformPiece.rotate(piece)
+            if any(self.value_under(cell) != 0 for cell in moved if cell not in piece):
+                return None
+            return moved
+        moved = TransformPiece.shift_coordinates(piece, action[len("shift_"):])
+        for cell in moved:
+            value = self.value_under(cell)
+            if value > 0 and cell not in piece:
+                return None
+            if value == -1 and not self.board.is_in_buffer(cell):
+                return None
+        return moved
+
+    def landing(self, piece):
+        """where the piece ends up if dropped now"""
+        passed = []
+        while tuple(piece) not in self.landings and not self.collides(piece):
+            passed.append(tuple(piece))
+            piece = TransformPiece.shift_coordinates(piece, self.direction)
+        landed = self.landings.get(tuple(piece), piece)
+        for key in passed:
+            self.landings[key] = landed
+        self.landings[tuple(piece)] = landed
+        return landed
+
+    def search(self, max_ticks=None):
+        """breadth first over the piece positions at the start of each tick, so the first way found to a placement
+        takes the fewest ticks"""
+        start = self.board.active_piece
+        # piece cells -> (piece cells a tick earlier, input given in between)
+        parents = {tuple(start): None}
+        # placement cells -> (piece cells at the start of the last tick, last input)
+        found = {}
+        frontier = [start]
+        ticks = 0
+        while frontier and (max_ticks is None or ticks < max_ticks):
+            next_frontier = []
+            for piece in frontier:
+                key = tuple(piece)
+                self.place(found, self.landing(piece), key, Action.DROP)
+                for action in self.inputs:
+                    moved = piece if action is None else self.apply(piece, action)
+                    if moved is None:
+                        continue
+                    if self.collides(moved):
+                        self.place(found, moved, key, action)
+                        continue
+                    moved = TransformPiece.shift_coordinates(moved, self.direction)
+                    if tuple(moved) not in parents:
+                        parents[tuple(moved)] = (key, action)
+                        next_frontier.append(moved)
+            frontier = next_frontier
+            ticks += 1
+        return [Placement(cells, MoveGenerator.path(parents, key) + [action])
+                for cells, (key, action) in found.items()]
+
+    def place(self, found, piece, key, action):
+        if any(self.board.is_out_of_bounds(cell) for cell in piece):
+            return
+        cells = tuple(sorted(piece))
+        if cells not in found:
+            found[cells] = (key, action)
+
+    @staticmethod
+    def path(parents, key):
+        """the inputs leading from the start to the given piece cells"""
+        actions = []
+        while parents[key] is not None:
+            key, action = parents[key]
+            actions.append(action)
+        actions.reverse()
+        return actions
@@ -0,0 +1,117 @@
+from src.logic.PieceFactory import PieceFactory
+
+
+class Piece:
+    """a tetris piece as its shape (index into PieceFactory.pieces), rotation state and origin. the absolute cells,
+    rotations and squareness all come from tables built once for every rotation of every shape.
+
+    iterates, indexes and tests membership like the list of cell tuples it replaces"""
+    __slots__ = ("shape", "rotation", "origin", "cells")
+
+    # shape -> cells of each rotation state relative to the origin, normalized so the lowest x and y are 0
+    offsets = []
+    # normalized relative cells -> (shape, rotation)
+    states = {}
+    # (shape, rotation, origin x parity, origin y parity) -> (next rotation, origin x delta, origin y delta)
+    rotations = {}
+    square_shape = PieceFactory.pieces.index(PieceFactory.o)
+
+    def __init__(self, shape, rotation, origin):
+        self.shape = shape
+        self.rotation = rotation
+        self.origin = origin
+        x = origin[0]
+        y = origin[1]
+        self.cells = tuple([(x + offset[0], y + offset[1]) for offset in Piece.offsets[shape][rotation]])
+
+    @staticmethod
+    def normalize(cells):
+        """the given cells relative to their lowest x and y, and that corner"""
+        min_x = min(cell[0] for cell in cells)
+        min_y = min(cell[1] for cell in cells)
+        return tuple([(cell[0] - min_x, cell[1] - min_y) for cell in cells]), (min_x, min_y)
+
+    @staticmethod
+    def find(cells):
+        """the piece occupying exactly the given cells in the given order, or None if no shape matches"""
+        offsets, origin = Piece.normalize(cells)
+        state = Piece.states.get(offsets)
+        if state is None:
+            return None
+        return Piece(state[0], state[1], origin)
+
+    @staticmethod
+    def from_cells(cells):
+        """the piece occupying the given cells, which must be one of the rotations of a PieceFactory shape"""
+        piece = Piece.find(cells)
+        if piece is None:
+            raise ValueError("not a known piece: %s" % (list(cells),))
+        return piece
+
+    @staticmethod
+    def rotate_cells(cells):
+        """rotate the given cells counter-clockwise around their rounded center"""
+        # round() breaks ties to even, like the numpy rounding this table was first derived from
+        pivot_x = int(round(sum(cell[0] for cell in cells) / len(cells)))
+        pivot_y = int(round(sum(cell[1] for cell in cells) / len(cells)))
+        return [(pivot_x - (cell[1] - pivot_y), pivot_y + (cell[0] - pivot_x)) for cell in cells]
+
+    @staticmethod
+    def build_tables():
+        Piece.offsets = []
+        Piece.states = {}
+        Piece.rotations = {}
+        for shape, cells in enumerate(PieceFactory.pieces):
+            offsets = Piece.normalize(cells)[0]
+            rotations = []
+            for rotation in range(4):
+                rotations.append(offsets)
+                Piece.states.setdefault(offsets, (shape, rotation))
+                offsets = Piece.normalize(Piece.rotate_cells(offsets))[0]
+            Piece.offsets.append(rotations)
+        for shape, rotations in enumerate(Piece.offsets):
+            for rotation, offsets in enumerate(rotations):
+                # the rounded pivot, and so where the rotated piece ends up, depends on the parity of the origin
+                for parity_x in range(2):
+                    for parity_y in range(2):
+                        rotated = Piece.rotate_cells([(x + parity_x, y + parity_y) for x, y in offsets])
+                        origin = Piece.normalize(rotated)[1]
+                        Piece.rotations[(shape, rotation, parity_x, parity_y)] = \
+                            ((rotation + 1) % 4, origin[0] - parity_x, origin[1] - parity_y)
+
+    def translated(self, dx, dy):
+        return Piece(self.shape, self.rotation, (self.origin[0] + dx, self.origin[1] + dy))
+
+    def rotated(self):
+        """this piece rotated counter-clockwise"""
+        rotation, dx, dy = Piece.rotations[(self.shape, self.rotation, self.origin[0] & 1, self.origin[1] & 1)]
+        return Piece(self.shape, rotation, (self.origin[0] + dx, self.origin[1] + dy))
+
+    def is_square(self):
+        return self.shape == Piece.square_shape
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __getitem__(self, index):
+        return self.cells[index]
+
+    def __contains__(self, coords):
+        return coords in self.cells
+
+    def __eq__(self, other):
+        if isinstance(other, Piece):
+            return self.cells == other.cells
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.cells)
+
+    def __repr__(self):
+        return "Piece(%d, %d, %s)" % (self.shape, self.rotation, self.origin)
+
+
+Piece.build_tables()
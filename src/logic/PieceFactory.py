@@ -11,16 +11,18 @@ class PieceFactory:
     l = [(0, 0), (0, 1), (0, 2), (1, 2)]
 
     pieces = [i, o, t, s, z, j, l]
+    # drawn from uniformly, so a 2 nine times out of ten
+    values = [2, 2, 2, 2, 2, 2, 2, 2, 2, 4]
 
     @staticmethod
-    def get_piece():
+    def get_piece(rng=random):
         """return a random tetris piece with relative coordinates"""
-        return random.choice(PieceFactory.pieces)
+        return rng.choice(PieceFactory.pieces)
 
     @staticmethod
-    def get_value():
+    def get_value(rng=random):
         """return 2 or 4 as the value of the cells in the new piece, with a 90% chance of a 2"""
-        return random.choice([2, 2, 2, 2, 2, 2, 2, 2, 2, 4])
+        return rng.choice(PieceFactory.values)
 
     @staticmethod
     def get_start_point(board_size, direction):
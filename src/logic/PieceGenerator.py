@@ -0,0 +1,33 @@
+import random
+from src.logic.PieceFactory import PieceFactory
+
+
+class PieceGenerator:
+    """source of the new pieces and their values for one board. seeded, it hands out the same pieces every time,
+    and counts them so the sequence can be picked back up from any point"""
+
+    def __init__(self, seed=None, rng=None):
+        self.seed = seed
+        # anything with choice(), like the random module itself, can stand in for a seeded generator
+        self.random = rng if rng is not None else random.Random(seed)
+        # number of pieces handed out so far
+        self.count = 0
+
+    def next_piece(self):
+        """a random piece in relative coordinates and the value of its cells"""
+        piece = PieceFactory.get_piece(self.random)
+        value = PieceFactory.get_value(self.random)
+        self.count += 1
+        return piece, value
+
+    def skip(self, count):
+        """throw away the given number of pieces"""
+        for _ in range(count):
+            self.next_piece()
+
+    @staticmethod
+    def resume(seed, count):
+        """a generator for the given seed that has already handed out count pieces"""
+        generator = PieceGenerator(seed)
+        generator.skip(count)
+        return generator
@@ -0,0 +1,106 @@
+import json
+import time
+from bisect import bisect_left
+from collections import deque
+from src.logic.Statistics import Statistics
+
+
+class PhaseTimes:
+    """call count and total time of one phase since profiling started, plus its latest durations for the
+    histogram and percentiles"""
+    # upper bounds of the histogram buckets in seconds, doubling from a microsecond. the last bucket is open ended
+    bounds = [0.000001 * 2 ** i for i in range(18)]
+
+    def __init__(self, window):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+
+    def histogram(self):
+        """number of the recent durations in each bucket of PhaseTimes.bounds, plus one for anything longer"""
+        counts = [0] * (len(PhaseTimes.bounds) + 1)
+        for seconds in self.recent:
+            counts[bisect_left(PhaseTimes.bounds, seconds)] += 1
+        return counts
+
+    def percentile(self, percent):
+        """nearest-rank percentile of the recent durations"""
+        if not self.recent:
+            return 0.0
+        return Statistics.nearest_rank(sorted(self.recent), percent)
+
+    def summary(self):
+        return {
+            "calls": self.calls,
+            "total": self.total,
+            "mean": self.total / self.calls if self.calls else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "histogram": self.histogram(),
+        }
+
+
+class Profiler:
+    """opt-in per-phase timing of Board.update_grid. attach wraps the phase methods of one board instance, so a board
+    that is not profiled runs the plain class methods with nothing in between, and detach puts them back.
+
+    a phase's time includes the phases it calls: do_static_merge and drop_unattached run inside
+    merge_with_completed_rows, and everything runs inside update_grid"""
+    phases = ["update_grid", "place_new_piece", "handle_active_piece_collision", "shift_cells",
+              "merge_with_completed_rows", "do_static_merge", "drop_unattached"]
+
+    def __init__(self, window=1000):
+        # number of latest calls per phase kept for the histograms
+        self.window = window
+        self.times = {phase: PhaseTimes(window) for phase in Profiler.phases}
+        self.board = None
+
+    def attach(self, board):
+        self.board = board
+        board.profiler = self
+        for phase in Profiler.phases:
+            setattr(board, phase, self.wrap(self.times[phase], getattr(board, phase)))
+
+    def detach(self):
+        for phase in Profiler.phases:
+            self.board.__dict__.pop(phase, None)
+        self.board.profiler = None
+        self.board = None
+
+    @staticmethod
+    def wrap(times, method):
+        clock = time.perf_counter
+
+        def timed(*args):
+            start = clock()
+            try:
+                return method(*args)
+            finally:
+                times.add(clock() - start)
+        return timed
+
+    def summary(self):
+        return {phase: times.summary() for phase, times in self.times.items()}
+
+    def format(self):
+        lines = ["%-30s %8s %10s %10s %10s %10s" % ("phase", "calls", "mean ms", "p50 ms", "p99 ms", "max ms")]
+        for phase, summary in self.summary().items():
+            lines.append("%-30s %8d %10.3f %10.3f %10.3f %10.3f" % (
+                phase, summary["calls"], summary["mean"] * 1000, summary["p50"] * 1000, summary["p99"] * 1000,
+                summary["max"] * 1000))
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """write the summary of every phase to the given file as json, histogram bounds included"""
+        with open(path, "w") as profile_file:
+            json.dump({"window": self.window, "bounds": PhaseTimes.bounds, "phases": self.summary()}, profile_file,
+                      indent=2)
@@ -0,0 +1,157 @@
+import struct
+from bisect import bisect_left, bisect_right
+from src.logic.Action import Action
+from src.logic.Board import Board
+from src.logic.Piece import Piece
+from src.logic.PieceGenerator import PieceGenerator
+
+
+class Replay:
+    """a recorded game: its seed, the actions given at each tick and a keyframe of the board every
+    keyframe_interval ticks, so playback can start from the nearest keyframe instead of the first tick.
+
+    binary layout, little endian: the header, then one (tick, action index in Action.all) pair per action, then a
+    (tick, length) index entry per keyframe, then the keyframes themselves"""
+    magic = b"2TRP"
+    version = 1
+    # magic, version, board size, seed, keyframe interval, ticks, actions, keyframes
+    header = struct.Struct("<4sBHqIIII")
+    event = struct.Struct("<IB")
+    keyframe_entry = struct.Struct("<II")
+    # pieces handed out, direction index, game over, has an active piece, cells in the active piece
+    keyframe_header = struct.Struct("<IBBBB")
+    piece_cell = struct.Struct("<hh")
+    filled_count = struct.Struct("<I")
+    # x, y, log2 of the value
+    filled_cell = struct.Struct("<hhB")
+
+    def __init__(self, size, seed, keyframe_interval=256):
+        self.size = size
+        # playback draws the same pieces from this, so it has to be an int
+        self.seed = seed
+        self.keyframe_interval = keyframe_interval
+        self.ticks = 0
+        # (tick, action code) in the order they were applied
+        self.events = []
+        # (tick, encoded board) every keyframe_interval ticks
+        self.keyframes = []
+
+    def record(self, tick, action):
+        self.events.append((tick, Action.all.index(action)))
+
+    def record_tick(self, tick, board):
+        """note the start of a tick, keeping a keyframe of the board when one is due"""
+        if tick % self.keyframe_interval == 0:
+            self.keyframes.append((tick, Replay.encode_board(board)))
+
+    @staticmethod
+    def encode_board(board):
+        piece = list(board.active_piece) if board.active_piece is not None else []
+        parts = [Replay.keyframe_header.pack(board.piece_generator.count,
+                                             Action.directions.index(board.current_direction),
+                                             board.game_over, board.active_piece is not None, len(piece))]
+        parts.extend(Replay.piece_cell.pack(x, y) for x, y in piece)
+        filled = [(coords, value) for coords, value in board.grid.items() if value > 0]
+        parts.append(Replay.filled_count.pack(len(filled)))
+        parts.extend(Replay.filled_cell.pack(x, y, value.bit_length() - 1) for (x, y), value in filled)
+        return b"".join(parts)
+
+    def decode_board(self, data, board_type=Board):
+        """the board stored in a keyframe, drawing its next pieces from where the recorded game left off"""
+        count, direction, game_over, has_piece, piece_length = Replay.keyframe_header.unpack_from(data, 0)
+        offset = Replay.keyframe_header.size
+        piece = []
+        for _ in range(piece_length):
+            piece.append(Replay.piece_cell.unpack_from(data, offset))
+            offset += Replay.piece_cell.size
+        filled, = Replay.filled_count.unpack_from(data, offset)
+        offset += Replay.filled_count.size
+        board = board_type(self.size, PieceGenerator.resume(self.seed, count))
+        # a new board is all empty, so only the filled cells need setting
+        for x, y, power in Replay.filled_cell.iter_unpack(data[offset:offset + filled * Replay.filled_cell.size]):
+            board.set_cell_value((x, y), 1 << power)
+        board.current_direction = Action.directions[direction]
+        board.game_over = bool(game_over)
+        if has_piece:
+            board.active_piece = Piece.find(piece) or piece
+        return board
+
+    def seek(self, tick, board_type=Board):
+        """the board at the start of the given tick, played from the last keyframe before it"""
+        tick = min(tick, self.ticks)
+        i = bisect_right([keyframe[0] for keyframe in self.keyframes], tick) - 1
+        if i < 0:
+            raise ValueError("no keyframe at or before tick %d" % tick)
+        start, data = self.keyframes[i]
+        board = self.decode_board(data, board_type)
+        ticks = [event[0] for event in self.events]
+        e = bisect_left(ticks, start)
+        for current in range(start, tick):
+            if board.game_over:
+                break
+            # the tick's actions, then gravity, as in Simulator.play
+            while e < len(self.events) and self.events[e][0] == current:
+                Action.apply(board, Action.all[self.events[e][1]])
+                e += 1
+            board.update_grid()
+        return board
+
+    def play(self, board_type=Board):
+        """the board at the end of the recorded game, including any input given after its last tick"""
+        board = self.seek(self.ticks, board_type)
+        for tick, code in self.events[bisect_left([event[0] for event in self.events], self.ticks):]:
+            Action.apply(board, Action.all[code])
+        return board
+
+    def to_bytes(self):
+        parts = [Replay.header.pack(Replay.magic, Replay.version, self.size, self.seed, self.keyframe_interval,
+                                    self.ticks, len(self.events), len(self.keyframes))]
+        parts.extend(Replay.event.pack(tick, code) for tick, code in self.events)
+        parts.extend(Replay.keyframe_entry.pack(tick, len(data)) for tick, data in self.keyframes)
+        parts.extend(data for _, data in self.keyframes)
+        return b"".join(parts)
+
+    @staticmethod
+    def from_bytes(data):
+        data = memoryview(data)
+        magic, version, size, seed, keyframe_interval, ticks, events, keyframes = Replay.header.unpack_from(data, 0)
+        if magic != Replay.magic or version != Replay.version:
+            raise ValueError("not a version %d replay" % Replay.version)
+        replay = Replay(size, seed, keyframe_interval)
+        replay.ticks = ticks
+        offset = Replay.header.size
+        end = offset + events * Replay.event.size
+        replay.events = list(Replay.event.iter_unpack(data[offset:end]))
+        offset = end
+        end = offset + keyframes * Replay.keyframe_entry.size
+        entries = list(Replay.keyframe_entry.iter_unpack(data[offset:end]))
+        # keyframes stay slices of the loaded bytes until a seek decodes one
+        offset = end
+        for tick, length in entries:
+            replay.keyframes.append((tick, data[offset:offset + length]))
+            offset += length
+        return replay
+
+    def save(self, path):
+        with open(path, "wb") as replay_file:
+            replay_file.write(self.to_bytes())
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as replay_file:
+            return Replay.from_bytes(replay_file.read())
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="play back a recorded game without a display")
+    parser.add_argument("path")
+    parser.add_argument("--tick", type=int, help="show the board at the start of this tick instead of the end")
+    args = parser.parse_args()
+    replay = Replay.load(args.path)
+    start = time.perf_counter()
+    board = replay.play() if args.tick is None else replay.seek(args.tick)
+    print("%d ticks, %d actions, seed %d, played back in %.3fs" % (
+        replay.ticks, len(replay.events), replay.seed, time.perf_counter() - start))
+    Board.visualize(board.grid, board.size)
@@ -0,0 +1,178 @@
+import random
+import time
+from src.logic.Action import Action
+from src.logic.Board import Board
+from src.logic.PieceGenerator import PieceGenerator
+
+
+class GameResult:
+    """outcome of a single simulated game"""
+
+    def __init__(self, seed, ticks, max_tile, score, game_over, seconds):
+        self.seed = seed
+        self.ticks = ticks
+        self.max_tile = max_tile
+        self.score = score
+        self.won = max_tile >= 2048
+        # a game that hit the tick limit is neither won nor lost
+        self.lost = game_over and not self.won
+        self.timed_out = not game_over
+        self.seconds = seconds
+
+    def outcome(self):
+        if self.won:
+            return "won"
+        elif self.lost:
+            return "lost"
+        return "timed_out"
+
+
+class SimulationReport:
+    """throughput and outcome statistics over a batch of simulated games"""
+
+    def __init__(self, results, seconds):
+        self.results = results
+        self.seconds = seconds
+        self.games = len(results)
+        self.ticks = sum(result.ticks for result in results)
+
+    def games_per_second(self):
+        return self.games / self.seconds if self.seconds > 0 else float("inf")
+
+    def ticks_per_second(self):
+        return self.ticks / self.seconds if self.seconds > 0 else float("inf")
+
+    def outcomes(self):
+        """number of games per outcome"""
+        counts = {"won": 0, "lost": 0, "timed_out": 0}
+        for result in self.results:
+            counts[result.outcome()] += 1
+        return counts
+
+    def max_tiles(self):
+        """number of games per highest tile reached"""
+        counts = {}
+        for result in self.results:
+            counts[result.max_tile] = counts.get(result.max_tile, 0) + 1
+        return dict(sorted(counts.items()))
+
+    def mean_ticks(self):
+        return self.ticks / self.games if self.games else 0
+
+    def mean_score(self):
+        return sum(result.score for result in self.results) / self.games if self.games else 0
+
+    def summary(self):
+        return {
+            "games": self.games,
+            "ticks": self.ticks,
+            "seconds": self.seconds,
+            "games_per_second": self.games_per_second(),
+            "ticks_per_second": self.ticks_per_second(),
+            "mean_ticks": self.mean_ticks(),
+            "mean_score": self.mean_score(),
+            "outcomes": self.outcomes(),
+            "max_tiles": self.max_tiles(),
+        }
+
+    def format(self):
+        lines = [
+            "%d games, %d ticks in %.2fs" % (self.games, self.ticks, self.seconds),
+            "%.1f games/s, %.1f ticks/s" % (self.games_per_second(), self.ticks_per_second()),
+            "mean ticks per game: %.1f, mean score: %.1f" % (self.mean_ticks(), self.mean_score()),
+            "outcomes: " + ", ".join("%s %d" % item for item in self.outcomes().items()),
+            "max tiles: " + ", ".join("%d: %d" % item for item in self.max_tiles().items()),
+        ]
+        return "\n".join(lines)
+
+
+class ScriptedPolicy:
+    """plays back a fixed input stream: a list (or dict keyed by tick) of per-tick action lists"""
+
+    def __init__(self, script):
+        self.script = script
+
+    def __call__(self, board, tick):
+        if isinstance(self.script, dict):
+            return self.script.get(tick, [])
+        return self.script[tick] if tick < len(self.script) else []
+
+
+class RandomPolicy:
+    """picks a random action each tick, doing nothing with the given probability"""
+
+    def __init__(self, seed=None, idle_chance=0.5, actions=Action.all):
+        self.random = random.Random(seed)
+        self.idle_chance = idle_chance
+        self.actions = actions
+
+    def __call__(self, board, tick):
+        if self.random.random() < self.idle_chance:
+            return []
+        return [self.random.choice(self.actions)]
+
+
+class Simulator:
+    """runs games without a display, one tick per call to Board.update_grid, as fast as the cpu allows"""
+
+    def __init__(self, board_size=16, max_ticks=10000, board_type=Board):
+        self.board_size = board_size
+        self.max_ticks = max_ticks
+        self.board_type = board_type
+
+    def play(self, policy, seed=None, replay=None):
+        """play a single game, feeding the policy's actions to the board before every tick. if a Replay is given,
+        the game is recorded into it"""
+        board = self.board_type(self.board_size, PieceGenerator(seed))
+        start = time.perf_counter()
+        tick = 0
+        while tick < self.max_ticks and not board.game_over:
+            if replay is not None:
+                replay.record_tick(tick, board)
+            # the first tick only places a piece, as the renderer's first frame does
+            if board.active_piece is not None:
+                for action in policy(board, tick):
+                    if replay is not None:
+                        replay.record(tick, action)
+                    Action.apply(board, action)
+            board.update_grid()
+            tick += 1
+        if replay is not None:
+            replay.ticks = tick
+        seconds = time.perf_counter() - start
+        return GameResult(seed, tick, board.get_max_cell_value(), Simulator.get_score(board), board.game_over, seconds)
+
+    @staticmethod
+    def get_score(board):
+        """total value of the tiles left on the board"""
+        return sum(value for coords, value in board.grid.items() if value > 0 and not board.is_out_of_bounds(coords))
+
+    def run(self, policy_factory, games, first_seed=0):
+        """play a batch of games, seeded consecutively. policy_factory is called with each game's seed"""
+        start = time.perf_counter()
+        results = []
+        for seed in range(first_seed, first_seed + games):
+            results.append(self.play(policy_factory(seed), seed))
+        return SimulationReport(results, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="play games headlessly with a random policy and report throughput")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--size", type=int, default=16)
+    parser.add_argument("--max-ticks", type=int, default=10000)
+    parser.add_argument("--idle-chance", type=float, default=0.5)
+    parser.add_argument("--array", action="store_true", help="run on the numpy-backed ArrayBoard")
+    parser.add_argument("--chunked", action="store_true", help="run on ChunkedBoard, for sizes of 1024 and up")
+    args = parser.parse_args()
+    board_type = Board
+    if args.array:
+        from src.logic.ArrayBoard import ArrayBoard
+        board_type = ArrayBoard
+    elif args.chunked:
+        from src.logic.ChunkedBoard import ChunkedBoard
+        board_type = ChunkedBoard
+    simulator = Simulator(args.size, args.max_ticks, board_type)
+    report = simulator.run(lambda seed: RandomPolicy(seed, args.idle_chance), args.games)
+    print(report.format())
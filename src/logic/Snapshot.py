@@ -0,0 +1,127 @@
+import struct
+import numpy
+from src.logic.Action import Action
+from src.logic.ArrayBoard import ArrayBoard
+from src.logic.ArrayGrid import ArrayGrid
+from src.logic.Piece import Piece
+
+
+class Snapshot:
+    """fixed-size binary records of boards: the cells in ArrayGrid layout, margin included, as one uint8 each
+    (log2 of the value, 0 for empty and 255 for no cell), plus the active piece, direction and game over flag.
+
+    the margin costs (size + 2 * margin)^2 bytes a record instead of size^2, 1024 rather than 256 for a 16-board,
+    nearly all of it no_cell. it is kept because the buffer holds more than the active piece: pieces that land
+    short of the board stay there, a dozen cells or so in random play, on whichever side the board faced, so no
+    fixed piece-sized field would do. it is also the layout of ArrayGrid.array, so decoding is one array copy.
+
+    a file is a header followed by the records back to back, so it loads with numpy.frombuffer or numpy.memmap
+    and a board is rebuilt from its record with array operations only"""
+    magic = b"2TSN"
+    version = 1
+    # magic, version, board size, margin, number of records
+    header = struct.Struct("<4sBHBI")
+    no_cell = 255
+    # an active piece always has 4 cells
+    piece_length = 4
+
+    @staticmethod
+    def dtype(size, margin=ArrayGrid.default_margin):
+        length = size + margin * 2
+        return numpy.dtype([
+            ("direction", "u1"),
+            ("game_over", "u1"),
+            ("has_piece", "u1"),
+            ("piece_length", "u1"),
+            ("piece", "<i2", (Snapshot.piece_length, 2)),
+            ("cells", "u1", (length, length)),
+        ])
+
+    @staticmethod
+    def encode(board, record, margin=ArrayGrid.default_margin):
+        """write the given board into a record of Snapshot.dtype for its size and the given margin"""
+        grid = board.array_grid if isinstance(board, ArrayBoard) else None
+        if grid is None or grid.margin != margin:
+            grid = ArrayGrid.from_dict(board.size, board.grid, margin)
+        if any(value != -1 for value in grid.overflow.values()):
+            raise ValueError("board has cells beyond the snapshot margin")
+        array = grid.array
+        cells = numpy.full(array.shape, Snapshot.no_cell, dtype=numpy.uint8)
+        cells[array == 0] = 0
+        filled = array > 0
+        cells[filled] = numpy.log2(array[filled]).astype(numpy.uint8)
+        record["cells"] = cells
+        record["direction"] = Action.directions.index(board.current_direction)
+        record["game_over"] = board.game_over
+        piece = list(board.active_piece) if board.active_piece is not None else []
+        if len(piece) > Snapshot.piece_length:
+            raise ValueError("active piece has more than %d cells" % Snapshot.piece_length)
+        record["has_piece"] = board.active_piece is not None
+        record["piece_length"] = len(piece)
+        record["piece"] = 0
+        if piece:
+            record["piece"][:len(piece)] = piece
+
+    @staticmethod
+    def decode(record, size, board_type=ArrayBoard):
+        """the board stored in the given record. an ArrayBoard takes the cells as one array conversion. a plain
+        Board gets a dict built in one pass from the array, but indexing it still visits every cell in python, so
+        only ArrayBoard loads without per-cell work"""
+        margin = (record["cells"].shape[0] - size) // 2
+        cells = record["cells"].astype(numpy.int64)
+        values = numpy.left_shift(1, cells)
+        values[cells == 0] = 0
+        values[cells == Snapshot.no_cell] = -1
+        board = board_type(size)
+        if issubclass(board_type, ArrayBoard):
+            grid = ArrayGrid(size, margin)
+            grid.array[...] = values
+            # the cells were written past __setitem__, so the hash is worked out afresh when first asked
+            grid.key = None
+        else:
+            # every in-board cell is stored as at least 0, so this has all of them
+            xs, ys = numpy.nonzero(values >= 0)
+            grid = dict(zip(zip((xs - margin).tolist(), (ys - margin).tolist()), values[xs, ys].tolist()))
+        board.grid = grid
+        board.current_direction = Action.directions[int(record["direction"])]
+        board.game_over = bool(record["game_over"])
+        if record["has_piece"]:
+            piece = [tuple(cell) for cell in record["piece"][:int(record["piece_length"])].tolist()]
+            board.active_piece = Piece.find(piece) or piece
+        return board
+
+    @staticmethod
+    def to_bytes(boards, margin=ArrayGrid.default_margin):
+        """the given boards, which must all be the same size, as the contents of a snapshot file"""
+        size = boards[0].size
+        records = numpy.zeros(len(boards), dtype=Snapshot.dtype(size, margin))
+        for i, board in enumerate(boards):
+            if board.size != size:
+                raise ValueError("boards of different sizes in one snapshot")
+            Snapshot.encode(board, records[i], margin)
+        return Snapshot.header.pack(Snapshot.magic, Snapshot.version, size, margin, len(boards)) + records.tobytes()
+
+    @staticmethod
+    def read_header(data):
+        magic, version, size, margin, count = Snapshot.header.unpack_from(data, 0)
+        if magic != Snapshot.magic or version != Snapshot.version:
+            raise ValueError("not a version %d snapshot" % Snapshot.version)
+        return size, margin, count
+
+    @staticmethod
+    def from_bytes(data):
+        """the board size and the records of the given snapshot data, as an array viewing the data without a copy"""
+        size, margin, count = Snapshot.read_header(data)
+        return size, numpy.frombuffer(data, Snapshot.dtype(size, margin), count, Snapshot.header.size)
+
+    @staticmethod
+    def save(path, boards, margin=ArrayGrid.default_margin):
+        with open(path, "wb") as snapshot_file:
+            snapshot_file.write(Snapshot.to_bytes(boards, margin))
+
+    @staticmethod
+    def load(path):
+        """the board size and the records of the given snapshot file, memory-mapped rather than read"""
+        with open(path, "rb") as snapshot_file:
+            size, margin, count = Snapshot.read_header(snapshot_file.read(Snapshot.header.size))
+        return size, numpy.memmap(path, Snapshot.dtype(size, margin), "r", Snapshot.header.size, (count,))
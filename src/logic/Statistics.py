@@ -0,0 +1,12 @@
+import math
+
+
+class Statistics:
+    """summary statistics shared by the tournament results and the profiler"""
+
+    @staticmethod
+    def nearest_rank(sorted_values, percent):
+        """nearest-rank percentile of an already sorted list: the smallest value with at least percent of the
+        values at or below it"""
+        rank = math.ceil(percent / 100 * len(sorted_values)) - 1
+        return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
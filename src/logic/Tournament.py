@@ -0,0 +1,147 @@
+import json
+import multiprocessing
+import os
+import time
+from src.logic.Simulator import Simulator
+from src.logic.Statistics import Statistics
+
+
+def play_match(task):
+    """play one seeded game for one agent. runs in a pool worker, so it has to live at module level"""
+    name, agent, seed, board_size, max_ticks = task
+    agent.start_game(seed)
+    result = Simulator(board_size, max_ticks).play(agent, seed)
+    return {
+        "agent": name,
+        "seed": seed,
+        "ticks": result.ticks,
+        "max_tile": result.max_tile,
+        "score": result.score,
+        "outcome": result.outcome(),
+        "seconds": result.seconds,
+    }
+
+
+class Tournament:
+    """plays many seeded games per agent across a process pool, streaming each result to a json lines file.
+
+    agents maps a name to an agent; each game gets its own copy of the agent. results already in the file are
+    skipped, so an interrupted run picks up where it stopped"""
+
+    def __init__(self, agents, games_per_agent, results_path, board_size=16, max_ticks=10000, processes=None,
+                 first_seed=0):
+        self.agents = agents
+        self.games_per_agent = games_per_agent
+        self.results_path = results_path
+        self.board_size = board_size
+        self.max_ticks = max_ticks
+        self.processes = processes or os.cpu_count()
+        self.first_seed = first_seed
+
+    def pending_tasks(self):
+        """the (agent, seed) games that have no result on disk yet"""
+        done = set((result["agent"], result["seed"]) for result in Tournament.load_results(self.results_path))
+        tasks = []
+        for seed in range(self.first_seed, self.first_seed + self.games_per_agent):
+            for name, agent in self.agents.items():
+                if (name, seed) not in done:
+                    tasks.append((name, agent, seed, self.board_size, self.max_ticks))
+        return tasks
+
+    def run(self, on_result=None):
+        """play every pending game, returns the wall time in seconds"""
+        tasks = self.pending_tasks()
+        start = time.perf_counter()
+        if not tasks:
+            return 0.0
+        Tournament.end_last_line(self.results_path)
+        with open(self.results_path, "a") as results_file, multiprocessing.Pool(self.processes) as pool:
+            for result in pool.imap_unordered(play_match, tasks):
+                results_file.write(json.dumps(result) + "\n")
+                results_file.flush()
+                if on_result is not None:
+                    on_result(result)
+        return time.perf_counter() - start
+
+    @staticmethod
+    def end_last_line(path):
+        """make sure appended results start on a line of their own: a last line cut short by an interrupted write is
+        cut off, a complete one missing its newline gets one"""
+        if not os.path.exists(path):
+            return
+        with open(path, "rb+") as results_file:
+            content = results_file.read()
+            if not content or content.endswith(b"\n"):
+                return
+            start = content.rfind(b"\n") + 1
+            try:
+                json.loads(content[start:].decode())
+            except ValueError:
+                results_file.truncate(start)
+                return
+            results_file.write(b"\n")
+
+    @staticmethod
+    def load_results(path):
+        """read the results streamed so far, ignoring a trailing line cut short by an interrupted run"""
+        results = []
+        if not os.path.exists(path):
+            return results
+        with open(path) as results_file:
+            for line in results_file:
+                try:
+                    results.append(json.loads(line))
+                except ValueError:
+                    continue
+        return results
+
+    @staticmethod
+    def summarize(results):
+        """per-agent score distribution, max tile counts, tick counts and wall time"""
+        by_agent = {}
+        for result in results:
+            by_agent.setdefault(result["agent"], []).append(result)
+        summary = {}
+        for name, agent_results in by_agent.items():
+            scores = sorted(result["score"] for result in agent_results)
+            max_tiles = {}
+            outcomes = {}
+            for result in agent_results:
+                max_tiles[result["max_tile"]] = max_tiles.get(result["max_tile"], 0) + 1
+                outcomes[result["outcome"]] = outcomes.get(result["outcome"], 0) + 1
+            summary[name] = {
+                "games": len(agent_results),
+                "score": {
+                    "mean": sum(scores) / len(scores),
+                    "min": scores[0],
+                    "p25": Statistics.nearest_rank(scores, 25),
+                    "median": Statistics.nearest_rank(scores, 50),
+                    "p75": Statistics.nearest_rank(scores, 75),
+                    "max": scores[-1],
+                },
+                "max_tiles": dict(sorted(max_tiles.items())),
+                "outcomes": outcomes,
+                "mean_ticks": sum(result["ticks"] for result in agent_results) / len(agent_results),
+                "seconds": sum(result["seconds"] for result in agent_results),
+            }
+        return summary
+
+
+if __name__ == '__main__':
+    import argparse
+    from src.logic.Agent import DropAgent, IdleAgent, RandomAgent
+    from src.logic.ExpectimaxAgent import ExpectimaxAgent
+    parser = argparse.ArgumentParser(description="play the built-in agents against each other on every core")
+    parser.add_argument("results", help="json lines file the results are streamed to (and resumed from)")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--size", type=int, default=16)
+    parser.add_argument("--max-ticks", type=int, default=10000)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, also seeding the random agent")
+    args = parser.parse_args()
+    agents = {"idle": IdleAgent(), "drop": DropAgent(), "random": RandomAgent(args.seed),
+              "expectimax": ExpectimaxAgent()}
+    tournament = Tournament(agents, args.games, args.results, args.size, args.max_ticks, args.processes, args.seed)
+    seconds = tournament.run()
+    print("played for %.2fs" % seconds)
+    print(json.dumps(Tournament.summarize(Tournament.load_results(args.results)), indent=2))
@@ -1,11 +1,24 @@
-import numpy
+from operator import itemgetter
+from src.logic.Piece import Piece
 
 
 class TransformPiece:
+    # the (x, y) offset of one step in each direction
+    vectors = {"up": (0, -1), "down": (0, 1), "left": (-1, 0), "right": (1, 0)}
+    opposites = {"up": "down", "down": "up", "left": "right", "right": "left"}
+    # direction -> (sort key, whether to reverse after sorting) putting the 'bottom' cells first
+    sort_orders = {
+        "up": (itemgetter(1), False),
+        "down": (itemgetter(1), True),
+        "left": (itemgetter(0), False),
+        "right": (itemgetter(0), True),
+    }
 
     @staticmethod
     def transform(piece, start_point):
         """transform the given piece in relative coordinates to the absolute coordinates"""
+        if isinstance(piece, Piece):
+            return piece.translated(start_point[0], start_point[1])
         new_piece = []
         for coord in piece:
             new_piece.append((coord[0] + start_point[0], coord[1] + start_point[1]))
@@ -14,77 +27,56 @@ class TransformPiece:
     @staticmethod
     def shift_coordinates(piece, direction):
         """shifts the given piece by 1 in the given direction (one of: 'up' 'down' 'left' 'right')"""
-        if direction == 'up':
-            return TransformPiece.transform(piece, (0, -1))
-        elif direction == 'down':
-            return TransformPiece.transform(piece, (0, 1))
-        elif direction == 'left':
-            return TransformPiece.transform(piece, (-1, 0))
-        elif direction == 'right':
-            return TransformPiece.transform(piece, (1, 0))
-        else:
+        step = TransformPiece.vectors.get(direction)
+        if step is None:
             # no valid direction given
             return piece
+        return TransformPiece.transform(piece, step)
+
+    @staticmethod
+    def get_direction_vector(direction):
+        """the (x, y) offset of a single step in the given direction"""
+        return TransformPiece.vectors.get(direction, (0, 0))
 
     @staticmethod
     def get_adjacent_coordinates(coords, direction):
         """returns the next coordinate pair in the given direction"""
-        return TransformPiece.shift_coordinates([coords], direction)[0]
+        step = TransformPiece.vectors.get(direction)
+        if step is None:
+            return coords
+        return coords[0] + step[0], coords[1] + step[1]
 
     @staticmethod
     def sort_cells(cells, direction):
         """return a sorted copy of the given cells with the 'bottom' cells first relative to the given direction"""
-        lam = None
-        if direction == "left" or direction == "right":
-            lam = lambda cell: cell[0]
-        elif direction == "up" or direction == "down":
-            lam = lambda cell: cell[1]
-        sorted_cells = list(sorted(cells, key=lam))
-        if direction == "down" or direction == "right":
+        key, reverse = TransformPiece.sort_orders.get(direction, (None, False))
+        sorted_cells = sorted(cells, key=key)
+        if reverse:
             sorted_cells.reverse()
         return sorted_cells
 
     @staticmethod
     def get_opposite_direction(direction):
-        if direction == 'up':
-            return "down"
-        elif direction == 'down':
-            return "up"
-        elif direction == 'left':
-            return "right"
-        elif direction == 'right':
-            return "left"
-        else:
-            # no valid direction given
-            return None
+        return TransformPiece.opposites.get(direction)
 
     @staticmethod
     def rotate(piece):
         """rotate piece counter-clockwise"""
-        new_piece = []
-        # declare rotation vector
-        rotation_vector = [[0, -1], [1, 0]]
-        # get pivot point: avg x, avg
-        x = numpy.round(numpy.mean(list(map(lambda c: c[0], piece))), 0)
-        y = numpy.round(numpy.mean(list(map(lambda c: c[1], piece))), 0)
-        pivot = (int(x), int(y))
-        for cell in piece:
-            if cell != pivot:
-                # get relative coords to pivot
-                relative_cell = [(cell[0] - pivot[0]), (cell[1] - pivot[1])]
-                # matrix multiply to get relative transformed cell
-                relative_transformed = numpy.dot(rotation_vector, relative_cell)
-                # add back in distance to pivot to get abs coord
-                abs_transformed = (int(relative_transformed[0] + pivot[0]), int(relative_transformed[1] + pivot[1]))
-                # append abs transformed cell to new_piece
-                new_piece.append(abs_transformed)
-            else:
-                new_piece.append((int(cell[0]), int(cell[1])))
-        return new_piece
+        if isinstance(piece, Piece):
+            return piece.rotated()
+        known = Piece.find(piece)
+        if known is None:
+            return Piece.rotate_cells(piece)
+        return list(known.rotated())
 
     @staticmethod
     def is_square(piece):
         """are the given coordinates a square?"""
+        if isinstance(piece, Piece):
+            return piece.is_square()
+        known = Piece.find(piece)
+        if known is not None:
+            return known.is_square()
         # [cell_0] [cell_1]
         # [cell_2] [cell_3]
         # ^ checking for the other 3 cells relative to 0
@@ -0,0 +1,67 @@
+from src.logic.Action import Action
+
+
+class Zobrist:
+    """64-bit keys for the parts of a position: a value in a cell, a cell of the active piece and the direction.
+    a position hashes to the XOR of the keys of its parts, so the hash is kept up to date by XORing keys in and out
+    as the parts change.
+
+    keys come from mixing the bits of what they stand for rather than from a random generator, so hashes agree
+    across runs and processes. they are cached as they are first needed. empty and missing cells have no key"""
+    mask = (1 << 64) - 1
+    # what a key is for, in the top bits of the code that gets mixed
+    cell_kind = 1
+    piece_kind = 2
+    direction_kind = 3
+    cell_keys = {}
+    piece_keys = {}
+
+    @staticmethod
+    def mix(code):
+        """the splitmix64 finalizer, a cheap bijection on 64-bit ints that spreads every input bit"""
+        code = (code + 0x9E3779B97F4A7C15) & Zobrist.mask
+        code = ((code ^ (code >> 30)) * 0xBF58476D1CE4E5B9) & Zobrist.mask
+        code = ((code ^ (code >> 27)) * 0x94D049BB133111EB) & Zobrist.mask
+        return code ^ (code >> 31)
+
+    @staticmethod
+    def code(kind, power, x, y):
+        """the parts of a key packed into one int: kind and power in the top 8 bits, then 24 bits per coordinate"""
+        return (((kind << 6 | power) << 24 | (x & 0xFFFFFF)) << 24) | (y & 0xFFFFFF)
+
+    @staticmethod
+    def cell_key(coords, value):
+        if value <= 0:
+            return 0
+        key = Zobrist.cell_keys.get((coords, value))
+        if key is None:
+            key = Zobrist.mix(Zobrist.code(Zobrist.cell_kind, value.bit_length() - 1, coords[0], coords[1]))
+            Zobrist.cell_keys[(coords, value)] = key
+        return key
+
+    @staticmethod
+    def piece_key(piece):
+        """the key of the given active piece cells, 0 for no piece"""
+        if piece is None:
+            return 0
+        key = 0
+        for coords in piece:
+            cell = Zobrist.piece_keys.get(coords)
+            if cell is None:
+                cell = Zobrist.mix(Zobrist.code(Zobrist.piece_kind, 0, coords[0], coords[1]))
+                Zobrist.piece_keys[coords] = cell
+            key ^= cell
+        return key
+
+    @staticmethod
+    def grid_hash(grid):
+        """the XOR of the keys of every cell of the given grid, from scratch"""
+        key = 0
+        for coords, value in grid.items():
+            if value > 0:
+                key ^= Zobrist.cell_key(coords, value)
+        return key
+
+
+Zobrist.direction_keys = {direction: Zobrist.mix(Zobrist.code(Zobrist.direction_kind, i, 0, 0))
+                          for i, direction in enumerate(Action.directions)}
@@ -1,12 +1,67 @@
-from src.display.Renderer import Renderer
-from src.logic.Board import Board
+import argparse
 import math
+import random
+import sys
+from src.logic.PieceGenerator import PieceGenerator
 
-board_size = 16
-square_size = 30
-padding_size = math.floor(square_size * .10)
-buffer_size = 4 # number of squares outside the main board
-board = Board(board_size)
-renderer = Renderer(board, square_size, padding_size, buffer_size)
-renderer.render()
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="play 2048tris")
+    parser.add_argument("--size", type=int, default=16, help="number of squares along each side of the board")
+    parser.add_argument("--buffer", type=int, default=4, help="number of squares shown outside the main board")
+    parser.add_argument("--square-size", type=int, default=30, help="width of a square in pixels")
+    parser.add_argument("--array", action="store_true", help="run on the numpy-backed ArrayBoard")
+    parser.add_argument("--chunked", action="store_true",
+                        help="run on ChunkedBoard, which only keeps the filled cells, for sizes of 1024 and up")
+    parser.add_argument("--headless", action="store_true",
+                        help="play random games without a window and print a report instead")
+    parser.add_argument("--games", type=int, default=100, help="number of games to play with --headless")
+    parser.add_argument("--seed", type=int, help="seed for the pieces, to play the same game again")
+    parser.add_argument("--record", help="save a replay of the game to this file")
+    parser.add_argument("--profile", help="time the phases of every tick and save the results to this file")
+    args = parser.parse_args(argv)
+
+    # numpy and pygame only get imported by the options that need them
+    if args.array:
+        from src.logic.ArrayBoard import ArrayBoard
+        board_type = ArrayBoard
+    elif args.chunked:
+        from src.logic.ChunkedBoard import ChunkedBoard
+        board_type = ChunkedBoard
+    else:
+        from src.logic.Board import Board
+        board_type = Board
+
+    if args.headless:
+        from src.logic.Simulator import RandomPolicy, Simulator
+        simulator = Simulator(args.size, board_type=board_type)
+        first_seed = args.seed if args.seed is not None else 0
+        print(simulator.run(lambda seed: RandomPolicy(seed), args.games, first_seed).format())
+        return 0
+
+    from src.display.Renderer import Renderer
+    seed = args.seed
+    replay = None
+    if args.record:
+        from src.logic.Replay import Replay
+        # a replay draws its pieces from the seed, so it needs one even if none was asked for
+        seed = seed if seed is not None else random.randrange(2 ** 32)
+        replay = Replay(args.size, seed)
+    padding_size = math.floor(args.square_size * .10)
+    board = board_type(args.size, PieceGenerator(seed))
+    if args.profile:
+        from src.logic.Profiler import Profiler
+        Profiler().attach(board)
+    renderer = Renderer(board, args.square_size, padding_size, args.buffer, replay=replay)
+    renderer.render()
+    if replay is not None:
+        replay.save(args.record)
+        print("replay of seed %d saved to %s" % (seed, args.record))
+    if board.profiler is not None:
+        print(board.profiler.format())
+        board.profiler.dump(args.profile)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
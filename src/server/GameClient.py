@@ -0,0 +1,89 @@
+import asyncio
+import random
+from src.logic.Action import Action
+
+
+class GameClient:
+    """the client end of the GameServer protocol, for tests and load runs in the same process as the server"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.session = None
+        self.size = None
+        self.seed = None
+        self.tick = 0
+        self.max_tile = 0
+        # the "over" line once the game has ended
+        self.over = None
+
+    @staticmethod
+    async def connect(host="127.0.0.1", port=7048, path=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        client = GameClient(reader, writer)
+        words = (await reader.readline()).decode().split()
+        client.session, client.size, client.seed = int(words[1]), int(words[2]), int(words[3])
+        return client
+
+    def send(self, command):
+        self.writer.write((command + "\n").encode())
+
+    async def read(self):
+        """the next line from the server split into words, keeping track of ticks and the end of the game, or None
+        once the connection is closed"""
+        line = await self.reader.readline()
+        if not line:
+            return None
+        words = line.decode().split()
+        if words[0] == "tick":
+            self.tick, self.max_tile = int(words[1]), int(words[2])
+        elif words[0] == "over":
+            self.tick, self.max_tile = int(words[1]), int(words[2])
+            self.over = words
+        return words
+
+    async def state(self):
+        """the server's view of the board: (tick, direction, values indexed [y][x])"""
+        self.send("state")
+        while True:
+            words = await self.read()
+            if words is None:
+                return None
+            if words[0] == "state":
+                values = [int(value) for value in words[3].split(",")]
+                return int(words[1]), words[2], [values[y * self.size:(y + 1) * self.size] for y in range(self.size)]
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            # the server closed its end first
+            pass
+
+    @staticmethod
+    async def play_random(host, port, seconds, actions_per_second, seed=None, path=None):
+        """send random inputs for the given number of seconds or until the game ends, returns the client. connects
+        to the unix socket at path if given, otherwise to host and port"""
+        client = await GameClient.connect(host, port, path)
+        rng = random.Random(seed)
+        reading = asyncio.ensure_future(GameClient.read_all(client))
+        loop = asyncio.get_event_loop()
+        end = loop.time() + seconds
+        try:
+            while client.over is None and not reading.done() and loop.time() < end:
+                client.send(rng.choice(Action.all))
+                await asyncio.sleep(rng.expovariate(actions_per_second))
+        except ConnectionError:
+            pass
+        reading.cancel()
+        await client.close()
+        return client
+
+    @staticmethod
+    async def read_all(client):
+        while await client.read() is not None:
+            pass
@@ -0,0 +1,238 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+from src.logic.Action import Action
+from src.logic.Board import Board
+from src.logic.Gravity import Gravity
+from src.logic.PieceGenerator import PieceGenerator
+from src.logic.Simulator import Simulator
+from src.server.TimerWheel import TimerWheel
+
+
+class Session:
+    """one client's game: its board and gravity, and the connection it is played over"""
+
+    def __init__(self, number, seed, board, gravity, writer):
+        self.number = number
+        self.seed = seed
+        self.board = board
+        self.gravity = gravity
+        self.writer = writer
+        self.tick = 0
+        # when the next gravity step is due, and its timer on the wheel
+        self.due = None
+        self.timer = None
+        self.closed = False
+
+    def apply(self, action):
+        """apply a client input as the renderer applies a key press"""
+        return Action.apply(self.board, action)
+
+    def step(self):
+        """one gravity step, as Renderer.update_board runs them"""
+        self.board.update_grid()
+        self.tick += 1
+        self.gravity.update_level(self.board)
+
+    def state(self):
+        """tick, direction and the board cell values row by row"""
+        size = self.board.size
+        values = ",".join(str(self.board.get_cell_value((x, y))) for y in range(size) for x in range(size))
+        return "state %d %s %s" % (self.tick, self.board.current_direction, values)
+
+
+class GameServer:
+    """many games in one process, one Session per connection, every session's gravity steps run by one TimerWheel.
+
+    the protocol is lines of text over a local socket. the client sends one command per line: any name in
+    Action.all (the inputs the renderer applies for key presses), "state" to get the board back, or "quit". the
+    server opens with "hello <session> <size> <seed>", sends "tick <tick> <max tile>" after each gravity step and
+    "over <tick> <max tile> <score>" when the game ends, then closes the connection. tick lines are skipped while a
+    client is too slow to read them"""
+    # bytes waiting to be sent to a client past which its tick lines are skipped
+    max_backlog = 65536
+    # connections waiting to be accepted, enough for a crowd of clients connecting at once
+    listen_backlog = 4096
+
+    def __init__(self, size=16, board_type=Board, gravity_type=Gravity, resolution=0.005, first_seed=None):
+        self.size = size
+        self.board_type = board_type
+        self.gravity_type = gravity_type
+        self.wheel = TimerWheel(resolution)
+        self.next_seed = first_seed
+        self.sessions = {}
+        self.opened = 0
+        self.ticks = 0
+        self.server = None
+        self.wheel_task = None
+        self.started = None
+        self.started_cpu = None
+
+    def take_seed(self):
+        if self.next_seed is None:
+            return random.randrange(2 ** 32)
+        seed = self.next_seed
+        self.next_seed += 1
+        return seed
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """listen on a unix socket at path if given, otherwise on host and port (0 picks a free port)"""
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle, path, backlog=GameServer.listen_backlog)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port, backlog=GameServer.listen_backlog)
+        self.wheel_task = asyncio.ensure_future(self.wheel.run())
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time()
+        return self.server
+
+    def address(self):
+        return self.server.sockets[0].getsockname()
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for session in list(self.sessions.values()):
+            self.close(session)
+        self.wheel.stop()
+        await self.wheel_task
+
+    async def handle(self, reader, writer):
+        seed = self.take_seed()
+        session = Session(self.opened, seed, self.board_type(self.size, PieceGenerator(seed)), self.gravity_type(),
+                          writer)
+        self.opened += 1
+        self.sessions[session.number] = session
+        writer.write(("hello %d %d %d\n" % (session.number, self.size, seed)).encode())
+        # the first step places the first piece
+        self.run_tick(session, time.perf_counter())
+        try:
+            while not session.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode().strip()
+                if command == "quit":
+                    break
+                elif command == "state":
+                    writer.write((session.state() + "\n").encode())
+                elif command in Action.all:
+                    session.apply(command)
+                elif command:
+                    writer.write(("error unknown command %s\n" % command).encode())
+        except ConnectionError:
+            pass
+        finally:
+            self.close(session)
+
+    def run_tick(self, session, now):
+        """the wheel callback stepping one session"""
+        session.timer = None
+        if session.closed:
+            return
+        session.step()
+        self.ticks += 1
+        board = session.board
+        max_tile = board.get_max_cell_value()
+        if board.game_over:
+            session.writer.write(("over %d %d %d\n" % (session.tick, max_tile, Simulator.get_score(board))).encode())
+            self.close(session)
+            return
+        if session.writer.transport.get_write_buffer_size() < GameServer.max_backlog:
+            session.writer.write(("tick %d %d\n" % (session.tick, max_tile)).encode())
+        interval = session.gravity.get_interval()
+        # a fixed timestep from when the step was due, so lateness does not add up over a game
+        session.due = now + interval if session.due is None else max(session.due + interval, now)
+        session.timer = self.wheel.schedule(session.due, lambda now: self.run_tick(session, now))
+
+    def close(self, session):
+        if session.closed:
+            return
+        session.closed = True
+        if session.timer is not None:
+            self.wheel.cancel(session.timer)
+        self.sessions.pop(session.number, None)
+        session.writer.close()
+
+    def summary(self):
+        """load since start: how many sessions, how much of a core their ticks took, and how late the ticks ran.
+        cpu time is the whole process's, so anything else running in it, like in-process clients, counts against
+        the sessions per core"""
+        seconds = time.perf_counter() - self.started
+        cpu_seconds = time.process_time() - self.started_cpu
+        utilization = cpu_seconds / seconds if seconds > 0 else 0.0
+        lateness = self.wheel.lateness
+        return {
+            "sessions": len(self.sessions),
+            "opened": self.opened,
+            "ticks": self.ticks,
+            "seconds": seconds,
+            "ticks_per_second": self.ticks / seconds if seconds > 0 else 0.0,
+            "cpu_utilization": utilization,
+            "sessions_per_core": len(self.sessions) / utilization if utilization > 0 else float("inf"),
+            "jitter_mean": lateness.total / lateness.calls if lateness.calls else 0.0,
+            "jitter_p50": lateness.percentile(50),
+            "jitter_p99": lateness.percentile(99),
+            "jitter_max": lateness.max,
+        }
+
+    def format(self):
+        summary = self.summary()
+        return "\n".join([
+            "%d sessions (%d opened), %d ticks in %.2fs, %.0f ticks/s" % (
+                summary["sessions"], summary["opened"], summary["ticks"], summary["seconds"],
+                summary["ticks_per_second"]),
+            "cpu %.1f%% of a core, %.0f sessions per core" % (summary["cpu_utilization"] * 100,
+                                                              summary["sessions_per_core"]),
+            "tick jitter mean %.2fms p50 %.2fms p99 %.2fms max %.2fms" % (
+                summary["jitter_mean"] * 1000, summary["jitter_p50"] * 1000, summary["jitter_p99"] * 1000,
+                summary["jitter_max"] * 1000),
+        ])
+
+
+async def load_test(server, clients, seconds, actions_per_second, path=None):
+    """connect the given number of in-process clients playing random inputs, and report on the server after the
+    given number of seconds. path is the unix socket the server listens on, if it does"""
+    from src.server.GameClient import GameClient
+    host, port = (None, None) if path is not None else server.address()[:2]
+    players = [asyncio.ensure_future(GameClient.play_random(host, port, seconds, actions_per_second, seed, path))
+               for seed in range(clients)]
+    await asyncio.sleep(seconds)
+    report = server.format()
+    await asyncio.gather(*players)
+    return report
+
+
+async def serve(args):
+    server = GameServer(args.size, resolution=args.resolution, first_seed=args.seed)
+    await server.start(port=args.port, path=args.unix)
+    if args.load:
+        print(await load_test(server, args.load, args.seconds, args.actions_per_second, args.unix))
+        await server.stop()
+        return
+    print("serving on %s" % (args.unix or "%s:%d" % server.address()[:2]))
+    await server.server.wait_closed()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="serve many games of 2048tris over a local socket")
+    parser.add_argument("--size", type=int, default=16, help="number of squares along each side of the boards")
+    parser.add_argument("--port", type=int, default=7048, help="port to listen on at 127.0.0.1")
+    parser.add_argument("--unix", help="listen on a unix socket at this path instead")
+    parser.add_argument("--resolution", type=float, default=0.005, help="seconds per slot of the tick scheduler")
+    parser.add_argument("--seed", type=int, help="seed of the first game, the next games count up from it")
+    parser.add_argument("--load", type=int, help="play this many in-process clients and print a load report")
+    parser.add_argument("--seconds", type=float, default=10, help="length of the --load run")
+    parser.add_argument("--actions-per-second", type=float, default=5, help="inputs per --load client per second")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import asyncio
+import math
+import time
+from src.logic.Profiler import PhaseTimes
+
+
+class TimerWheel:
+    """one scheduler for the timers of every session: slots of resolution seconds in a ring, a timer going into the
+    slot it is due in, with the number of turns of the ring left before then for timers further off than one turn.
+    a single task wakes up once per slot and runs whatever is due, however many timers there are.
+
+    a timer runs in the first slot at or after its due time, so up to one resolution late even on an idle loop. how
+    late every timer actually ran is kept in lateness"""
+
+    def __init__(self, resolution=0.005, slots=256, window=10000, clock=time.perf_counter):
+        self.resolution = resolution
+        # entries are [turns left, due time, callback], the callback None once cancelled
+        self.slots = [[] for _ in range(slots)]
+        self.clock = clock
+        # slot to run next, and the time it is due
+        self.current = 0
+        self.time = clock()
+        self.count = 0
+        self.lateness = PhaseTimes(window)
+        self.running = False
+
+    def schedule(self, due, callback):
+        """run callback(now) at the given clock time, returns a timer for cancel"""
+        ahead = max(0, math.ceil((due - self.time) / self.resolution - 1e-9))
+        timer = [ahead // len(self.slots), due, callback]
+        self.slots[(self.current + ahead) % len(self.slots)].append(timer)
+        self.count += 1
+        return timer
+
+    def cancel(self, timer):
+        if timer[2] is not None:
+            timer[2] = None
+            self.count -= 1
+
+    def advance(self, now):
+        """run every timer due by now, slot by slot. each callback gets the clock time it actually started at"""
+        while self.time <= now:
+            timers = self.slots[self.current]
+            self.slots[self.current] = []
+            # timers scheduled while these run go into later slots
+            self.current = (self.current + 1) % len(self.slots)
+            self.time += self.resolution
+            for timer in timers:
+                if timer[2] is None:
+                    continue
+                if timer[0]:
+                    timer[0] -= 1
+                    self.slots[self.current - 1].append(timer)
+                    continue
+                callback = timer[2]
+                timer[2] = None
+                self.count -= 1
+                # read again per timer, the callbacks before it in the slot take time too
+                started = max(now, self.clock())
+                self.lateness.add(max(0.0, started - timer[1]))
+                callback(started)
+
+    async def run(self):
+        """run the timers as they come due until stop is called"""
+        self.running = True
+        while self.running:
+            await asyncio.sleep(max(0.0, self.time - self.clock()))
+            self.advance(self.clock())
+
+    def stop(self):
+        self.running = False
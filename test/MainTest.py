@@ -0,0 +1,27 @@
+import io
+import subprocess
+import sys
+import unittest
+from contextlib import redirect_stdout
+from src import main
+
+
+class MainTest(unittest.TestCase):
+    def test_logic_imports_without_numpy_or_pygame(self):
+        # a fresh interpreter, since this one has long since imported both
+        code = "import sys\n" \
+               "import src.main, src.logic.Board, src.logic.Simulator, src.logic.Tournament, src.logic.BitBoard, " \
+               "src.logic.ChunkedBoard\n" \
+               "print(sorted(name for name in ('numpy', 'pygame') if name in sys.modules))"
+        output = subprocess.check_output([sys.executable, "-c", code])
+        self.assertEqual(output.decode().strip(), "[]")
+
+    def test_headless(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(main.main(["--headless", "--games", "2", "--size", "8"]), 0)
+        self.assertIn("games", output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
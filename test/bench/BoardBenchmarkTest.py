@@ -0,0 +1,42 @@
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stderr
+from bench.BoardBenchmark import BoardBenchmark, main
+
+
+class BoardBenchmarkTest(unittest.TestCase):
+    def test_tiny_budget_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.json")
+            start = time.perf_counter()
+            with redirect_stderr(io.StringIO()):
+                self.assertEqual(main(["--sizes", "8", "64", "--budget", "0.01", "--output", path]), 0)
+                # the same run again is no regression against itself by any sensible threshold
+                self.assertEqual(main(["--sizes", "8", "64", "--budget", "0.01", "--output", path + ".2",
+                                       "--baseline", path, "--threshold", "1000"]), 0)
+            self.assertLess(time.perf_counter() - start, 30)
+            with open(path) as results_file:
+                results = json.load(results_file)["results"]
+        self.assertEqual(len(results), len(BoardBenchmark(sizes=[8]).benchmarks) * 2)
+        for result in results.values():
+            self.assertGreaterEqual(result["repeats"], 1)
+
+    def test_setup_counts_against_budget(self):
+        benchmark = BoardBenchmark(budget=0.05, max_repeats=100000)
+
+        def slow_setup(size):
+            time.sleep(0.01)
+            return size
+        result = benchmark.time_benchmark(slow_setup, lambda fixture: None, 8)
+        # the operation alone would never fill the budget, the setups do
+        self.assertLessEqual(result["repeats"], 6)
+        capped = BoardBenchmark(budget=10, max_repeats=5).time_benchmark(lambda size: size, lambda fixture: None, 8)
+        self.assertEqual(capped["repeats"], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+import pygame
+from pygame.constants import *
+from src.controls.InputQueue import InputQueue
+
+
+class InputQueueTest(unittest.TestCase):
+    def test_keeps_every_press_in_order(self):
+        inputs = InputQueue()
+        inputs.push([InputQueueTest.key(KEYDOWN, K_LEFT), InputQueueTest.key(KEYDOWN, K_SLASH),
+                     InputQueueTest.key(KEYDOWN, K_d), InputQueueTest.key(KEYDOWN, K_LEFT),
+                     InputQueueTest.key(KEYDOWN, K_j)], 0)
+        self.assertEqual(inputs.take(0), ["shift_left", "rotate", "direction_right", "shift_left"])
+        self.assertEqual(inputs.take_debug(), ["print_grid"])
+        self.assertEqual(inputs.take(0), [])
+
+    def test_held_shift_repeats(self):
+        inputs = InputQueue(delay=0.2, repeat_interval=0.05)
+        inputs.push([InputQueueTest.key(KEYDOWN, K_RIGHT), InputQueueTest.key(KEYDOWN, K_SPACE)], 0)
+        self.assertEqual(inputs.take(0.1), ["shift_right", "drop"])
+        self.assertEqual(inputs.take(0.31), ["shift_right"] * 3)
+        inputs.push([InputQueueTest.key(KEYUP, K_RIGHT), InputQueueTest.key(KEYDOWN, K_UP)], 0.36)
+        self.assertEqual(inputs.take(0.4), ["shift_right", "shift_up"])
+
+    @staticmethod
+    def key(event_type, key):
+        return pygame.event.Event(event_type, key=key)
+
+
+if __name__ == '__main__':
+    unittest.main()
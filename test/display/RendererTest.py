@@ -0,0 +1,59 @@
+import os
+import random
+import unittest
+from unittest import mock
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+from src.display.Renderer import Renderer
+from src.logic.Action import Action
+from src.logic.ArrayBoard import ArrayBoard
+from src.logic.Board import Board
+from src.logic.ChunkedBoard import ChunkedBoard
+from src.logic.PieceGenerator import PieceGenerator
+
+
+class RendererTest(unittest.TestCase):
+    def test_redraws_changed_cells_like_a_full_repaint(self):
+        # a live display keeps SDL threads around, which the process pools of later tests must not fork
+        self.addCleanup(pygame.quit)
+        for board_type in [Board, ArrayBoard, ChunkedBoard]:
+            with self.subTest(board_type=board_type.__name__):
+                RendererTest.check_redraws(self, board_type)
+
+    def check_redraws(self, board_type):
+        board = board_type(8, PieceGenerator(11))
+        renderer = Renderer(board, 10, 2, 4)
+        rng = random.Random(11)
+        with mock.patch("pygame.display.update") as update, mock.patch("pygame.display.flip"):
+            renderer.step()
+            renderer.draw_board()
+            for _ in range(150):
+                if board.game_over:
+                    break
+                before = dict(board.grid.items())
+                Action.apply(board, rng.choice(Action.all))
+                renderer.step()
+                update.reset_mock()
+                renderer.draw_board()
+                after = dict(board.grid.items())
+                changed = {cell for cell in before.keys() | after.keys() if before.get(cell, -1) != after.get(cell, -1)}
+                squares = {RendererTest.square(renderer, cell) for cell in changed}
+                squares.discard(None)
+                rects = {tuple(rect) for rect in update.call_args[0][0]} if update.called else set()
+                self.assertEqual(rects, squares)
+                full = pygame.Surface(renderer.surface.get_size())
+                Renderer.get_board_image(board, renderer.square_size, renderer.padding_size, renderer.buffer_size,
+                                         full, full.get_rect(), renderer.tiles)
+                self.assertEqual(pygame.image.tobytes(renderer.surface, "RGB"), pygame.image.tobytes(full, "RGB"))
+                self.assertEqual(pygame.image.tobytes(renderer.screen, "RGB"), pygame.image.tobytes(full, "RGB"))
+
+    @staticmethod
+    def square(renderer, cell):
+        """the on-screen rectangle of the given cell as a tuple, None if it is off the surface"""
+        square = Renderer.get_square(cell, renderer.square_size, renderer.padding_size, renderer.buffer_size)
+        visible = square.clip(renderer.surface.get_rect())
+        return tuple(visible) if visible.width else None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import unittest
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+from src.display.Renderer import Renderer
+from src.display.TileCache import TileCache
+from src.logic.Board import Board
+
+
+class TileCacheTest(unittest.TestCase):
+    def test_renders_each_value_once(self):
+        tiles = TileCache(32, Renderer.get_color)
+        tile = tiles.get(2)
+        self.assertIs(tiles.get(2), tile)
+        self.assertEqual(tile.get_size(), (32, 32))
+        self.assertEqual(list(tiles.tiles), [2])
+
+    def test_builds_tiles_past_the_palette_on_first_use(self):
+        tiles = TileCache(32, Renderer.get_color)
+        self.assertEqual(tiles.tiles, {})
+        self.assertIsNone(tiles.font)
+        tile = tiles.get(4096)
+        self.assertEqual(list(tiles.tiles), [4096])
+        self.assertIs(tiles.get(4096), tile)
+
+    def test_new_square_size_gets_its_own_cache(self):
+        small = TileCache(32, Renderer.get_color)
+        large = TileCache(48, Renderer.get_color)
+        self.assertEqual(small.get(8).get_size(), (32, 32))
+        self.assertEqual(large.get(8).get_size(), (48, 48))
+        self.assertEqual(large.tiles.keys(), {8})
+        # a board image drawn without a cache builds one at its own square size
+        surface = pygame.Surface((104, 104))
+        Renderer.get_board_image(Board(2), 48, 2, 0, surface, surface.get_rect())
+        self.assertEqual(surface.get_at((49, 2)), TileCacheTest.filled(Renderer.get_color(0)))
+        self.assertEqual(surface.get_at((50, 2)), TileCacheTest.filled(pygame.Color(Renderer.background_color)))
+
+    def test_tiles_are_labelled(self):
+        tiles = TileCache(32, Renderer.get_color)
+        for value in [2, 2048, 65536]:
+            plain = pygame.Surface((32, 32))
+            plain.fill(Renderer.get_color(value))
+            tile = tiles.get(value)
+            self.assertTrue(any(tile.get_at((x, y)) != plain.get_at((x, y)) for x in range(32) for y in range(32)))
+        # empty cells carry no label
+        empty = tiles.get(0)
+        self.assertTrue(all(empty.get_at((x, y)) == TileCacheTest.filled(Renderer.get_color(0))
+                            for x in range(32) for y in range(32)))
+
+    @staticmethod
+    def filled(color):
+        """the pixel a surface shows after being filled with the given color"""
+        surface = pygame.Surface((1, 1))
+        surface.fill(color)
+        return surface.get_at((0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import random
+import unittest
+from src.logic.ArrayBoard import ArrayBoard
+from src.logic.ArrayGrid import ArrayGrid
+from src.logic.Board import Board
+from src.logic.PieceGenerator import PieceGenerator
+from src.logic.Zobrist import Zobrist
+
+
+class ArrayBoardTest(unittest.TestCase):
+    def test_compact(self):
+        grid = ArrayGrid(4)
+        for coords, value in {(0, 0): 2, (0, 2): 4, (1, 1): 8, (3, 3): 2}.items():
+            grid[coords] = value
+        grid.compact("down")
+        self.assertEqual(grid.inner.tolist(), [[0, 0, 2, 4], [0, 0, 0, 8], [0, 0, 0, 0], [0, 0, 0, 2]])
+        grid.compact("left")
+        self.assertEqual(grid.inner.tolist(), [[0, 0, 2, 4], [0, 0, 0, 8], [0, 0, 0, 2], [0, 0, 0, 0]])
+        grid.compact("up")
+        self.assertEqual(grid.inner.tolist(), [[2, 4, 0, 0], [8, 0, 0, 0], [2, 0, 0, 0], [0, 0, 0, 0]])
+
+    def test_complete_lines(self):
+        grid = ArrayGrid(3)
+        for x in range(3):
+            grid[(x, 2)] = 2
+        grid[(1, 1)] = 4
+        self.assertEqual(grid.complete_lines("down").tolist(), [False, False, True])
+        self.assertEqual(grid.complete_lines("right").tolist(), [False, False, False])
+        self.assertTrue(grid.is_line_complete(2, "up"))
+        self.assertFalse(grid.is_line_complete(1, "up"))
+
+    def test_shift_segment(self):
+        grid = ArrayGrid(4)
+        grid[(1, 0)] = 2
+        grid[(1, 1)] = 4
+        grid.shift_segment((1, 2), "down")
+        self.assertEqual(grid.lane(1, "down").tolist(), [0, 2, 4, 0])
+        grid.shift_segment((1, 0), "up")
+        self.assertEqual(grid.lane(1, "up").tolist(), [2, 4, 0, 0])
+
+    def test_hash_follows_changes(self):
+        grid = ArrayGrid.from_dict(4, {(0, 0): 2, (1, 1): 4, (0, -3): 4, (30, 30): 8})
+        changes = [lambda: grid.__setitem__((1, 0), 8), lambda: grid.__setitem__((1, 1), 2),
+                   lambda: grid.__delitem__((0, -3)), lambda: grid.shift_segment((1, 3), "down"),
+                   lambda: grid.compact_lane(0, "right"), lambda: grid.compact("up"),
+                   lambda: grid.__setitem__((2, 2), 16)]
+        for change in changes:
+            change()
+            self.assertEqual(grid.cells_hash(), Zobrist.grid_hash(grid.copy()))
+
+    def test_behaves_like_dict_grid(self):
+        grid = ArrayGrid.from_dict(2, {(0, 0): 2, (1, 1): 0, (0, -3): 4, (30, 30): 8})
+        self.assertDictEqual(grid.copy(), {(0, 0): 2, (0, 1): 0, (1, 0): 0, (1, 1): 0, (0, -3): 4, (30, 30): 8})
+        self.assertIsNone(grid.get((5, 5)))
+        self.assertEqual(grid.max_value(), 8)
+
+    def test_static_merge(self):
+        grid = [[0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 2, 2, 0, 0, 0],
+                [0, 0, 0, 2, 2, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0, 2],
+                [0, 2, 0, 0, 0, 2, 0, 2],
+                [2, 2, 2, 2, 2, 2, 2, 2]]
+        board = Board(len(grid))
+        board.grid = Board.grid_from_visual_grid(grid)
+        board.active_piece = [(3, 1), (3, 2), (4, 1), (4, 2)]
+        array_board = ArrayBoard(len(grid))
+        array_board.grid = Board.grid_from_visual_grid(grid)
+        array_board.active_piece = [(3, 1), (3, 2), (4, 1), (4, 2)]
+        board.update_grid()
+        array_board.update_grid()
+        self.assertDictEqual(ArrayBoardTest.filled_grid(array_board), ArrayBoardTest.filled_grid(board))
+
+    def test_matches_board_over_random_games(self):
+        actions = [None, None, None, "left", "right", "up", "down", "drop", "rotate", "change"]
+        directions = ["up", "down", "left", "right"]
+        for seed in range(8):
+            script = random.Random(seed)
+            # each board draws the same pieces from a generator of its own
+            boards = [Board(8, PieceGenerator(seed)), ArrayBoard(8, PieceGenerator(seed))]
+            for tick in range(300):
+                action = script.choice(actions)
+                direction = script.choice(directions)
+                for board in boards:
+                    if board.game_over:
+                        continue
+                    if board.active_piece is None:
+                        board.update_grid()
+                    elif action == "change":
+                        board.change_direction(direction)
+                    elif action == "drop":
+                        board.drop_active_piece()
+                    elif action == "rotate":
+                        board.rotate_active_piece()
+                    elif action is not None:
+                        board.shift_active_piece(action)
+                    board.update_grid()
+                self.assertDictEqual(ArrayBoardTest.filled_grid(boards[1]), ArrayBoardTest.filled_grid(boards[0]),
+                                     "seed %d tick %d" % (seed, tick))
+                self.assertEqual(boards[1].game_over, boards[0].game_over)
+                self.assertEqual(boards[1].state_hash(), boards[0].state_hash(), "seed %d tick %d" % (seed, tick))
+
+    @staticmethod
+    def filled_grid(board):
+        """return the board's grid without the cells that were cleared to -1"""
+        return {cell: value for cell, value in board.grid.items() if value != -1}
+
+
+if __name__ == '__main__':
+    unittest.main()
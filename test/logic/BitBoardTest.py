@@ -0,0 +1,114 @@
+import random
+import unittest
+from src.logic.BitBoard import BitBoard
+from src.logic.Board import Board
+from src.logic.PieceGenerator import PieceGenerator
+
+
+class BitBoardTest(unittest.TestCase):
+    def test_cell_values(self):
+        bit_board = BitBoard(4)
+        bit_board.set_cell_value((3, 0), 2)
+        bit_board.set_cell_value((0, 1), 2048)
+        bit_board.set_cell_value((3, 0), 8)
+        self.assertEqual(bit_board.get_cell_value((3, 0)), 8)
+        self.assertEqual(bit_board.get_cell_value((0, 1)), 2048)
+        self.assertEqual(bit_board.get_cell_value((1, 1)), 0)
+        self.assertEqual(bit_board.get_cell_value((4, 0)), -1)
+        self.assertEqual(bit_board.get_max_cell_value(), 2048)
+        bit_board.set_cell_value((0, 1), 0)
+        self.assertEqual(bit_board.get_max_cell_value(), 8)
+        self.assertEqual(bit_board.filled_count(), 1)
+        self.assertRaises(ValueError, bit_board.set_cell_value, (1, 1), 6)
+
+    def test_rows_do_not_wrap(self):
+        bit_board = BitBoard(4)
+        bit_board.set_cell_value((3, 0), 2)
+        self.assertEqual(bit_board.shift(bit_board.bit((3, 0)), "right"), 0)
+        self.assertEqual(bit_board.shift(bit_board.bit((0, 1)), "left"), 0)
+        self.assertEqual(bit_board.cells(bit_board.shift(bit_board.bit((3, 0)), "down")), [(3, 1)])
+
+    def test_complete_lines(self):
+        grid = [[0, 0, 0, 0],
+                [0, 0, 2, 0],
+                [4, 2, 2, 8],
+                [2, 2, 2, 2]]
+        board = Board(len(grid))
+        board.grid = Board.grid_from_visual_grid(grid)
+        bit_board = BitBoard.from_board(board)
+        self.assertEqual(bit_board.completed_lines("down"), [2, 3])
+        self.assertEqual(bit_board.completed_lines("left"), [])
+        self.assertTrue(bit_board.is_row_complete(board.get_line(3, "down")))
+        self.assertEqual(bit_board.cells(bit_board.line_merges("down")), [(2, 2), (1, 3), (2, 3)])
+        for y in range(4):
+            bit_board.set_cell_value((2, y), 4)
+        self.assertEqual(bit_board.completed_lines("right"), [2])
+        self.assertTrue(bit_board.is_line_complete(2, "left"))
+
+    def test_matches_board_over_random_games(self):
+        actions = [None, None, "left", "right", "up", "down", "drop", "rotate", "change"]
+        directions = ["up", "down", "left", "right"]
+        # the pieces come from a seeded generator of the test's own, leaving the random module alone
+        pieces = random.Random(5)
+        script = random.Random(5)
+        board = Board(8, PieceGenerator(rng=pieces))
+        checked = 0
+        for tick in range(3000):
+            if board.game_over:
+                board = Board(8, PieceGenerator(rng=pieces))
+            piece = board.active_piece
+            # only the active piece may sit outside the board, which a bit board leaves out
+            if piece and all(not board.is_out_of_bounds(cell) or cell in piece
+                             for cell, value in board.grid.items() if value > 0):
+                bit_board = BitBoard.from_board(board)
+                self.assertEqual(bit_board.piece_collision_exists(piece), board.piece_collision_exists(piece))
+                if not board.piece_collision_exists(piece):
+                    self.assertEqual(bit_board.get_drop_distance(piece), board.get_drop_distance(piece))
+                self.assertEqual(bit_board.completed_lines(), board.completed_lines())
+                # the values of piece cells in the buffer are left out as well, so only compare merges on the board
+                on_board = not any(board.is_out_of_bounds(cell) for cell in piece)
+                for direction in directions if on_board else ():
+                    shifted = Board(8)
+                    shifted.grid = dict(board.grid)
+                    shifted.current_direction = board.current_direction
+                    self.assertEqual(bit_board.shift_merges(piece, direction),
+                                     bool(shifted.shift_cells(piece, direction)), "tick %d" % tick)
+                # a rotation into a matching cell leaves a piece with mixed values, drop_piece takes one value
+                values = set(board.get_cell_value(cell) for cell in piece)
+                if on_board and len(values) == 1:
+                    dropped = Board(8)
+                    dropped.grid = dict(board.grid)
+                    dropped.current_direction = board.current_direction
+                    dropped.active_piece = piece
+                    dropped.drop_active_piece()
+                    without_piece = bit_board.copy()
+                    for cell in piece:
+                        without_piece.set_cell_value(cell, 0)
+                    self.assertEqual(without_piece.drop_piece(piece, values.pop()),
+                                     BitBoard.from_board(dropped), "tick %d" % tick)
+                    turned = Board(8)
+                    turned.grid = dict(board.grid)
+                    turned.current_direction = directions[tick % 4]
+                    turned.active_piece = piece
+                    turned.static_drop()
+                    compacted = bit_board.copy()
+                    compacted.compact(turned.current_direction)
+                    self.assertEqual(compacted.planes, BitBoard.from_board(turned).planes)
+                checked += 1
+            action = script.choice(actions)
+            if piece is None:
+                pass
+            elif action == "change":
+                board.change_direction(script.choice(directions))
+            elif action == "drop":
+                board.drop_active_piece()
+            elif action == "rotate":
+                board.rotate_active_piece()
+            elif action is not None:
+                board.shift_active_piece(action)
+            board.update_grid()
+        self.assertGreater(checked, 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
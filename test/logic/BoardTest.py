@@ -1,5 +1,6 @@
 import unittest
 from src.logic.Board import Board
+from src.logic.TransformPiece import TransformPiece
 
 class BoardTest(unittest.TestCase):
     def test_active_piece_merge_down(self):
@@ -55,9 +56,9 @@ class BoardTest(unittest.TestCase):
                      [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 4, 2, 0, 0, 0],
                      [0, 0, 0, 0, 0, 0, 0, 2, 2, 4, 4, 2, 2, 0, 0, 0]]
         board.update_grid()
-        self.assertDictEqual(board.grid, BoardTest.grid_from_visual_grid(pre_merge))
+        self.assertDictEqual(dict(board.grid), Board.grid_from_visual_grid(pre_merge))
         board.update_grid()
-        self.assertDictEqual(BoardTest.grid_without_buffer(board), BoardTest.grid_from_visual_grid(post_merge))
+        self.assertDictEqual(BoardTest.grid_without_buffer(board), Board.grid_from_visual_grid(post_merge))
 
     def test_active_merge_side(self):
         self.maxDiff = None
@@ -96,7 +97,7 @@ class BoardTest(unittest.TestCase):
                       [0, 0, 0, 0, 0, 0, 0, 0, 4, 4, 0, 0, 0, 0, 0, 0],
                       [0, 0, 0, 0, 0, 0, 0, 0, 0, 4, 0, 0, 0, 0, 0, 0],
                       [0, 0, 0, 0, 0, 0, 0, 0, 0, 4, 2, 0, 0, 0, 0, 0]]
-        self.assertDictEqual(BoardTest.grid_without_buffer(board), BoardTest.grid_from_visual_grid(grid_after))
+        self.assertDictEqual(BoardTest.grid_without_buffer(board), Board.grid_from_visual_grid(grid_after))
 
 
     def test_static_merge(self):
@@ -136,7 +137,7 @@ class BoardTest(unittest.TestCase):
                     [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2],
                     [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2],
                     [2, 4, 2, 2, 2, 4, 2, 2, 2, 2, 2, 2, 2, 2, 2, 4]]
-        self.assertDictEqual(board.grid, BoardTest.grid_from_visual_grid(new_grid))
+        self.assertDictEqual(dict(board.grid), Board.grid_from_visual_grid(new_grid))
 
     def test_game_over(self):
         self.maxDiff = None
@@ -157,30 +158,189 @@ class BoardTest(unittest.TestCase):
                 [0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 0, 0, 0, 0, 0, 0],
                 [0, 0, 0, 0, 0, 0, 0, 0, 2, 2, 0, 0, 0, 0, 0, 0]]
         board = BoardTest.board_from_visual_grid(grid)
-        board.grid[(7, -2)] = 2
-        board.grid[(7, -1)] = 2
-        board.grid[(8, -2)] = 2
-        board.grid[(8, -1)] = 2
+        board.set_cell_value((7, -2), 2)
+        board.set_cell_value((7, -1), 2)
+        board.set_cell_value((8, -2), 2)
+        board.set_cell_value((8, -1), 2)
+        # without an active piece update_grid would place a random new one instead of landing this one
+        board.active_piece = [(7, -2), (7, -1), (8, -2), (8, -1)]
         board.update_grid()
         self.assertTrue(board.game_over)
 
+    def test_grid_is_read_only(self):
+        board = BoardTest.board_from_visual_grid([[0, 2], [0, 0]])
+        with self.assertRaises(TypeError):
+            board.grid[(0, 0)] = 2
+        # the counts only stay right because every write goes through set_cell_value
+        board.set_cell_value((0, 0), 2)
+        self.assertEqual(board.grid[(0, 0)], 2)
+        self.assertEqual(board.row_counts, [2, 0])
+        self.assertIs(board.grid, board.grid)
+
+    def test_line_counts(self):
+        grid = [[0, 0, 2, 2],
+                [0, 0, 0, 4],
+                [0, 2, 4, 2],
+                [0, 0, 8, 2]]
+        board = BoardTest.board_from_visual_grid(grid)
+        self.assertEqual(board.row_counts, [2, 1, 3, 2])
+        self.assertEqual(board.column_counts, [0, 1, 3, 4])
+        self.assertEqual(board.completed_lines("right"), [3])
+        self.assertEqual(board.completed_lines("down"), [])
+        board.set_cell_value((0, 1), 2)
+        board.clear_cell((2, 0))
+        self.assertEqual(board.row_counts, [1, 2, 3, 2])
+        self.assertEqual(board.column_counts, [1, 1, 2, 4])
+
+    def test_static_merge_right(self):
+        grid = [[0, 0, 2, 2],
+                [0, 0, 0, 4],
+                [0, 2, 4, 2],
+                [0, 0, 8, 2]]
+        board = BoardTest.board_from_visual_grid(grid)
+        board.current_direction = "right"
+        self.assertEqual(board.completed_lines(), [3])
+        self.assertEqual(board.completed_lines("down"), [])
+        board.merge_with_completed_rows()
+        new_grid = [[0, 0, 0, 4],
+                    [0, 0, 0, 4],
+                    [0, 2, 4, 2],
+                    [0, 0, 8, 2]]
+        self.assertDictEqual(dict(board.grid), Board.grid_from_visual_grid(new_grid))
+        self.assertEqual(board.row_counts, [1, 1, 3, 2])
+        self.assertEqual(board.column_counts, [0, 1, 2, 4])
+
+    def test_static_merge_left_needs_full_column(self):
+        grid = [[2, 2, 0, 0],
+                [0, 0, 0, 0],
+                [0, 0, 0, 0],
+                [0, 0, 0, 0]]
+        board = BoardTest.board_from_visual_grid(grid)
+        board.current_direction = "left"
+        # column 0 is not full, so nothing merges. the old check looked at the first i + 1 cells of column 0 for
+        # line i, so a single tile at (0, 0) counted as line 0 being complete and merged (1, 0) into it
+        board.merge_with_completed_rows()
+        self.assertDictEqual(dict(board.grid), Board.grid_from_visual_grid(grid))
+
+
+    def test_drop_active_piece(self):
+        grid = [[0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 4, 0, 0],
+                [0, 0, 0, 0, 0, 0],
+                [2, 0, 8, 0, 0, 0]]
+        board = BoardTest.board_from_visual_grid(grid)
+        board.active_piece = [(1, -2), (2, -2), (3, -2), (2, -1)]
+        for cell in board.active_piece:
+            board.set_cell_value(cell, 2)
+        self.assertEqual(board.get_drop_distance(board.active_piece), 4)
+        self.assertEqual(board.get_drop_distance([(4, 0)]), 5)
+        board.drop_active_piece()
+        new_grid = [[0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0],
+                    [0, 2, 2, 2, 0, 0],
+                    [0, 0, 2, 4, 0, 0],
+                    [0, 0, 0, 0, 0, 0],
+                    [2, 0, 8, 0, 0, 0]]
+        self.assertDictEqual(BoardTest.grid_without_buffer(board), Board.grid_from_visual_grid(new_grid))
+        self.assertEqual(board.active_piece, [(1, 2), (2, 2), (3, 2), (2, 3)])
+
+    def test_static_drop(self):
+        grid = [[0, 2, 0, 4],
+                [0, 0, 0, 0],
+                [8, 0, 2, 0],
+                [0, 4, 0, 2]]
+        board = BoardTest.board_from_visual_grid(grid)
+        board.active_piece = []
+        board.current_direction = "left"
+        board.static_drop()
+        new_grid = [[2, 4, 0, 0],
+                    [0, 0, 0, 0],
+                    [8, 2, 0, 0],
+                    [4, 2, 0, 0]]
+        self.assertDictEqual(dict(board.grid), Board.grid_from_visual_grid(new_grid))
+        self.assertEqual(board.column_counts, [3, 3, 0, 0])
+
+    def test_changed_cells(self):
+        grid = [[0, 2, 0, 4],
+                [0, 0, 0, 0],
+                [8, 0, 2, 0],
+                [0, 4, 0, 2]]
+        board = BoardTest.board_from_visual_grid(grid)
+        board.track_changes()
+        board.active_piece = []
+        board.current_direction = "left"
+        board.static_drop()
+        board.set_cell_value((0, 0), 2)
+        self.assertEqual(board.take_changed_cells(), {(0, 0), (1, 0), (3, 0), (1, 2), (2, 2), (0, 3), (1, 3), (3, 3)})
+        self.assertEqual(board.take_changed_cells(), set())
+
+    def test_state_hash(self):
+        grid = [[0, 2, 0, 4],
+                [0, 0, 0, 0],
+                [8, 0, 2, 0],
+                [0, 4, 0, 2]]
+        board = BoardTest.board_from_visual_grid(grid)
+        start = board.state_hash()
+        board.set_cell_value((0, 0), 2)
+        board.set_cell_value((1, 1), 4)
+        self.assertNotEqual(board.state_hash(), start)
+        board.clear_cell((1, 1))
+        board.clear_cell((0, 0))
+        self.assertEqual(board.state_hash(), start)
+        board.current_direction = "left"
+        self.assertNotEqual(board.state_hash(), start)
+        board.current_direction = "down"
+        board.active_piece = [(2, 2)]
+        self.assertNotEqual(board.state_hash(), start)
+        board.active_piece = []
+        # the same position reached any other way hashes the same
+        board.static_drop()
+        self.assertEqual(board.state_hash(), BoardTest.board_from_visual_grid([[0, 0, 0, 0],
+                                                                               [0, 0, 0, 0],
+                                                                               [0, 2, 0, 4],
+                                                                               [8, 4, 2, 2]]).state_hash())
+
+    def test_max_cell_value_follows_changes(self):
+        board = BoardTest.board_from_visual_grid([[0, 2, 0, 4],
+                                                  [0, 0, 0, 0],
+                                                  [8, 0, 2, 0],
+                                                  [0, 4, 0, 2]])
+        self.assertEqual(board.get_max_cell_value(), 8)
+        board.set_cell_value((1, 1), 16)
+        self.assertEqual(board.get_max_cell_value(), 16)
+        board.clear_cell((1, 1))
+        board.clear_cell((0, 2))
+        self.assertEqual(board.get_max_cell_value(), 4)
+        # cells in the buffer count too
+        board.set_cell_value((0, -1), 32)
+        self.assertEqual(board.get_max_cell_value(), 32)
+        self.assertEqual(Board(4).get_max_cell_value(), 0)
+
+    def test_cell_tables(self):
+        board = Board(4)
+        self.assertIs(board.tables, Board(4).tables)
+        self.assertEqual(board.get_column((1, 2), "down"), [(1, 0), (1, 1)])
+        self.assertEqual(board.get_column((1, 2), "up"), [(1, 3)])
+        self.assertEqual(board.get_column_inclusive((2, 1), "right"), [(0, 1), (1, 1), (2, 1)])
+        self.assertEqual(board.get_column_inclusive((2, 1), "left"), [(2, 1), (3, 1)])
+        self.assertEqual(board.get_line(3, "down"), [(0, 3), (1, 3), (2, 3), (3, 3)])
+        self.assertEqual(board.get_line(3, "left"), [(3, 0), (3, 1), (3, 2), (3, 3)])
+        self.assertEqual(board.tables.line_orders["right"], (3, 2, 1, 0))
+        # neighbors past the table fall back to arithmetic
+        self.assertEqual(board.tables.neighbor((0, -2), "up"), (0, -3))
+        self.assertEqual(board.tables.neighbor((100, 5), "left"), (99, 5))
+        self.assertEqual(TransformPiece.sort_cells([(0, 1), (2, 3), (1, 2)], "down"), [(2, 3), (1, 2), (0, 1)])
+        self.assertEqual(TransformPiece.sort_cells([(0, 1), (2, 3), (1, 2)], "left"), [(0, 1), (1, 2), (2, 3)])
+
     @staticmethod
     def board_from_visual_grid(visual_grid):
         """generates a board from visual 2D array. the active piece will not be parsed and must be set manually!"""
         board = Board(len(visual_grid))
-        board.grid = BoardTest.grid_from_visual_grid(visual_grid)
+        board.grid = Board.grid_from_visual_grid(visual_grid)
         return board
 
-    @staticmethod
-    def grid_from_visual_grid(visual_grid):
-        grid = {}
-        for y in range(len(visual_grid)):
-            row = visual_grid[y]
-            for x in range(len(row)):
-                val = row[x]
-                grid[(x, y)] = val
-        return grid
-
     @staticmethod
     def grid_without_buffer(board):
         """return the board's grid with any cells in the buffer removed"""
@@ -0,0 +1,79 @@
+import random
+import unittest
+from src.logic.Board import Board
+from src.logic.ChunkedBoard import ChunkedBoard
+from src.logic.ChunkedGrid import ChunkedGrid
+from src.logic.PieceGenerator import PieceGenerator
+from src.logic.Simulator import RandomPolicy, Simulator
+
+
+class ChunkedBoardTest(unittest.TestCase):
+    def test_chunks_come_and_go(self):
+        grid = ChunkedGrid(40, 16)
+        grid[(1, 1)] = 2
+        grid[(39, 20)] = 4
+        grid[(2, 1)] = 8
+        self.assertEqual(sorted(grid.chunks), [(0, 0), (2, 1)])
+        self.assertEqual(grid.max_value(), 8)
+        grid[(2, 1)] = 0
+        grid[(39, 20)] = 0
+        self.assertEqual(list(grid.chunks), [(0, 0)])
+        self.assertEqual(grid.max_value(), 2)
+        self.assertEqual(grid.filled, 1)
+
+    def test_behaves_like_dict_grid(self):
+        grid = ChunkedGrid.from_dict(2, {(0, 0): 2, (1, 1): 0, (0, -3): 4, (30, 30): -1})
+        # empty board cells exist but are not iterated
+        self.assertDictEqual(grid.copy(), {(0, 0): 2, (0, -3): 4})
+        self.assertEqual(grid.get((1, 0)), 0)
+        self.assertIn((1, 0), grid)
+        self.assertIsNone(grid.get((30, 30)))
+        self.assertEqual(grid.max_value(), 4)
+        del grid[(0, -3)]
+        self.assertEqual(len(grid), 1)
+
+    def test_matches_board_over_random_games(self):
+        actions = [None, None, None, "left", "right", "up", "down", "drop", "rotate", "change"]
+        directions = ["up", "down", "left", "right"]
+        for seed in range(8):
+            script = random.Random(seed)
+            boards = [Board(8, PieceGenerator(seed)), ChunkedBoard(8, PieceGenerator(seed))]
+            for tick in range(300):
+                action = script.choice(actions)
+                direction = script.choice(directions)
+                for board in boards:
+                    if board.game_over:
+                        continue
+                    if board.active_piece is None:
+                        board.update_grid()
+                    elif action == "change":
+                        board.change_direction(direction)
+                    elif action == "drop":
+                        board.drop_active_piece()
+                    elif action == "rotate":
+                        board.rotate_active_piece()
+                    elif action is not None:
+                        board.shift_active_piece(action)
+                    board.update_grid()
+                self.assertDictEqual(ChunkedBoardTest.filled_grid(boards[1]), ChunkedBoardTest.filled_grid(boards[0]),
+                                     "seed %d tick %d" % (seed, tick))
+                self.assertEqual(boards[1].game_over, boards[0].game_over)
+                self.assertEqual(boards[1].state_hash(), boards[0].state_hash())
+
+    def test_huge_board(self):
+        simulator = Simulator(4096, 300, ChunkedBoard)
+        board_result = simulator.play(RandomPolicy(3, 0.3), 3)
+        self.assertEqual(board_result.ticks, 300)
+        board = ChunkedBoard(4096)
+        for _ in range(300):
+            board.update_grid()
+        # a few pieces' worth of chunks, out of a million
+        self.assertLess(len(board.chunked_grid.chunks), 10)
+
+    @staticmethod
+    def filled_grid(board):
+        return {cell: value for cell, value in board.grid.items() if value > 0}
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import random
+import unittest
+import numpy
+from src.logic.Board import Board
+from src.logic.Environment import Environment, VectorEnvironment
+from src.logic.Simulator import ScriptedPolicy, Simulator
+
+
+class EnvironmentTest(unittest.TestCase):
+    def test_steps_like_simulator(self):
+        script = random.Random(4)
+        actions = [script.randrange(len(Environment.actions)) for _ in range(400)]
+        for board_type in (Board, None):
+            environment = Environment(8, 400) if board_type is None else Environment(8, 400, board_type)
+            observation = environment.reset(7)
+            self.assertEqual(observation.shape, environment.observation_shape())
+            total = 0
+            expected = 0
+            max_tile = environment.max_tile
+            for action in actions:
+                observation, reward, done, info = environment.step(action)
+                total += reward
+                if info["max_tile"] > max_tile:
+                    max_tile = info["max_tile"]
+                    expected += max_tile
+                if done:
+                    break
+            # the simulator applies the same actions from the second tick on
+            policy = ScriptedPolicy([[]] + [[Environment.actions[action]] if action else [] for action in actions])
+            result = Simulator(8, 400).play(policy, 7)
+            self.assertEqual(info["tick"], result.ticks)
+            self.assertEqual(info["max_tile"], result.max_tile)
+            self.assertEqual(total, expected + info["merged_value"])
+            self.assertGreater(info["merged_value"], 0)
+            self.assertEqual(int(observation[0].max()), info["max_tile"].bit_length() - 1)
+
+    def test_observation(self):
+        environment = Environment(4, board_type=Board)
+        environment.reset(1)
+        board = environment.board
+        board.grid = {(x, y): 0 for x in range(4) for y in range(4)}
+        board.set_cell_value((3, 1), 8)
+        board.active_piece = [(0, 0), (1, 0), (0, -1)]
+        board.current_direction = "left"
+        observation = Environment.observe([board])[0]
+        self.assertEqual(observation[0, 3, 1], 3)
+        self.assertEqual(int(observation[0].sum()), 3)
+        self.assertEqual(observation[1].nonzero()[0].tolist(), [0, 1])
+        self.assertTrue(observation[4].all())
+        self.assertEqual(int(observation[2:].sum()), 16)
+
+    def test_vector_steps_and_resets(self):
+        vector = VectorEnvironment(3, 8, max_ticks=50, first_seed=10)
+        observations = vector.reset()
+        self.assertEqual(observations.shape, (3, Environment.channels, 8, 8))
+        finished = 0
+        for tick in range(120):
+            observations, rewards, dones, infos = vector.step(numpy.full(3, tick % len(Environment.actions)))
+            finished += int(dones.sum())
+            for info, done in zip(infos, dones):
+                self.assertEqual(info.get("final", False), bool(done))
+        self.assertGreaterEqual(finished, 6)
+        self.assertEqual(vector.next_seed, 10 + 3 + finished)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import gc
+import time
+import unittest
+from src.logic.Action import Action
+from src.logic.Agent import BoardView, DropAgent
+from src.logic.Board import Board
+from src.logic.ExpectimaxAgent import ExpectimaxAgent
+from src.logic.PieceGenerator import PieceGenerator
+from src.logic.Simulator import Simulator
+from src.logic.TranspositionTable import TranspositionTable
+
+
+class ExpectimaxAgentTest(unittest.TestCase):
+    def test_table_evicts_least_recently_used(self):
+        table = TranspositionTable(2)
+        table.put("a", 1)
+        table.put("b", 2)
+        self.assertEqual(table.get("a"), 1)
+        table.put("c", 3)
+        self.assertEqual(len(table), 2)
+        self.assertIsNone(table.get("b"))
+        self.assertEqual(table.get("a"), 1)
+        self.assertEqual(table.get("c"), 3)
+
+    def test_chance_nodes_cover_every_piece(self):
+        self.assertEqual(sum(chance for _, chance in ExpectimaxAgent.value_chances), 1)
+        self.assertEqual([value for value, _ in ExpectimaxAgent.value_chances], [2, 4])
+        # the i piece has two distinct rotations, the o piece one
+        self.assertEqual(len(ExpectimaxAgent.orientations[0]), 2)
+        self.assertEqual(len(ExpectimaxAgent.orientations[1]), 1)
+
+    def test_plans_within_time_budget(self):
+        board = Board(16, PieceGenerator(3))
+        board.place_new_piece()
+        # a piece searched two deep costs a few budgets on a fast machine, sized from one here so that holds anywhere
+        start = time.perf_counter()
+        ExpectimaxAgent(time_budget=60).act(BoardView(board))
+        agent = ExpectimaxAgent(time_budget=max(0.005, (time.perf_counter() - start) / 8), table_size=1000)
+        # a collection pass can stall a call by several milliseconds, which says nothing about the deadline checks
+        if gc.isenabled():
+            gc.disable()
+            self.addCleanup(gc.enable)
+        depths = []
+        for tick in range(300):
+            if board.game_over:
+                break
+            if agent.planned_piece is not None and agent.planned_piece != board.piece_generator.count:
+                depths.append(agent.depth_reached)
+            start = time.perf_counter()
+            action = agent.act(BoardView(board))
+            # the deadline is checked before every position searched, so a call only runs past it by one of them
+            self.assertLess(time.perf_counter() - start, agent.time_budget * 2)
+            if action is not None:
+                self.assertIn(action, Action.all)
+                Action.apply(board, action)
+            board.update_grid()
+        # a search cut short goes on over the next ticks, most pieces are searched two deep before they land
+        self.assertGreater(depths.count(2), len(depths) // 2)
+        self.assertLessEqual(len(agent.table), 1000)
+
+    def test_search_picks_up_where_it_stopped(self):
+        agent = ExpectimaxAgent(time_budget=0.003, table_size=100000)
+        board = Board(16, PieceGenerator(3))
+        board.place_new_piece()
+        view = BoardView(board)
+        # the piece is not dropped while the search goes on
+        self.assertNotEqual(agent.act(view), Action.DROP)
+        self.assertEqual(agent.depth_reached, 1)
+        misses = agent.table.misses
+        agent.time_budget = 60
+        agent.act(view)
+        self.assertEqual(agent.depth_reached, 2)
+        finished = ExpectimaxAgent(time_budget=60, table_size=100000)
+        finished.act(BoardView(board))
+        self.assertEqual(agent.plan, finished.plan)
+        # every piece tried before the first call ran out is taken from the table
+        self.assertLess(agent.table.misses - misses, finished.table.misses)
+
+    def test_outlasts_dropping_in_place(self):
+        simulator = Simulator(16, 300)
+        for seed in range(2):
+            searched = simulator.play(ExpectimaxAgent(time_budget=0.005), seed)
+            dropped = simulator.play(DropAgent(), seed)
+            self.assertGreater(searched.ticks, dropped.ticks)
+
+
+if __name__ == '__main__':
+    unittest.main()
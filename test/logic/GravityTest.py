@@ -0,0 +1,35 @@
+import unittest
+from src.logic.Board import Board
+from src.logic.Gravity import Gravity
+
+
+class GravityTest(unittest.TestCase):
+    def test_fixed_steps(self):
+        gravity = Gravity(interval=0.25)
+        self.assertEqual(gravity.advance(0.1), 0)
+        self.assertEqual(gravity.advance(0.2), 1)
+        self.assertEqual(gravity.advance(0.75), 3)
+        self.assertAlmostEqual(gravity.accumulated, 0.05)
+
+    def test_drops_time_it_cannot_catch_up(self):
+        gravity = Gravity(interval=0.25, max_steps=4)
+        self.assertEqual(gravity.advance(10), 4)
+        self.assertEqual(gravity.advance(0.1), 0)
+
+    def test_speeds_up_with_level(self):
+        gravity = Gravity(interval=1, speed_up=0.5, min_interval=0.2)
+        board = Board(4)
+        board.set_cell_value((0, 0), 8)
+        gravity.update_level(board)
+        self.assertEqual(gravity.get_interval(), 1)
+        board.set_cell_value((1, 0), 32)
+        gravity.update_level(board)
+        self.assertEqual(gravity.level, 2)
+        self.assertEqual(gravity.get_interval(), 0.25)
+        board.set_cell_value((2, 0), 2048)
+        gravity.update_level(board)
+        self.assertEqual(gravity.get_interval(), 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import random
+import unittest
+from src.logic.Action import Action
+from src.logic.Board import Board
+from src.logic.MoveGenerator import MoveGenerator
+from src.logic.PieceGenerator import PieceGenerator
+
+
+class MoveGeneratorTest(unittest.TestCase):
+    def test_placements_follow_their_inputs(self):
+        script = random.Random(5)
+        board = Board(8, PieceGenerator(5))
+        board.update_grid()
+        checked = 0
+        for tick in range(400):
+            if board.game_over:
+                break
+            if tick % 7 == 0 and board.active_piece is not None:
+                state = board.state_hash()
+                placements = board.get_placements()
+                # searching reads the board without changing it
+                self.assertEqual(board.state_hash(), state)
+                self.assertEqual(len(set(placement.cells for placement in placements)), len(placements))
+                for placement in placements:
+                    self.check_placement(board, placement)
+                checked += len(placements)
+            action = script.choice(Action.all + [None] * 4)
+            if action is not None:
+                Action.apply(board, action)
+            board.update_grid()
+        self.assertGreater(checked, 100)
+
+    def check_placement(self, board, placement):
+        copy = Board(board.size, PieceGenerator(0))
+        copy.grid = dict(board.grid)
+        copy.current_direction = board.current_direction
+        copy.active_piece = board.active_piece
+        cells = sorted(placement.cells)
+        for i, action in enumerate(placement.actions):
+            if action is not None:
+                self.assertTrue(Action.apply(copy, action))
+            if action == Action.DROP:
+                self.assertEqual(sorted(copy.active_piece), cells)
+                self.assertEqual(i, len(placement.actions) - 1)
+                return
+            if i == len(placement.actions) - 1:
+                # the next update lands the piece where it is
+                self.assertTrue(copy.piece_collision_exists(copy.active_piece))
+                self.assertEqual(sorted(copy.active_piece), cells)
+                return
+            self.assertFalse(copy.piece_collision_exists(copy.active_piece))
+            copy.update_grid()
+
+    def test_finds_tucks_and_caches(self):
+        board = Board(4)
+        board.grid = {(x, y): 0 for x in range(4) for y in range(4)}
+        for coords in [(0, 3), (1, 3), (3, 3), (1, 1)]:
+            board.set_cell_value(coords, 8)
+        board.current_direction = "down"
+        board.active_piece = [(2, 0)]
+        board.set_cell_value((2, 0), 2)
+        placements = board.get_placements()
+        by_cells = {placement.cells: placement.actions for placement in placements}
+        self.assertEqual(by_cells[((2, 3),)], [Action.DROP])
+        self.assertEqual(by_cells[((1, 0),)], [Action.shift("left")])
+        # the cell under the overhang is only reached by sliding in after falling past it
+        self.assertEqual(by_cells[((1, 2),)], [None, None, Action.shift("left")])
+        self.assertEqual(len(placements), 4)
+        hits = MoveGenerator.cache.hits
+        self.assertEqual(len(board.get_placements()), 4)
+        self.assertEqual(MoveGenerator.cache.hits, hits + 1)
+        # following a path by popping its inputs leaves the cached one alone
+        expected = {cells: list(actions) for cells, actions in by_cells.items()}
+        placements = board.get_placements()
+        while placements[0].actions:
+            placements[0].actions.pop()
+        placements.pop()
+        again = {placement.cells: placement.actions for placement in board.get_placements()}
+        self.assertEqual(again, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
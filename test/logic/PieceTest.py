@@ -0,0 +1,49 @@
+import unittest
+from src.logic.Piece import Piece
+from src.logic.PieceFactory import PieceFactory
+from src.logic.TransformPiece import TransformPiece
+
+
+class PieceTest(unittest.TestCase):
+    def test_cells_match_factory(self):
+        for piece in PieceFactory.pieces:
+            cells = TransformPiece.transform(piece, (5, 3))
+            self.assertEqual(list(Piece.from_cells(cells)), cells)
+
+    def test_rotate_t(self):
+        piece = Piece.from_cells(TransformPiece.transform(PieceFactory.t, (2, 2)))
+        rotated = TransformPiece.rotate(piece)
+        self.assertIsInstance(rotated, Piece)
+        self.assertEqual(list(rotated), [(3, 1), (3, 2), (3, 3), (2, 2)])
+
+    def test_rotate_matches_cell_arithmetic(self):
+        # the tables have to agree with rotating the cells directly at both parities of the origin
+        for piece in PieceFactory.pieces:
+            for start_point in [(0, 0), (1, 0), (0, 1), (1, 1), (-3, 6)]:
+                cells = TransformPiece.transform(piece, start_point)
+                table_piece = Piece.from_cells(cells)
+                for _ in range(4):
+                    cells = Piece.rotate_cells(cells)
+                    table_piece = table_piece.rotated()
+                    self.assertEqual(list(table_piece), cells)
+
+    def test_translate(self):
+        piece = Piece.from_cells(TransformPiece.transform(PieceFactory.l, (4, 4)))
+        shifted = TransformPiece.shift_coordinates(piece, "left")
+        self.assertIsInstance(shifted, Piece)
+        self.assertEqual(list(shifted), TransformPiece.shift_coordinates(list(piece), "left"))
+
+    def test_is_square(self):
+        for piece in PieceFactory.pieces:
+            cells = TransformPiece.transform(piece, (3, 3))
+            self.assertEqual(Piece.from_cells(cells).is_square(), piece is PieceFactory.o)
+            self.assertEqual(TransformPiece.is_square(cells), piece is PieceFactory.o)
+
+    def test_unknown_cells(self):
+        self.assertIsNone(Piece.find([(0, 0), (2, 0)]))
+        self.assertRaises(ValueError, Piece.from_cells, [(0, 0), (2, 0)])
+        self.assertEqual(TransformPiece.rotate([(0, 0), (2, 0)]), [(1, -1), (1, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
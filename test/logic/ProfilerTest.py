@@ -0,0 +1,74 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from src.logic.Action import Action
+from src.logic.Board import Board
+from src.logic.PieceGenerator import PieceGenerator
+from src.logic.Profiler import PhaseTimes, Profiler
+
+
+class ProfilerTest(unittest.TestCase):
+    def test_times_phases_until_detached(self):
+        board = Board(8, PieceGenerator(2))
+        profiler = Profiler(window=50)
+        profiler.attach(board)
+        ticks = 0
+        while ticks < 200 and not board.game_over:
+            if ticks % 3 == 0 and board.active_piece is not None:
+                Action.apply(board, Action.DROP)
+            board.update_grid()
+            ticks += 1
+        summary = profiler.summary()
+        self.assertEqual(summary["update_grid"]["calls"], ticks)
+        self.assertGreater(summary["place_new_piece"]["calls"], 0)
+        self.assertGreater(summary["shift_cells"]["calls"], 0)
+        self.assertEqual(sum(summary["update_grid"]["histogram"]), min(50, summary["update_grid"]["calls"]))
+        self.assertLessEqual(summary["update_grid"]["p50"], summary["update_grid"]["max"])
+        profiler.detach()
+        self.assertIsNone(board.profiler)
+        self.assertFalse(any(phase in board.__dict__ for phase in Profiler.phases))
+        board.update_grid()
+        self.assertEqual(profiler.times["update_grid"].calls, summary["update_grid"]["calls"])
+
+    def test_histogram_buckets(self):
+        times = PhaseTimes(3)
+        for seconds in (0.0000005, 0.000003, 0.000003, 10):
+            times.add(seconds)
+        # only the latest three are kept for the histogram, the totals count every call
+        self.assertEqual(times.calls, 4)
+        histogram = times.histogram()
+        self.assertEqual(histogram[2], 2)
+        self.assertEqual(histogram[-1], 1)
+        self.assertEqual(times.max, 10)
+
+    def test_percentile(self):
+        times = PhaseTimes(10)
+        self.assertEqual(times.percentile(50), 0.0)
+        for seconds in (4, 1, 3, 2):
+            times.add(seconds)
+        self.assertEqual(times.percentile(50), 2)
+
+    def test_debug_command_dumps(self):
+        board = Board(8, PieceGenerator(1))
+        with tempfile.TemporaryDirectory() as directory, redirect_stdout(io.StringIO()) as output:
+            path = Board.profile_path
+            Board.profile_path = os.path.join(directory, "profile.json")
+            try:
+                board.debug("profile")
+                for _ in range(20):
+                    board.update_grid()
+                board.debug("profile")
+                with open(Board.profile_path) as profile_file:
+                    dumped = json.load(profile_file)
+            finally:
+                Board.profile_path = path
+        self.assertIsNone(board.profiler)
+        self.assertEqual(dumped["phases"]["update_grid"]["calls"], 20)
+        self.assertIn("merge_with_completed_rows", output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from src.logic.Board import Board
+from src.logic.PieceGenerator import PieceGenerator
+from src.logic.Replay import Replay
+from src.logic.Simulator import RandomPolicy, Simulator
+
+
+class ReplayTest(unittest.TestCase):
+    def test_seeded_boards_get_the_same_pieces(self):
+        first = Board(8, PieceGenerator(3))
+        second = Board(8, PieceGenerator(3))
+        for _ in range(20):
+            first.place_new_piece()
+            second.place_new_piece()
+            self.assertEqual(list(first.active_piece), list(second.active_piece))
+        resumed = PieceGenerator.resume(3, 20)
+        self.assertEqual(resumed.next_piece(), first.piece_generator.next_piece())
+
+    def test_playback_matches_recorded_game(self):
+        boards = {}
+
+        class WatchingPolicy(RandomPolicy):
+            def __call__(self, board, tick):
+                boards[tick] = ReplayTest.filled_grid(board)
+                return RandomPolicy.__call__(self, board, tick)
+
+        for seed in range(4):
+            boards.clear()
+            replay = Replay(8, seed, keyframe_interval=16)
+            result = Simulator(8, 400).play(WatchingPolicy(seed, 0.3), seed, replay)
+            replay = Replay.from_bytes(replay.to_bytes())
+            self.assertEqual(replay.ticks, result.ticks)
+            final = replay.play()
+            self.assertTrue(final.game_over or result.timed_out)
+            self.assertEqual(final.get_max_cell_value(), result.max_tile)
+            for tick in [1, 15, 16, 17, 40, max(boards)]:
+                if tick in boards:
+                    self.assertDictEqual(ReplayTest.filled_grid(replay.seek(tick)), boards[tick],
+                                         "seed %d tick %d" % (seed, tick))
+
+    @staticmethod
+    def filled_grid(board):
+        return {cell: value for cell, value in board.grid.items() if value > 0}
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from src.logic.Action import Action
+from src.logic.Simulator import RandomPolicy, ScriptedPolicy, Simulator
+
+
+class SimulatorTest(unittest.TestCase):
+    def test_same_seed_same_game(self):
+        simulator = Simulator(board_size=8, max_ticks=500)
+        first = simulator.play(RandomPolicy(3), seed=7)
+        second = simulator.play(RandomPolicy(3), seed=7)
+        self.assertEqual((first.ticks, first.max_tile, first.outcome()),
+                         (second.ticks, second.max_tile, second.outcome()))
+
+    def test_tick_limit(self):
+        simulator = Simulator(board_size=8, max_ticks=5)
+        result = simulator.play(ScriptedPolicy([]), seed=1)
+        self.assertEqual(result.ticks, 5)
+        self.assertTrue(result.timed_out)
+        self.assertEqual(result.outcome(), "timed_out")
+
+    def test_scripted_drops_end_the_game(self):
+        simulator = Simulator(board_size=8, max_ticks=1000)
+        result = simulator.play(ScriptedPolicy({tick: [Action.DROP] for tick in range(1000)}), seed=1)
+        self.assertTrue(result.lost)
+        self.assertLess(result.ticks, 1000)
+
+    def test_report(self):
+        simulator = Simulator(board_size=8, max_ticks=200)
+        report = simulator.run(lambda seed: RandomPolicy(seed), games=4)
+        self.assertEqual(report.games, 4)
+        self.assertEqual(sum(report.outcomes().values()), 4)
+        self.assertEqual(sum(report.max_tiles().values()), 4)
+        self.assertEqual(report.ticks, sum(result.ticks for result in report.results))
+        self.assertGreater(report.ticks_per_second(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
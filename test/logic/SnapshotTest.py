@@ -0,0 +1,62 @@
+import os
+import random
+import tempfile
+import unittest
+from src.logic.ArrayBoard import ArrayBoard
+from src.logic.Board import Board
+from src.logic.Snapshot import Snapshot
+
+
+class SnapshotTest(unittest.TestCase):
+    def test_round_trip(self):
+        grid = [[0, 0, 0, 0],
+                [0, 2048, 0, 0],
+                [8, 0, 2, 0],
+                [0, 4, 0, 2]]
+        board = Board(4)
+        board.grid = Board.grid_from_visual_grid(grid)
+        board.set_cell_value((1, -2), 2)
+        board.set_cell_value((1, -1), 2)
+        board.set_cell_value((2, -1), 2)
+        board.set_cell_value((2, -2), 2)
+        board.clear_cell((2, -3))
+        board.active_piece = [(1, -2), (1, -1), (2, -2), (2, -1)]
+        board.current_direction = "left"
+        size, records = Snapshot.from_bytes(Snapshot.to_bytes([board]))
+        self.assertEqual(size, 4)
+        for board_type in [Board, ArrayBoard]:
+            loaded = Snapshot.decode(records[0], size, board_type)
+            self.assertDictEqual(SnapshotTest.cells(loaded), SnapshotTest.cells(board))
+            self.assertEqual(list(loaded.active_piece), board.active_piece)
+            self.assertEqual(loaded.current_direction, "left")
+            self.assertFalse(loaded.game_over)
+
+    def test_file_of_played_boards(self):
+        rng = random.Random(2)
+        boards = [Board(8) for _ in range(5)]
+        for tick in range(60):
+            for board in boards:
+                if board.active_piece is not None and rng.random() < 0.2:
+                    board.drop_active_piece()
+                board.update_grid()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "boards.snap")
+        Snapshot.save(path, boards)
+        size, records = Snapshot.load(path)
+        self.assertEqual(len(records), 5)
+        for board, record in zip(boards, records):
+            loaded = Snapshot.decode(record, size)
+            self.assertDictEqual(SnapshotTest.cells(loaded), SnapshotTest.cells(board))
+            self.assertEqual(list(loaded.active_piece or []), list(board.active_piece or []))
+            self.assertEqual(loaded.game_over, board.game_over)
+        del records
+
+    @staticmethod
+    def cells(board):
+        """every cell that holds something, -1 buffer cells aside"""
+        return {coords: value for coords, value in board.grid.items() if value != -1}
+
+
+if __name__ == '__main__':
+    unittest.main()
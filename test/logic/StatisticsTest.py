@@ -0,0 +1,16 @@
+import unittest
+from src.logic.Statistics import Statistics
+
+
+class StatisticsTest(unittest.TestCase):
+    def test_nearest_rank(self):
+        self.assertEqual(Statistics.nearest_rank([1, 2, 3, 4, 5], 50), 3)
+        self.assertEqual(Statistics.nearest_rank([1, 2, 3, 4, 5], 0), 1)
+        self.assertEqual(Statistics.nearest_rank([1, 2, 3, 4, 5], 100), 5)
+        # half of four values are at or below the second, which rounding the interpolated index would skip
+        self.assertEqual(Statistics.nearest_rank([1, 2, 3, 4], 50), 2)
+        self.assertEqual(Statistics.nearest_rank(list(range(1, 101)), 99), 99)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+from src.logic.Agent import DropAgent, RandomAgent
+from src.logic.Tournament import Tournament
+
+
+class TournamentTest(unittest.TestCase):
+    def test_results_stream_and_resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.jsonl")
+            agents = {"drop": DropAgent(), "random": RandomAgent(1)}
+            Tournament(agents, 2, path, board_size=8, max_ticks=200, processes=2).run()
+            self.assertEqual(len(Tournament.load_results(path)), 4)
+            # a bigger run only plays the games that are missing
+            streamed = []
+            Tournament(agents, 3, path, board_size=8, max_ticks=200, processes=2).run(streamed.append)
+            self.assertEqual(sorted((result["agent"], result["seed"]) for result in streamed),
+                             [("drop", 2), ("random", 2)])
+            summary = Tournament.summarize(Tournament.load_results(path))
+            self.assertEqual(summary["drop"]["games"], 3)
+            self.assertEqual(sum(summary["random"]["max_tiles"].values()), 3)
+
+    def test_random_agent_varies_by_game(self):
+        agent = RandomAgent(1)
+        inputs = []
+        for seed in [0, 1, 0]:
+            agent.start_game(seed)
+            inputs.append([agent.random.random() for _ in range(5)])
+        self.assertNotEqual(inputs[0], inputs[1])
+        self.assertEqual(inputs[0], inputs[2])
+
+    def test_resume_after_cut_short_line(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.jsonl")
+            agents = {"drop": DropAgent()}
+            Tournament(agents, 2, path, board_size=8, max_ticks=200, processes=1).run()
+            # an interrupted write leaves half a line behind
+            with open(path, "a") as results_file:
+                results_file.write('{"agent": "drop", "se')
+            Tournament(agents, 4, path, board_size=8, max_ticks=200, processes=1).run()
+            self.assertEqual(sorted(result["seed"] for result in Tournament.load_results(path)), [0, 1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
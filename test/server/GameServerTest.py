@@ -0,0 +1,87 @@
+import asyncio
+import functools
+import os
+import tempfile
+import unittest
+from src.logic.Gravity import Gravity
+from src.server.GameClient import GameClient
+from src.server.GameServer import GameServer, load_test
+
+
+class GameServerTest(unittest.TestCase):
+    def test_sessions_share_the_scheduler(self):
+        asyncio.run(GameServerTest.check_sessions(self))
+
+    async def check_sessions(self):
+        server = GameServerTest.fast_server()
+        await server.start()
+        host, port = server.address()[:2]
+        clients = [await GameClient.connect(host, port) for _ in range(3)]
+        self.assertEqual([client.session for client in clients], [0, 1, 2])
+        self.assertEqual([client.seed for client in clients], [3, 4, 5])
+        for client in clients:
+            while client.tick < 5:
+                await client.read()
+        clients[0].send("bogus")
+        # ticks keep coming in ahead of the reply
+        reply = await clients[0].read()
+        while reply[0] == "tick":
+            reply = await clients[0].read()
+        self.assertEqual(reply[:2], ["error", "unknown"])
+        # the client sees the board the server plays
+        tick, direction, values = await clients[1].state()
+        board = server.sessions[1].board
+        self.assertEqual(direction, board.current_direction)
+        self.assertEqual(values, [[board.get_cell_value((x, y)) for x in range(8)] for y in range(8)])
+        summary = server.summary()
+        self.assertEqual(summary["sessions"], 3)
+        self.assertGreaterEqual(summary["ticks"], 15)
+        self.assertGreater(summary["sessions_per_core"], 0)
+        clients[2].send("quit")
+        self.assertIsNone(await clients[2].read())
+        self.assertEqual(len(server.sessions), 2)
+        for client in clients:
+            await client.close()
+        await server.stop()
+
+    def test_game_over_ends_the_session(self):
+        asyncio.run(GameServerTest.check_game_over(self))
+
+    async def check_game_over(self):
+        server = GameServerTest.fast_server()
+        await server.start()
+        client = await GameClient.connect(*server.address()[:2])
+        while client.over is None:
+            client.send("drop")
+            self.assertIsNotNone(await client.read())
+        self.assertIsNone(await client.read())
+        self.assertEqual(server.sessions, {})
+        self.assertEqual(server.wheel.count, 0)
+        await client.close()
+        await server.stop()
+
+    def test_load_test_over_a_unix_socket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            asyncio.run(GameServerTest.check_unix_load(self, os.path.join(directory, "server.sock")))
+
+    async def check_unix_load(self, path):
+        server = GameServerTest.fast_server()
+        await server.start(path=path)
+        client = await GameClient.connect(path=path)
+        self.assertEqual(client.session, 0)
+        while client.tick < 3:
+            await client.read()
+        report = await load_test(server, 2, 0.2, 50, path)
+        # the load clients reached the server over the same socket
+        self.assertIn("(3 opened)", report)
+        await client.close()
+        await server.stop()
+
+    @staticmethod
+    def fast_server():
+        return GameServer(8, gravity_type=functools.partial(Gravity, interval=0.01, min_interval=0.01),
+                          resolution=0.002, first_seed=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
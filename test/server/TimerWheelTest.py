@@ -0,0 +1,59 @@
+import unittest
+from src.server.TimerWheel import TimerWheel
+
+
+class TimerWheelTest(unittest.TestCase):
+    def test_runs_timers_in_their_slots(self):
+        wheel = TimerWheel(resolution=0.25, slots=4, clock=lambda: 0.0)
+        fired = []
+        wheel.schedule(0.1, lambda now: fired.append(("soon", now)))
+        # further off than one turn of the wheel
+        wheel.schedule(2.5, lambda now: fired.append(("later", now)))
+        cancelled = wheel.schedule(0.5, lambda now: fired.append(("cancelled", now)))
+        wheel.cancel(cancelled)
+        self.assertEqual(wheel.count, 2)
+        wheel.advance(0.2)
+        self.assertEqual(fired, [])
+        wheel.advance(0.25)
+        self.assertEqual(fired, [("soon", 0.25)])
+        wheel.advance(2.4)
+        self.assertEqual(len(fired), 1)
+        wheel.advance(2.6)
+        self.assertEqual(fired, [("soon", 0.25), ("later", 2.6)])
+        self.assertEqual(wheel.count, 0)
+        self.assertEqual(wheel.lateness.calls, 2)
+        self.assertAlmostEqual(wheel.lateness.max, 0.15)
+
+    def test_timers_scheduled_while_running_wait_for_a_later_slot(self):
+        wheel = TimerWheel(resolution=0.25, slots=4, clock=lambda: 0.0)
+        fired = []
+
+        def again(now):
+            fired.append(now)
+            if len(fired) < 3:
+                wheel.schedule(now, again)
+        wheel.schedule(0, again)
+        wheel.advance(0)
+        self.assertEqual(fired, [0])
+        wheel.advance(0.5)
+        self.assertEqual(fired, [0, 0.5, 0.5])
+
+    def test_lateness_counts_earlier_callbacks_in_the_slot(self):
+        clock = [0.0]
+        wheel = TimerWheel(resolution=0.25, slots=4, clock=lambda: clock[0])
+        started = []
+
+        def busy(now):
+            started.append(now)
+            clock[0] += 0.1
+        for _ in range(3):
+            wheel.schedule(0.25, busy)
+        clock[0] = 0.25
+        wheel.advance(clock[0])
+        self.assertEqual([round(now, 6) for now in started], [0.25, 0.35, 0.45])
+        self.assertEqual(wheel.lateness.calls, 3)
+        self.assertAlmostEqual(wheel.lateness.max, 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()